@@ -1,28 +1,36 @@
 from exiftool import ExifToolHelper
-from ..general.mediafile import MediaFile
+from ..general.mediafile import MediaFile, StemIndex
 import datetime as dt
 
 
 class AudioFile(MediaFile):
     supportedAudioFileEndings = [".MP3", ".mp3", ".wav", ".WAV"]
 
-    def __init__(self, path: str):
-        super().__init__(path, validExtensions=self.supportedAudioFileEndings)
+    def __init__(self, path: str, stemIndex: StemIndex = None):
+        super().__init__(path, validExtensions=self.supportedAudioFileEndings, stemIndex=stemIndex)
+
+    dateTags = [
+        "QuickTime:MediaCreateDate",
+        "QuickTime:CreateDate",
+        "File:FileModifyDate",
+    ]
 
     def readDateTime(self) -> dt.datetime:
         file = self.pathnoext + self.extensions[0]
         with ExifToolHelper() as et:
-            result = et.get_tags(
-                file,
-                [
-                    "QuickTime:MediaCreateDate",
-                    "QuickTime:CreateDate",
-                    "File:FileModifyDate",
-                ],
-            )[0]
-            for key, value in result.items():
-                if key == "SourceFile":
-                    continue
-                return dt.datetime.strptime(value[0:19], "%Y:%m:%d %H:%M:%S")
+            result = self.getDateTimeFrom(et.get_tags(file, self.dateTags)[0])
+            if result is not None:
+                return result
 
         raise Exception(f"Did not find creation date of audio file {file}!")
+
+    @staticmethod
+    def getDateTimeFrom(tags: dict[str, str]) -> dt.datetime | None:
+        """
+        tags: date tags of an audio file as read by exiftool
+        """
+        for key, value in tags.items():
+            if key == "SourceFile":
+                continue
+            return dt.datetime.strptime(value[0:19], "%Y:%m:%d %H:%M:%S")
+        return None
@@ -37,6 +37,71 @@ copyparser = subparsers.add_parser(
     aliases=command_aliases["copy"],
 )
 
+copyparser.add_argument(
+    "-s",
+    "--source",
+    help="Directory or zip/tar archive to copy from instead of copy_source_dir of the settings. Can be given multiple times, sources on different devices are copied concurrently.",
+    action="append",
+    dest="copy_sources",
+)
+
+copyparser.add_argument(
+    "-r",
+    "--rename",
+    help="Renames files while copying them and puts them directly into the stage after renaming (3), with their sidecars already written. Saves the complete rename pass.",
+    action="store_true",
+    dest="copy_rename",
+)
+
+copyparser.add_argument(
+    "--subseconds",
+    help="Together with --rename, adds the milliseconds of the capture time to the new names (YYYY-MM-DD@HHMMSS.mmm_#), so burst shots keep their order.",
+    action="store_true",
+    dest="copy_subseconds",
+)
+
+copyparser.add_argument(
+    "--since",
+    help="Copies only media files captured at or after the given time, formatted as YYYY-MM-DD or YYYY-MM-DD@HHMMSS. Does not move the _LAST marker.",
+    type=str,
+    dest="copy_since",
+)
+
+copyparser.add_argument(
+    "--until",
+    help="Copies only media files captured at or before the given time, formatted as YYYY-MM-DD (including the whole day) or YYYY-MM-DD@HHMMSS. Does not move the _LAST marker.",
+    type=str,
+    dest="copy_until",
+)
+
+copyparser.add_argument(
+    "--link",
+    help="If the source is on the same filesystem as the working dir, files are reflinked (btrfs, xfs, ..) or else hardlinked instead of copied, which takes no time and space. Do not edit the source files in place afterwards.",
+    action="store_true",
+    dest="copy_link",
+)
+
+copyparser.add_argument(
+    "--durable",
+    help="Syncs copied files to disk in batches before they are marked as imported, so a power loss right after copying can not lose them.",
+    action="store_true",
+    dest="copy_durable",
+)
+
+copyparser.add_argument(
+    "--defer-originals",
+    help="Copies only the jpg of images with raws or videos of the same name. The originals are fetched by the aggregate stage for images rated 4 or higher, from the source or from the folder given as 'deferred_stash_dir' in .mowsettings, into which they are copied then.",
+    action="store_true",
+    dest="copy_defer_originals",
+)
+
+copyparser.add_argument(
+    "--verify",
+    help="Does not copy anything, but hashes all copied files recorded in the import manifest again and reports the ones that differ from their hash calculated while copying.",
+    action="store_true",
+    dest="copy_verify",
+)
+
 renameparser = subparsers.add_parser(
     "rename",
     help="transition of renamed media files (2 -> 3).",
@@ -92,6 +157,13 @@ renameparser.add_argument(
     dest="rename_usecurrent",
 )
 
+renameparser.add_argument(
+    "--subseconds",
+    help="Adds the milliseconds of the capture time to the new names (YYYY-MM-DD@HHMMSS.mmm_#), so burst shots keep their order.",
+    action="store_true",
+    dest="rename_subseconds",
+)
+
 renameparser.add_argument(
     "-r",
     "--replace",
@@ -323,6 +395,44 @@ for currentparser in stageparsers:
         metavar="LEVEL",
         dest="verbosity",
     )
+    currentparser.add_argument(
+        "--exiftool-processes",
+        type=int,
+        help="Number of exiftool processes reading and writing meta tags concurrently. 0 = one per cpu. Default is 1.",
+        default=1,
+        metavar="NUMBER",
+        dest="exiftool_processes",
+    )
+    currentparser.add_argument(
+        "--chunk-size",
+        type=int,
+        help="Tag and move files in chunks of this size, moving one chunk while the next is tagged. Finished chunks stay complete if the run is interrupted. Default is 0 (no chunks).",
+        default=0,
+        metavar="NUMBER",
+        dest="chunk_size",
+    )
+    currentparser.add_argument(
+        "--relocation-threads",
+        type=int,
+        help="Number of files moved or copied concurrently. Values > 1 speed up working directories on network drives. Default is 1.",
+        default=1,
+        metavar="NUMBER",
+        dest="relocation_threads",
+    )
+    currentparser.add_argument(
+        "--clear-tag-cache",
+        help="Removes the tags cached in the working directory before running, so all tags are read from the files again. Needed if files were edited by a tool that restores their modification time in place.",
+        action="store_true",
+        dest="clear_tag_cache",
+        default=False,
+    )
+    currentparser.add_argument(
+        "--resume",
+        help="Continue the interrupted run of this stage where it stopped, without collecting and evaluating the files again.",
+        action="store_true",
+        dest="resume",
+        default=False,
+    )
 
 
 def parse_timedelta(time_str) -> datetime.timedelta:
@@ -343,6 +453,18 @@ def parse_timedelta(time_str) -> datetime.timedelta:
     )
 
 
+def parse_capture_time(time_str: str, end_of_day=False) -> datetime.datetime:
+    if time_str is None:
+        return None
+    if "@" in time_str:
+        return datetime.datetime.strptime(time_str, "%Y-%m-%d@%H%M%S")
+
+    date = datetime.datetime.strptime(time_str, "%Y-%m-%d")
+    if end_of_day:
+        date += datetime.timedelta(days=1, microseconds=-1)
+    return date
+
+
 def should_execute_stage(stage: str, args: Namespace):
     return stage == args.command or args.command in command_aliases[stage]
 
@@ -364,15 +486,39 @@ def main():
         dry=not args.execute if hasattr(args, "execute") else True,
         filter=args.filter if hasattr(args, "filter") else "",
         verbosity=args.verbosity if hasattr(args, "verbosity") else 3,
+        exiftoolProcesses=(
+            args.exiftool_processes if hasattr(args, "exiftool_processes") else 1
+        ),
+        chunkSize=args.chunk_size if hasattr(args, "chunk_size") else 0,
+        resume=args.resume if hasattr(args, "resume") else False,
+        relocationThreads=(
+            args.relocation_threads if hasattr(args, "relocation_threads") else 1
+        ),
+        clearTagCache=(
+            args.clear_tag_cache if hasattr(args, "clear_tag_cache") else False
+        ),
     )
 
     if hasattr(args, "list") and args.list:
         mow.list_todos(stage=get_canonical_command(args.command))
     elif should_execute_stage("copy", args):
-        mow.copy()
+        if args.copy_verify:
+            mow.verifyCopies()
+        else:
+            mow.copy(
+                sources=args.copy_sources,
+                rename=args.copy_rename,
+                subSecondNames=args.copy_subseconds,
+                since=parse_capture_time(args.copy_since),
+                until=parse_capture_time(args.copy_until, end_of_day=True),
+                link=args.copy_link,
+                durable=args.copy_durable,
+                deferOriginals=args.copy_defer_originals,
+            )
     elif should_execute_stage("rename", args):
         mow.rename(
             useCurrentFilename=args.rename_usecurrent,
+            subSecondNames=args.rename_subseconds,
             replace=args.rename_replace if args.rename_replace is not None else "",
         )
     elif should_execute_stage("convert", args):
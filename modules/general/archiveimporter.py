@@ -0,0 +1,231 @@
+import os
+from os.path import join
+from pathlib import PurePosixPath
+import re
+import tarfile
+from typing import BinaryIO, Callable, Iterator, Tuple
+import zipfile
+
+from ..general.verboseprinterclass import VerbosePrinterClass
+from ..general.mediatransitioner import TransitionerInput, claimLock
+from ..general.medafilefactories import createAnyValidMediaFile
+from ..general.mediafile import StemIndex
+from ..mow.mowfolder import get_mow_folder_of
+from ..mow.importledger import IMPORT_LEDGER_FILE_NAME, ImportLedger
+from ..mow.importmanifest import (
+    IMPORT_MANIFEST_FILE_NAME,
+    PART_SUFFIX,
+    ImportManifest,
+    stream_and_hash,
+)
+
+ARCHIVE_SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tar.xz")
+DRIVE_PATTERN = re.compile(r"^[a-zA-Z]:")
+
+
+def isArchive(path: str) -> bool:
+    return os.path.isfile(path) and path.lower().endswith(ARCHIVE_SUFFIXES)
+
+
+def isMediaFileName(path: str) -> bool:
+    """
+    Applies the filtering of createAnyValidMediaFile to path without the need of an existing file.
+    """
+    stemIndex = StemIndex()
+    stemIndex.addDirectory(os.path.dirname(path), [os.path.basename(path)])
+    mediaFile = createAnyValidMediaFile(path, fast_creation=True, stemIndex=stemIndex)
+    return mediaFile.isValid()
+
+
+class ArchiveImporter(VerbosePrinterClass):
+    """
+    Imports the mediafiles contained in a zip or tar archive (e.g. an export of a phone or cloud) without extracting the archive first.
+    The members are streamed one after another into dst/<archive name>/<path of member>, members that are no mediafiles are skipped without being written.
+    Tar archives are read as stream, so compressed tar archives are decompressed only once.
+    If the settings contain a working directory, imported members are recorded in the import ledger and skipped by later imports of the same archive.
+    Members whose path would leave dst/<archive name> (absolute paths, drive letters or '..') are skipped.
+    Members that cannot be read (e.g. corrupt ones) are removed again from dst and skipped, the import continues with the next member.
+    """
+
+    def __init__(self, input: TransitionerInput):
+        super().__init__(input.verbosityLevel > 0)
+        self.archive = os.path.abspath(input.src)
+        archiveName = os.path.basename(self.archive)
+        for suffix in ARCHIVE_SUFFIXES:
+            if archiveName.lower().endswith(suffix):
+                archiveName = archiveName[: -len(suffix)]
+                break
+        self.dst = join(os.path.abspath(input.dst), archiveName)
+        self.dry = input.dry
+        self.claimedTargets = input.claimedTargets
+
+        mowFolder = get_mow_folder_of(input.settings)
+        self.manifest = (
+            ImportManifest(mowFolder / IMPORT_MANIFEST_FILE_NAME)
+            if mowFolder is not None
+            else None
+        )
+        self.ledger = (
+            ImportLedger(mowFolder / IMPORT_LEDGER_FILE_NAME)
+            if mowFolder is not None
+            else None
+        )
+
+    def __call__(self):
+        self.print_info(f"Start import from archive {self.archive} into {self.dst}")
+        if self.dry:
+            self.print_info(
+                "Dry mode active. Will NOT do anything, just print what would be done."
+            )
+
+        imported: list[dict] = []
+        importedFingerprints: list[tuple[str, int, str]] = []
+        nrNonMedia = 0
+        nrExisting = 0
+        nrKnown = 0
+        nrFailed = 0
+
+        try:
+            for name, size, checksum, openMember in self.getMembers():
+                target = self.getTargetOf(name)
+                if target is None:
+                    self.print_warning(
+                        f"Skipped {name}: Path leaves the import folder {self.dst}!"
+                    )
+                    continue
+
+                if not isMediaFileName(target):
+                    nrNonMedia += 1
+                    continue
+
+                fingerprint = ImportLedger.fingerprint_of_member(
+                    self.archive, name, size, checksum
+                )
+                if (
+                    self.ledger is not None
+                    and len(self.ledger.get_known_fingerprints([fingerprint])) > 0
+                ):
+                    self.print_debug(f"Skipped {name}: Imported before.")
+                    nrKnown += 1
+                    continue
+
+                if not self.claim(target):
+                    self.print_warning(
+                        f"Skipped {name}: File exists already in {target}!"
+                    )
+                    nrExisting += 1
+                    continue
+
+                self.print_debug(f"Import {name} into {target}")
+                if self.dry:
+                    imported.append({"target": target})
+                    importedFingerprints.append(
+                        (fingerprint, size, f"{self.archive}/{name}")
+                    )
+                    continue
+
+                try:
+                    entry = self.importMember(name, target, openMember)
+                except Exception as e:
+                    self.print_warning(f"Could not import {name}: {e}")
+                    self.removePartialTargetOf(target)
+                    nrFailed += 1
+                    continue
+
+                imported.append(entry)
+                importedFingerprints.append(
+                    (fingerprint, size, f"{self.archive}/{name}")
+                )
+        finally:
+            # members written before an error ended the import must not be imported again
+            if self.manifest is not None and not self.dry:
+                self.manifest.record(imported)
+
+            if self.ledger is not None:
+                if not self.dry:
+                    self.ledger.add_fingerprints(importedFingerprints)
+                self.ledger.close()
+
+        self.print_info(
+            f"Imported {len(imported)} mediafiles, failed to import {nrFailed}, skipped {nrKnown} imported before, {nrExisting} existing files and {nrNonMedia} files that are no mediafiles."
+        )
+
+    def importMember(
+        self, name: str, target: str, openMember: Callable[[], BinaryIO]
+    ) -> dict:
+        """
+        Streams the member into target and returns its entry of the import manifest.
+        """
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with openMember() as source:
+            md5 = stream_and_hash(source, target)
+        return {
+            "source": f"{self.archive}/{name}",
+            "target": target,
+            "size": os.path.getsize(target),
+            "md5": md5,
+        }
+
+    def removePartialTargetOf(self, target: str):
+        """
+        Removes what was written of target and releases its claim, so a later import can write it again.
+        """
+        for file in [target + PART_SUFFIX, target]:
+            try:
+                if os.path.exists(file):
+                    os.remove(file)
+            except OSError as e:
+                self.print_warning(f"Could not remove {file}: {e}")
+        if self.claimedTargets is not None:
+            with claimLock:
+                self.claimedTargets.discard(target)
+
+    def getTargetOf(self, name: str) -> str | None:
+        """
+        Returns the path inside dst the member name is imported to, or None if the member must not be written as its path would leave dst.
+        Backslashes are taken as separators as well, since archives created on windows may contain them.
+        """
+        path = PurePosixPath(name.replace("\\", "/"))
+        if (
+            path.is_absolute()
+            or len(path.parts) == 0
+            or any(part == ".." or DRIVE_PATTERN.match(part) for part in path.parts)
+        ):
+            return None
+
+        target = os.path.abspath(join(self.dst, *path.parts))
+        if os.path.commonpath([target, self.dst]) != self.dst:
+            return None
+        return target
+
+    def claim(self, target: str) -> bool:
+        if os.path.exists(target):
+            return False
+        if self.claimedTargets is None:
+            return True
+        with claimLock:
+            if target in self.claimedTargets:
+                return False
+            self.claimedTargets.add(target)
+        return True
+
+    def getMembers(self) -> Iterator[Tuple[str, int, int, Callable[[], BinaryIO]]]:
+        """
+        Yields name, size, checksum and opener of every file in the archive. A member has to be read before the next one is yielded.
+        Tar members carry no checksum of their content, their modification time is taken instead.
+        """
+        if zipfile.is_zipfile(self.archive):
+            with zipfile.ZipFile(self.archive) as archive:
+                for info in archive.infolist():
+                    if not info.is_dir():
+                        yield info.filename, info.file_size, info.CRC, lambda info=info: archive.open(
+                            info
+                        )
+            return
+
+        with tarfile.open(self.archive, "r|*") as archive:
+            for member in archive:
+                if member.isfile():
+                    yield member.name, member.size, member.mtime, lambda member=member: archive.extractfile(
+                        member
+                    )
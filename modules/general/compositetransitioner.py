@@ -0,0 +1,60 @@
+import os
+
+from ..general.mediatransitioner import MediaTransitioner
+from ..general.verboseprinterclass import VerbosePrinterClass
+
+
+class CompositeTransitioner(VerbosePrinterClass):
+    """
+    Runs transitioners of different media types on the same source one after another (e.g. the image, video and audio renamer),
+    but walks the source only once: its listing is taken up front and every transitioner creates the mediafiles of its type from it.
+    The folders of the listing are listed again before every further transitioner, so it sees what the previous ones left.
+    All transitioners need the same src, recursion and filter.
+    """
+
+    def __init__(self, transitioners: list[MediaTransitioner]):
+        if len(transitioners) == 0:
+            raise Exception("CompositeTransitioner needs at least one transitioner!")
+
+        first = transitioners[0]
+        for transitioner in transitioners[1:]:
+            if (
+                transitioner.src != first.src
+                or transitioner.recursive != first.recursive
+                or transitioner.filter != first.filter
+            ):
+                raise Exception(
+                    f"{type(transitioner).__name__} does not treat the same files as {type(first).__name__}!"
+                )
+
+        super().__init__(first.verbosityLevel > 0)
+        self.transitioners = transitioners
+
+    def __call__(self):
+        listing = self.transitioners[0].listSourceFiles()
+
+        for index, transitioner in enumerate(self.transitioners):
+            self.print_info(f"Transition {type(transitioner).__name__}")
+            if index > 0:
+                # the previous transitioner may have moved, merged or deleted files, e.g. a sidecar shared by an image and a video
+                listing = self.relist(listing)
+            transitioner.mediaFilesToTreat = transitioner.collectMediaFilesOf(
+                [transitioner.mediaFileFactory], listing
+            )[0]
+            transitioner()
+
+    def relist(
+        self, listing: list[tuple[str, list[str]]]
+    ) -> list[tuple[str, list[str]]]:
+        """
+        Lists the folders of listing again, which is much cheaper than walking src again, as no new folders have to be found.
+        """
+        out: list[tuple[str, list[str]]] = []
+        for root, _ in listing:
+            try:
+                with os.scandir(root) as entries:
+                    files = [entry.name for entry in entries if entry.is_file()]
+            except FileNotFoundError:
+                continue  # removed as it became empty
+            out.append((root, files))
+        return out
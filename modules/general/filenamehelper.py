@@ -3,10 +3,14 @@ import datetime as dt
 from os.path import basename
 import pathlib
 
-from ..general.mediafile import MediaFile
+from exiftool import ExifToolHelper
+from exiftool.exceptions import ExifToolExecuteError
+
+from ..general.mediafile import MediaFile, StemIndex
 from ..general.checkresult import CheckResult
 from ..image.imagefile import ImageFile
 from ..video.videofile import VideoFile
+from ..video.quicktimereader import readCreationDateOf
 from ..audio.audiofile import AudioFile
 
 import logging
@@ -36,9 +40,91 @@ def getMediaCreationDateFrom(file: str) -> dt.datetime:
     return result
 
 
-def getDateTimeFileNameFor(file: str) -> str:
-    date = getMediaCreationDateFrom(file)
+def getMediaCreationDatesOf(files: list[str]) -> dict[str, dt.datetime]:
+    """
+    Returns the same dates as getMediaCreationDateFrom for all files, but reads the dates of all video and audio files that can not be read
+    natively with one exiftool process instead of starting one per file.
+    """
+    out: dict[str, dt.datetime] = {}
+    stemIndex = StemIndex()
+    toReadByExiftool: dict[str, type[VideoFile] | type[AudioFile]] = {}
+
+    for file in files:
+        image = ImageFile(file, stemIndex=stemIndex)
+        if image.isValid():
+            date = image.readDateTime()
+            if date is not None:
+                out[file] = date
+            continue
+
+        for mediatype in [VideoFile, AudioFile]:
+            if not mediatype(file, stemIndex=stemIndex).isValid():
+                continue
+            date = readCreationDateOf(file) if mediatype is VideoFile else None
+            if date is not None:
+                out[file] = date
+            else:
+                toReadByExiftool[file] = mediatype
+            break
+
+    if len(toReadByExiftool) > 0:
+        with ExifToolHelper() as et:
+            for file, tags in _getDateTagsOf(et, toReadByExiftool).items():
+                mediatype = toReadByExiftool[file]
+                try:
+                    date = mediatype.getDateTimeFrom(
+                        {
+                            key: value
+                            for key, value in tags.items()
+                            if key in mediatype.dateTags
+                        }
+                    )
+                except Exception:
+                    date = None
+                if date is not None:
+                    out[file] = date
+
+    for file in files:
+        if file not in out:
+            out[file] = getFileModifyDateFrom(file)
+
+    return out
+
+
+def _getDateTagsOf(
+    et: ExifToolHelper, files: dict[str, type[VideoFile] | type[AudioFile]]
+) -> dict[str, dict[str, str]]:
+    dateTags = list(dict.fromkeys(VideoFile.dateTags + AudioFile.dateTags))
+    try:
+        results = et.get_tags(list(files.keys()), dateTags)
+        if results is not None and len(results) == len(files):
+            return dict(zip(files.keys(), results))
+        # results can not be assigned to their files, so read one after another
+    except ExifToolExecuteError:
+        pass  # a single broken file fails the whole batch, so read one after another
+
+    out: dict[str, dict[str, str]] = {}
+    for file, mediatype in files.items():
+        try:
+            out[file] = et.get_tags(file, mediatype.dateTags)[0]
+        except (ExifToolExecuteError, IndexError):
+            logging.getLogger("MOW").warning(f"Could not read date tags of {file}")
+    return out
+
+
+def getDateTimeFileNameFor(
+    file: str, date: dt.datetime = None, withSubSeconds: bool = False
+) -> str:
+    """
+    date: capture date of file, if already known
+    withSubSeconds: appends the milliseconds to the timestamp (YYYY-MM-DD@HHMMSS.mmm_name), which keeps the order of burst shots within a second.
+    The timestamp itself stays in front, so the name is still recognized as renamed.
+    """
+    if date is None:
+        date = getMediaCreationDateFrom(file)
     prefixDate = date.strftime(timestampformat)
+    if withSubSeconds:
+        prefixDate += f".{date.microsecond // 1000:03d}"
     return os.path.join(
         os.path.dirname(file), prefixDate + "_" + os.path.basename(file)
     )
@@ -1,14 +1,18 @@
-from .mediafile import MediaFile
+from .mediafile import MediaFile, StemIndex
 from ..image.imagefile import ImageFile
 from ..video.videofile import VideoFile
 
 
-def createAnyValidMediaFile(path: str, fast_creation=False) -> MediaFile:
-    candidate: MediaFile = ImageFile(path, check_for_other_extensions=not fast_creation)
+def createAnyValidMediaFile(
+    path: str, fast_creation=False, stemIndex: StemIndex = None
+) -> MediaFile:
+    candidate: MediaFile = ImageFile(
+        path, check_for_other_extensions=not fast_creation, stemIndex=stemIndex
+    )
     if candidate.isValid():
         return candidate
 
-    candidate: MediaFile = VideoFile(path)
+    candidate: MediaFile = VideoFile(path, stemIndex=stemIndex)
     if candidate.isValid():
         return candidate
 
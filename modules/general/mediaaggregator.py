@@ -5,7 +5,7 @@ from pathlib import Path
 from os.path import basename, splitext
 from rich.progress import track
 
-from ..mow.mowtags import MowTag, MowTagFileManipulator, tags_all, tags_expected
+from ..mow.mowtags import MowTag, tags_all, tags_expected
 from .mediatransitioner import MediaTransitioner, TransitionTask, TransitionerInput
 from .mediagrouper import MediaGrouper
 from .filenamehelper import isCorrectTimestamp
@@ -13,6 +13,9 @@ from ..general.checkresult import CheckResult
 from ..general.mediafile import MediaFile
 
 
+COULD_NOT_PARSE_META_TAGS = "Could not parse meta tags"
+
+
 class MediaAggregator(MediaTransitioner):
     def __init__(self, input: TransitionerInput):
         super().__init__(input)
@@ -30,13 +33,25 @@ class MediaAggregator(MediaTransitioner):
         self.print_info("Collect file meta tags..")
         out: Dict[int, list[Dict[str, str]]] = {}
 
-        fm = MowTagFileManipulator()
+        prefetched = self.fm.read_tags_many(
+            [
+                file
+                for task in self.toTransition
+                for file in self.getAllTagRelevantFilenamesFor(self.toTreat[task.index])
+            ],
+            tags=tags_all,
+        )
 
         for task in track(self.toTransition):
             files = self.getAllTagRelevantFilenamesFor(self.toTreat[task.index])
             try:
                 tagdictlist: list[dict[MowTag, str]] = [
-                    fm.read_tags(file, tags=tags_all) for file in files
+                    (
+                        prefetched[Path(file)]
+                        if Path(file) in prefetched
+                        else self.fm.read_tags(file, tags=tags_all)
+                    )
+                    for file in files
                 ]
 
                 out[task.index] = [
@@ -55,7 +70,7 @@ class MediaAggregator(MediaTransitioner):
             except Exception as e:
                 out[task.index] = []
                 task.skip = True
-                task.skipReason = f"Could not parse meta tags: {e}"
+                task.skipReason = f"{COULD_NOT_PARSE_META_TAGS}: {e}"
 
         return out
 
@@ -67,6 +82,12 @@ class MediaAggregator(MediaTransitioner):
         self.setMetaTagsToWrite(indexToTags)
         self.deleteBasedOnRating(indexToTags)
 
+    def getSkipVerdictContext(self) -> str | None:
+        return f"src={self.src}"
+
+    def isCacheableSkipVerdict(self, task: TransitionTask) -> bool:
+        return not task.skipReason.startswith(COULD_NOT_PARSE_META_TAGS)
+
     def getTasks(self) -> list[TransitionTask]:
         self.prepareTransition()
         return self.toTransition
@@ -180,11 +201,7 @@ class MediaAggregator(MediaTransitioner):
             if task.skip:
                 continue
 
-            rating = (
-                task.metaTags[MowTag.rating]
-                if MowTag.rating in task.metaTags
-                else int(indexToTags[task.index][0][MowTag.rating])
-            )
+            rating = self.getRatingOf(task, indexToTags)
 
             if not (1 <= int(rating) <= 5):
                 task.skip = True
@@ -193,6 +210,15 @@ class MediaAggregator(MediaTransitioner):
 
             self.treatTaskBasedOnRating(task, int(rating))
 
+    def getRatingOf(
+        self, task: TransitionTask, indexToTags: dict[int, list[dict[MowTag, str]]]
+    ):
+        return (
+            task.metaTags[MowTag.rating]
+            if MowTag.rating in task.metaTags
+            else int(indexToTags[task.index][0][MowTag.rating])
+        )
+
     def treatTaskBasedOnRating(self, task: TransitionTask, rating: int):
         """
         rating: is between 1-5
@@ -152,8 +152,8 @@ class PassthroughConverter(MediaConverter):
     """
 
     def __init__(self, input: TransitionerInput, valid_extensions: list[str] = []):
-        input.mediaFileFactory = lambda path: MediaFile(
-            path, validExtensions=valid_extensions
+        input.mediaFileFactory = lambda path, stemIndex=None: MediaFile(
+            path, validExtensions=valid_extensions, stemIndex=stemIndex
         )
         input.writeMetaTagsToSidecar = False
         super().__init__(input)
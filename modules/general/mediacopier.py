@@ -1,18 +1,82 @@
+from dataclasses import dataclass
 import datetime
 import os
-from ..general.mediafile import MediaFile
+from pathlib import Path
+import threading
+from ..mow.mowtags import MowTag
+from ..general.mediafile import MediaFile, StemIndex
+from ..image.imagefile import ImageFile
+from ..video.videofile import VideoFile
 from ..general.mediatransitioner import TransitionTask
 from ..general.medafilefactories import createAnyValidMediaFile
 from ..general.mediatransitioner import TransitionerInput
 from ..general.mediatransitioner import MediaTransitioner
+from ..general.mediarenamer import MediaRenamer
+from ..general.filenamehelper import (
+    getDateTimeFileNameFor,
+    getMediaCreationDatesOf,
+    timestampformat,
+)
+from ..mow.mowfolder import get_mow_folder_of
+from ..mow.importledger import IMPORT_LEDGER_FILE_NAME, ImportLedger
+from ..mow.fsyncbatch import FsyncBatch
+from ..mow.filelinks import hardlink, is_on_same_filesystem, reflink
+from ..mow.deferredoriginals import (
+    DEFERRED_ORIGINALS_FILE_NAME,
+    DEFERRED_STASH_SETTING,
+    DeferredOriginals,
+    get_deferral_key_of,
+)
+from ..mow.sourcedateindex import SOURCE_DATE_INDEX_FILE_NAME, SourceDateIndex
+from ..mow.importmanifest import (
+    IMPORT_MANIFEST_FILE_NAME,
+    ImportManifest,
+    copy_and_hash,
+)
+
+
+@dataclass(kw_only=True)
+class CopierInput(TransitionerInput):
+    """
+    fusedRenameStage: name of the rename stage. If given, files are renamed while copying like the renamer of that stage would do and their
+    meta tags (date, source and stage history) are written into sidecars next to the copies, so dst has to be the stage after the rename stage.
+    Files that are already renamed are copied under their current name, which is taken as source of truth for their date.
+    subSecondNames: in fused rename mode, the timestamps of the new names contain milliseconds like those of the renamer with subSecondNames
+    since: if given, only mediafiles captured at or after this time are copied
+    until: if given, only mediafiles captured at or before this time are copied
+    linkFiles: if source and destination are on the same filesystem, files are reflinked or if that is not supported hardlinked instead of copied.
+    Hardlinks do not harm mow, as it never changes files in place (exiftool writes a new file), but the source must not be edited in place afterwards.
+    durable: copied files and their directories are synced to disk in batches, at the latest before they are marked as imported (ledger or '_LAST' marker)
+    deferOriginals: of images with a jpg only the jpg is copied, their raws and videos with the same name (e.g. of live photos) are recorded as deferred originals
+    in the mow folder instead. The image aggregator fetches them for images rated 4 or higher. If the settings contain a 'deferred_stash_dir', the originals
+    are copied there, otherwise they are fetched from the source, which has to be available then. Needs a working directory.
+    """
+
+    fusedRenameStage: str = None
+    subSecondNames: bool = False
+    since: datetime.datetime = None
+    until: datetime.datetime = None
+    linkFiles: bool = False
+    durable: bool = False
+    deferOriginals: bool = False
 
 
 class MediaCopier(MediaTransitioner):
     """
-    The first matching file ending with '_LAST' (including all of its extensions) will mark all following files as to be copied to the destination folder,
+    If the settings contain a working directory, the import ledger inside its mow folder decides what to copy: every mediafile with a file that
+    was not imported before is copied. A '_LAST' marker found on the first usage of the ledger marks all files up to it as imported and is removed.
+
+    Files are copied into temporary part files first, which are resumed by the next run if copying was interrupted.
+    Every copied file is hashed while copying and recorded in the import manifest inside the mow folder, so copies can be verified later on.
+
+    If a date range is given, only mediafiles captured within are copied. Their capture dates are kept in an index inside the mow folder, keyed by
+    the volume id of the source, so repeated imports from the same card do not read the dates again. The '_LAST' marker is not moved in that case.
+
+    Without working directory, the first matching file ending with '_LAST' (including all of its extensions) will mark all following files as to be copied to the destination folder,
     even if other files ending with '_LAST' are present later on.
     """
     LAST_MARKER = "_LAST"
+    supportsResume = False  # the _LAST marker is moved after every run
 
     def __init__(self, input: TransitionerInput):
         input.move = False
@@ -21,7 +85,40 @@ class MediaCopier(MediaTransitioner):
         input.mediaFileFactory = createAnyValidMediaFile
         super().__init__(input)
 
+        isCopierInput = isinstance(input, CopierInput)
+        self.fusedRenameStage = input.fusedRenameStage if isCopierInput else None
+        self.subSecondNames = input.subSecondNames if isCopierInput else False
+        self.since = input.since if isCopierInput else None
+        self.until = input.until if isCopierInput else None
+        self.linkFiles = input.linkFiles if isCopierInput else False
+        self.fsyncBatch = (
+            FsyncBatch() if isCopierInput and input.durable and not self.dry else None
+        )
+        self.creationDates: dict[str, datetime.datetime] = {}
+        self.deferOriginals = isCopierInput and input.deferOriginals
+        self.deferredOriginals: dict[int, list[str]] = {}
+        self.deferralDates: dict[int, datetime.datetime] = {}
+
         self.indexWithLAST = -1
+        mowFolder = get_mow_folder_of(self.settings)
+        self.ledger = (
+            ImportLedger(mowFolder / IMPORT_LEDGER_FILE_NAME)
+            if mowFolder is not None
+            else None
+        )
+        self.manifest = (
+            ImportManifest(mowFolder / IMPORT_MANIFEST_FILE_NAME)
+            if mowFolder is not None
+            else None
+        )
+        self.manifestEntries: list[dict] = []
+        self.manifestLock = threading.Lock()
+
+        if self.deferOriginals and mowFolder is None:
+            self.print_warning(
+                "Deferring originals needs a working directory, copy them as usual."
+            )
+            self.deferOriginals = False
 
     def _getModificationDate(self, mFile: MediaFile) -> datetime:
         return os.path.getmtime(str(mFile))
@@ -36,6 +133,13 @@ class MediaCopier(MediaTransitioner):
         self.toTreat = sorted(self.toTreat, key=self._getModificationDate)
         self.indexWithLAST = self.getIndexWithLast()
 
+        if self.ledger is not None:
+            return self.getRenamedTasksOf(
+                self.getDeferredTasksOf(
+                    self.getTasksInDateRangeOf(self.getTasksFromLedger())
+                )
+            )
+
         out = list(
             map(
                 lambda i: TransitionTask(i),
@@ -45,9 +149,317 @@ class MediaCopier(MediaTransitioner):
                 ),
             )
         )
+        return self.getRenamedTasksOf(self.getTasksInDateRangeOf(out))
+
+    def hasDateRange(self) -> bool:
+        return self.since is not None or self.until is not None
+
+    def getTasksInDateRangeOf(self, tasks: list[TransitionTask]) -> list[TransitionTask]:
+        if not self.hasDateRange():
+            return tasks
+
+        self.readCreationDatesOf([self.toTreat[task.index] for task in tasks])
+
+        out: list[TransitionTask] = []
+        for task in tasks:
+            mFile = self.toTreat[task.index]
+            date = self.creationDates.get(str(mFile))
+            if date is None:
+                out.append(
+                    TransitionTask.getFailed(task.index, "Could not read capture date.")
+                )
+                continue
+
+            if date.tzinfo is not None:
+                date = date.astimezone().replace(tzinfo=None)
+            if (self.since is None or self.since <= date) and (
+                self.until is None or date <= self.until
+            ):
+                out.append(task)
+
+        self.print_info(
+            f"Found {len(out)} of {len(tasks)} mediafiles captured within the given date range."
+        )
         return out
 
+    def readCreationDatesOf(self, mFiles: list[MediaFile]):
+        """
+        Reads the capture dates of mFiles into self.creationDates, using the source date index of the mow folder if available.
+        Dates already in self.creationDates are not read again.
+        """
+        mFiles = [mFile for mFile in mFiles if str(mFile) not in self.creationDates]
+        if len(mFiles) == 0:
+            return
+
+        mowFolder = get_mow_folder_of(self.settings)
+        index = (
+            SourceDateIndex(mowFolder / SOURCE_DATE_INDEX_FILE_NAME, self.src)
+            if mowFolder is not None
+            else None
+        )
+
+        files = [Path(str(mFile)) for mFile in mFiles]
+        known = index.get_many(files) if index is not None else {}
+        read: dict[Path, datetime.datetime] = {}
+        try:
+            read = {
+                Path(file): date
+                for file, date in getMediaCreationDatesOf(
+                    [str(file) for file in files if file not in known]
+                ).items()
+            }
+        except Exception as e:
+            self.print_debug(f"Could not read capture dates: {e}")
+
+        if index is not None:
+            index.put_many(read)
+            index.close()
+
+        for file, date in {**known, **read}.items():
+            self.creationDates[str(file)] = date
+
+    def getRenamedTasksOf(self, tasks: list[TransitionTask]) -> list[TransitionTask]:
+        """
+        In fused rename mode, sets the names and meta tags the renamer would give the mediafiles.
+        """
+        if self.fusedRenameStage is None:
+            return tasks
+
+        toRename = [
+            task
+            for task in tasks
+            if not task.skip
+            and not MediaRenamer.fileWasAlreadyRenamed(str(self.toTreat[task.index]))
+        ]
+        self.readCreationDatesOf([self.toTreat[task.index] for task in toRename])
+
+        self.print_info("Create new names for files..")
+        for task in tasks:
+            if task.skip:
+                continue
+
+            mFile = self.toTreat[task.index]
+            filename = os.path.basename(str(mFile))
+            if MediaRenamer.fileWasAlreadyRenamed(str(mFile)):
+                try:
+                    creationDate = datetime.datetime.strptime(
+                        filename[0:17], timestampformat
+                    )
+                except ValueError:
+                    task.skip = True
+                    task.skipReason = "File appears to be already renamed, but does not start with a timestamp. It is not imported."
+                    continue
+                task.newName = filename
+            else:
+                creationDate = self.creationDates.get(str(mFile))
+                if creationDate is None:
+                    task.skip = True
+                    task.skipReason = "Could not create new name: Could not read capture date."
+                    continue
+                task.newName = os.path.basename(
+                    getDateTimeFileNameFor(
+                        str(mFile), creationDate, withSubSeconds=self.subSecondNames
+                    )
+                )
+
+            task.metaTags = {
+                MowTag.date: creationDate.strftime("%Y:%m:%d %H:%M:%S"),
+                MowTag.source: filename,
+            }
+        return tasks
+
+    def getDeferredTasksOf(self, tasks: list[TransitionTask]) -> list[TransitionTask]:
+        """
+        In deferring mode, reduces all mediafiles with a jpg to the jpg. Their raws and videos with the same name are remembered as deferred originals.
+        As mediafiles are collected once per name, a video found instead of its jpg is replaced by the jpg.
+        """
+        if not self.deferOriginals:
+            return tasks
+
+        stemIndex = StemIndex()
+        for task in tasks:
+            mFile = self.toTreat[task.index]
+            if task.skip or MediaRenamer.fileWasAlreadyRenamed(
+                mFile.pathnoext
+            ):  # the renamer would not tag it
+                continue
+
+            extensions = stemIndex.extensionsOf(mFile.pathnoext)
+            jpgExtensions = [
+                ext for ext in extensions if ext in ImageFile.supportedJpgFormats
+            ]
+            if len(jpgExtensions) == 0:
+                continue
+            if not isinstance(mFile, ImageFile):
+                mFile = ImageFile(
+                    mFile.pathnoext + jpgExtensions[0], stemIndex=stemIndex
+                )
+                self.toTreat[task.index] = mFile
+
+            jpgExtension = os.path.splitext(mFile.getJpg())[1]
+            deferred = [
+                ext for ext in mFile.extensions if ext not in (jpgExtension, ".xmp")
+            ] + [ext for ext in extensions if ext in VideoFile.supportedFormats]
+            if len(deferred) == 0:
+                continue
+
+            self.deferredOriginals[task.index] = [
+                os.path.abspath(mFile.pathnoext + ext) for ext in deferred
+            ]
+            mFile.extensions = [jpgExtension] + (
+                [".xmp"] if mFile.has_sidecar() else []
+            )
+
+        self.readCreationDatesOf(
+            [self.toTreat[index] for index in self.deferredOriginals]
+        )
+        for task in tasks:
+            if task.index not in self.deferredOriginals:
+                continue
+            date = self.creationDates.get(str(self.toTreat[task.index]))
+            if date is None:
+                task.skip = True
+                task.skipReason = "Could not read capture date, which is needed to defer the originals."
+                del self.deferredOriginals[task.index]
+                continue
+            self.deferralDates[task.index] = date
+
+        self.print_info(
+            f"Defer {sum(len(files) for files in self.deferredOriginals.values())} originals of {len(self.deferredOriginals)} jpgs."
+        )
+        return tasks
+
+    def performTransitionOf(self, tasks: list[TransitionTask]):
+        super().performTransitionOf(tasks)
+
+        if self.fusedRenameStage is None or self.dry:
+            return
+
+        # meta tags are written into sidecars of the copies, so the source stays untouched
+        copied = self.getNonSkippedOf(tasks)
+        sources = list(self.toTreat)
+        for task in copied:
+            self.toTreat[task.index] = self.mediaFileFactory(self.getNewNameFor(task))
+
+        self.writeMetaTags = True
+        self.current_stage = self.fusedRenameStage
+        tagged = self.getSuccesfulChangedMetaTagTasksOf(copied)
+        for task in tagged:
+            if self.writeMetaTagsToSidecar:
+                self.addToFsyncBatch(str(self.toTreat[task.index].get_sidecar()))
+        for task in self.getSkippedOf(copied):
+            self.removeCopyOf(task)
+        self.toTreat = sources
+
+    def getSkippedOf(self, tasks: list[TransitionTask]) -> list[TransitionTask]:
+        return [task for task in tasks if task.skip]
+
+    def removeCopyOf(self, task: TransitionTask):
+        """
+        Removes the copy of a task whose meta tags could not be written, as an untagged copy would never be tagged later on.
+        The task is skipped, so it is neither recorded in the ledger nor in the manifest and copied again by the next run.
+        """
+        mFile = self.toTreat[task.index]
+        files = [str(file) for file in mFile.getAllFileNames()]
+        if os.path.exists(mFile.get_sidecar()):
+            files.append(str(mFile.get_sidecar()))
+        self.print_debug(f"Remove untagged copy {mFile}: {task.skipReason}")
+        for file in set(files):
+            try:
+                os.remove(file)
+            except OSError as e:
+                self.print_warning(f"Could not remove untagged copy {file}: {e}")
+
+        with self.manifestLock:
+            self.manifestEntries = [
+                entry for entry in self.manifestEntries if entry["target"] not in files
+            ]
+        if self.fsyncBatch is not None:
+            self.fsyncBatch.discard(files)
+
+    def getTasksFromLedger(self) -> list[TransitionTask]:
+        if self.indexWithLAST != -1 and self.ledger.is_empty():
+            self.print_info(
+                f"Import ledger is empty, take all files up to {self.toTreat[self.indexWithLAST]} as already imported."
+            )
+            if not self.dry:
+                self.ledger.add(
+                    [
+                        file
+                        for mFile in self.toTreat[: self.indexWithLAST + 1]
+                        for file in mFile.getAllFileNames()
+                    ]
+                )
+        else:
+            self.indexWithLAST = -1  # marker is not relevant anymore, it stays where it is
+
+        unknown = self.ledger.get_unknown(
+            [file for mFile in self.toTreat for file in mFile.getAllFileNames()]
+        )
+        self.print_info(
+            f"Found {len(unknown)} files not imported before in {len(self.toTreat)} mediafiles."
+        )
+
+        return [
+            TransitionTask(index)
+            for index, mFile in enumerate(self.toTreat)
+            if index > self.indexWithLAST
+            and any(file in unknown for file in mFile.getAllFileNames())
+        ]
+
+    def copySingleFile(self, src: str, dst: str):
+        if self.linkFiles and self.linkSingleFile(src, dst):
+            self.addToFsyncBatch(dst)
+            return  # linked files share their data with the source, so there is nothing to hash and verify
+
+        md5 = copy_and_hash(src, dst)
+        self.addToFsyncBatch(dst)
+        if self.manifest is None:
+            return
+
+        with self.manifestLock:
+            self.manifestEntries.append(
+                {
+                    "source": src,
+                    "target": os.path.abspath(dst),
+                    "size": os.path.getsize(dst),
+                    "md5": md5,
+                }
+            )
+
+    def addToFsyncBatch(self, file: str):
+        if self.fsyncBatch is not None:
+            self.fsyncBatch.add(file)
+
+    def linkSingleFile(self, src: str, dst: str) -> bool:
+        if not is_on_same_filesystem(src, os.path.dirname(dst)):
+            return False
+        if reflink(src, dst):
+            self.print_debug(f"Reflinked {src} to {dst}.")
+            return True
+        if hardlink(src, dst):
+            self.print_debug(f"Hardlinked {src} to {dst}.")
+            return True
+        return False
+
     def finalExecution(self):
+        if self.deferOriginals:
+            self.finishDeferredOriginals()
+
+        if self.fsyncBatch is not None:
+            self.print_info("Sync copied files to disk..")
+            self.fsyncBatch.flush()
+
+        if self.manifest is not None:
+            self.manifest.record(self.manifestEntries)
+
+        if self.ledger is not None:
+            self.finishLedger()
+            return
+
+        if self.hasDateRange():
+            return  # only a part was copied, so the marker stays where it is
+
         if self.indexWithLAST > -1:
             mFile = self.toTreat[self.indexWithLAST]
             newName = mFile.pathnoext
@@ -64,3 +476,73 @@ class MediaCopier(MediaTransitioner):
             self.print_info(f"Rename {mFile} to {newName}.")
             if not self.dry:
                 mFile.moveTo(newName)
+
+    def finishDeferredOriginals(self):
+        """
+        Records the deferred originals of all copied jpgs, after copying them into the stash dir if one is configured.
+        """
+        stash = self.settings.get(DEFERRED_STASH_SETTING) if self.settings else None
+        deferred: dict[str, list[str]] = {}
+        for task in self.getNonSkippedOf(self._toTransition):
+            if task.index not in self.deferredOriginals:
+                continue
+
+            files = self.deferredOriginals[task.index]
+            date = self.deferralDates[task.index]
+            if stash:
+                stashed = [
+                    os.path.join(
+                        os.path.abspath(stash),
+                        date.strftime(timestampformat) + "_" + os.path.basename(file),
+                    )
+                    for file in files
+                ]
+                for file, stashedFile in zip(files, stashed):
+                    self.print_debug(f"Stash {file} in {stashedFile}")
+                    if not self.dry:
+                        os.makedirs(os.path.dirname(stashedFile), exist_ok=True)
+                        copy_and_hash(file, stashedFile)
+                        self.addToFsyncBatch(stashedFile)
+                files = stashed
+            key = get_deferral_key_of(
+                self.toTreat[task.index].getJpg(), date.strftime("%Y:%m:%d %H:%M:%S")
+            )
+            deferred[key] = files
+
+        self.print_info(
+            f"Record {sum(len(files) for files in deferred.values())} deferred originals"
+            + (f" stashed in {stash}." if stash else " left on the source.")
+        )
+        if self.dry:
+            return
+
+        registry = DeferredOriginals(
+            get_mow_folder_of(self.settings) / DEFERRED_ORIGINALS_FILE_NAME
+        )
+        registry.put_many(deferred)
+        registry.close()
+
+    def finishLedger(self):
+        if not self.dry:
+            self.ledger.add(
+                [
+                    file
+                    for task in self._toTransition
+                    if not task.skip
+                    for file in self.toTreat[task.index].getAllFileNames()
+                ]
+                + [
+                    Path(file)
+                    for task in self._toTransition
+                    if not task.skip
+                    for file in self.deferredOriginals.get(task.index, [])
+                ]
+            )
+
+            if self.indexWithLAST > -1:
+                mFile = self.toTreat[self.indexWithLAST]
+                newName = mFile.pathnoext[: -len(self.LAST_MARKER)]
+                self.print_info(f"Rename {mFile} to {newName}.")
+                mFile.moveTo(newName)
+
+        self.ledger.close()
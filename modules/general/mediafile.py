@@ -6,13 +6,64 @@ import datetime as dt
 from pathlib import Path
 
 
+class StemIndex:
+    """
+    Index of the files of directories by their path without extension (stem), so that mediafiles can look up their sibling extensions and sidecars
+    without listing the directory or touching the disk for every single file. Each directory is listed at most once.
+    """
+
+    def __init__(self):
+        self._stemsOf: dict[str, dict[str, list[str]]] = {}
+        self._namesOf: dict[str, set[str]] = {}
+
+    def addDirectory(self, directory: str, filenames: list[str] = None):
+        """
+        filenames: names of the files in directory, e.g. as given by os.walk. If None, the directory is scanned once.
+        """
+        directory = os.path.abspath(directory)
+        if filenames is None:
+            with os.scandir(directory) as entries:
+                filenames = [entry.name for entry in entries if entry.is_file()]
+
+        stems: dict[str, list[str]] = {}
+        for filename in filenames:
+            stem, ext = os.path.splitext(filename)
+            stems.setdefault(stem, []).append(ext)
+
+        self._stemsOf[directory] = stems
+        self._namesOf[directory] = set(os.path.normcase(name) for name in filenames)
+
+    def extensionsOf(self, pathnoext: str) -> list[str]:
+        """
+        Returns the extensions of all files that share the given path without extension.
+        """
+        directory, stem = os.path.split(os.path.abspath(pathnoext))
+        return self._getStemsOf(directory).get(stem, [])
+
+    def exists(self, path: str) -> bool:
+        directory, name = os.path.split(os.path.abspath(path))
+        self._getStemsOf(directory)
+        return os.path.normcase(name) in self._namesOf.get(directory, set())
+
+    def _getStemsOf(self, directory: str) -> dict[str, list[str]]:
+        if directory not in self._stemsOf:
+            try:
+                self.addDirectory(directory)
+            except OSError:
+                return {}
+        return self._stemsOf[directory]
+
+
 class MediaFile:
     """
     Mediadata that can be represented by multiple files having different extensions but containing roughly the same media
     e.g. a jpeg-image and it's RAW-representation. Will always check for sidecar files.
     """
 
-    def __init__(self, path, validExtensions):
+    def __init__(self, path, validExtensions, stemIndex: StemIndex = None):
+        """
+        stemIndex: if given, existence of the file and its sidecar is looked up there instead of on disk
+        """
         self.valid = True
         self.extensions: list[str] = []
 
@@ -20,7 +71,9 @@ class MediaFile:
         self.pathnoext = splitted[0]
         self.extensions.append(splitted[1])
 
-        if not os.path.exists(path):
+        exists = os.path.exists if stemIndex is None else stemIndex.exists
+
+        if not exists(path):
             self.valid = False
             return
 
@@ -28,7 +81,7 @@ class MediaFile:
             self.valid = False
             return
 
-        if os.path.exists(self.get_sidecar()):
+        if exists(self.get_sidecar()):
             self.extensions.append(".xmp")
 
     def __str__(self):
@@ -39,8 +92,14 @@ class MediaFile:
     def isValid(self) -> bool:
         return self.valid
 
-    def _relocate(self, dst: str, relocateFunc: Callable[[str, str], str]) -> str:
-        os.makedirs(os.path.dirname(dst), exist_ok=True)
+    def _relocate(
+        self,
+        dst: str,
+        relocateFunc: Callable[[str, str], str],
+        createDirectory: bool = True,
+    ) -> str:
+        if createDirectory:
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
 
         newBaseName = os.path.splitext(dst)[0]
         for ext in self.extensions:
@@ -48,21 +107,29 @@ class MediaFile:
 
         return newBaseName
 
-    def moveTo(self, dst: str):
+    def moveTo(self, dst: str, createDirectory: bool = True):
         """
         dst : fullpath of new file. Extension will be ignored. After the operation the objects points to the new location.
+        createDirectory : if False, the directory of dst has to exist already
         """
         self.relocationSanityCheck(pathNoExt=self.pathnoext)
 
-        self.pathnoext = self._relocate(dst, move)
+        self.pathnoext = self._relocate(dst, move, createDirectory)
 
         self.relocationSanityCheck(pathNoExt=self.pathnoext)
 
-    def copyTo(self, dst: str) -> str:
+    def copyTo(
+        self,
+        dst: str,
+        createDirectory: bool = True,
+        copyFunc: Callable[[str, str], None] = copyfile,
+    ) -> str:
         """
         dst : fullpath of new file. Extension will be ignored. Returns new path as string.
+        createDirectory : if False, the directory of dst has to exist already
+        copyFunc : copies a single file from its first to its second argument
         """
-        newBaseName = self._relocate(dst, copyfile)
+        newBaseName = self._relocate(dst, copyFunc, createDirectory)
 
         self.relocationSanityCheck(pathNoExt=self.pathnoext)
         self.relocationSanityCheck(pathNoExt=os.path.splitext(dst)[0])
@@ -139,15 +139,23 @@ class MediaGrouper(MediaTransitioner):
 
     def groupByXmp(self):
         fileToGroup: dict[MediaFile, str] = {}
-        for mediaFile in track(self.toTreat):
-            relative_subfolders = (
-                Path(mediaFile.getAllFileNames()[0]).relative_to(self.src).parents
-            )
-            # treat only files in the root folder
-            if len(relative_subfolders) > 1:
-                continue
-            desc = self.fm.read_tags(
-                mediaFile.getAllFileNames()[0], [MowTag.description]
+        # treat only files in the root folder
+        rootFiles = [
+            mediaFile
+            for mediaFile in self.toTreat
+            if len(Path(mediaFile.getAllFileNames()[0]).relative_to(self.src).parents)
+            <= 1
+        ]
+        descriptions = self.fm.read_tags_many(
+            [mediaFile.getAllFileNames()[0] for mediaFile in rootFiles],
+            [MowTag.description],
+        )
+        for mediaFile in track(rootFiles):
+            file = mediaFile.getAllFileNames()[0]
+            desc = (
+                descriptions[file]
+                if file in descriptions
+                else self.fm.read_tags(file, [MowTag.description])
             )
             if MowTag.description in desc and desc[MowTag.description] != "":
                 groupname = desc[MowTag.description]
@@ -161,6 +169,17 @@ class MediaGrouper(MediaTransitioner):
             for file, groupname in fileToGroup.items():
                 file.moveTo(join(self.src, groupname, basename(str(file))))
 
+    def getSkipVerdictContext(self) -> str | None:
+        helperModes = [
+            self.input.undoAutomatedGrouping,
+            self.input.automaticGrouping,
+            self.input.addMissingTimestampsToSubfolders,
+            self.input.checkSequence,
+            self.input.groupByXmp,
+        ]
+        # only the verdicts of the normal transition depend on nothing but the path of the files
+        return None if any(helperModes) else f"src={self.src}"
+
     def getTasks(self) -> list[TransitionTask]:
         self.prepareTransition()
         return self.toTransition
@@ -14,6 +14,7 @@ from ..general.mediafile import MediaFile
 from ..general.filenamehelper import extractDatetimeFromFileName
 from ..mow.mowtags import MowTag, tags_gps_all
 from ..general.medafilefactories import createAnyValidMediaFile
+from ..video.videofile import VideoFile
 from .mediatransitioner import MediaTransitioner, TransitionTask, TransitionerInput
 
 INTERNAL_BASE_TIMEZONE = "UTC"
@@ -71,6 +72,7 @@ class LocalizerInput(BaseLocalizerInput, TransitionerInput):
     gps_time_tolerance: timedelta, time tolerance for gps data. If no gps data is found within this time range, no gps data will be inserted into the media file.
     mediafile_timezone: str, timezone of the mediafiles. This is used to convert the mediafiles time to the gps time. The mediafile time is taken from the filename, so no metainformation is taken into account (e.g. from Date Time UTC-Flag in JPGs) If the timezone is not given, the timezone "Europe/Berlin" is used.
     force_gps_data: GpsData, if given, this gps data will be inserted into every media file. In this case, all files will be transitioned.
+    Videos that recorded their own position (e.g. taken by a phone) get this position instead of one of the gps tracks.
     transition_even_if_no_gps_data: bool, if true, the mediafile will be transitioned even if no gps data was found. In this case, the mediafile will be transitioned without gps data.
     """
 
@@ -119,6 +121,18 @@ class MediaLocalizer(MediaTransitioner):
                     )
                     continue
 
+                gps_data = self.getEmbeddedGpsDataOf(mediafile)
+                if gps_data is not None:
+                    self.print_debug(
+                        f"Found GPS data embedded into {os.path.basename(mediafile.pathnoext)} : {gps_data}."
+                    )
+                    out.append(
+                        TransitionTask(
+                            index, metaTags=gps_data.getGPSMetaTagsForWriting()
+                        )
+                    )
+                    continue
+
                 mediafile_time = extractDatetimeFromFileName(mediafile.pathnoext)
                 gps_data = self.getGpsDataForTime(mediafile_time)
 
@@ -158,6 +172,19 @@ class MediaLocalizer(MediaTransitioner):
 
         return out
 
+    def getEmbeddedGpsDataOf(self, mediafile: MediaFile) -> GpsData | None:
+        """
+        Returns the position a video recorded itself, read directly from its movie header, or None if it has none.
+        """
+        for extension in mediafile.extensions:
+            if extension not in VideoFile.supportedFormats:
+                continue
+            position = VideoFile(mediafile.pathnoext + extension).readGpsPosition()
+            if position is not None:
+                lat, lon, elev = position
+                return GpsData(lat=lat, lon=lon, elev=elev if elev is not None else 0)
+        return None
+
     def createMapWithMediafiles(self, tasks: list[TransitionTask]):
         fileWithPosition: list[tuple[MediaFile, tuple[float, float]]] = []
 
@@ -15,6 +15,8 @@ from ..video.videofile import (
 
 import traceback
 
+COULD_NOT_READ_RATING = "Problem during reading rating from meta tags"
+
 
 class MediaRater(MediaTransitioner):
     """
@@ -32,12 +34,21 @@ class MediaRater(MediaTransitioner):
         super().__init__(input)
         self.overrulingfiletype = overrulingfiletype
         self.enforced_rating = enforced_rating
+        self.prefetchedRatings: dict[Path, dict[MowTag, int]] = {}
+
+    def getSkipVerdictContext(self) -> str | None:
+        return f"overrulingfiletype={self.overrulingfiletype},enforced_rating={self.enforced_rating}"
+
+    def isCacheableSkipVerdict(self, task: TransitionTask) -> bool:
+        return not task.skipReason.startswith(COULD_NOT_READ_RATING)
 
     def getTasks(self) -> list[TransitionTask]:
         self.print_info("Check every file for rating..")
 
         out: list[TransitionTask] = []
 
+        self.prefetchRatings()
+
         for index, file in track(enumerate(self.toTreat), total=len(self.toTreat)):
             out.append(self.getTransitionTask(index, file))
 
@@ -101,16 +112,38 @@ class MediaRater(MediaTransitioner):
             stacktrace = traceback.format_exc()
             return TransitionTask.getFailed(
                 index,
-                f"Problem during reading rating from meta tags: {e}, stacktrace: {stacktrace}",
+                f"{COULD_NOT_READ_RATING}: {e}, stacktrace: {stacktrace}",
             )
 
+    def prefetchRatings(self):
+        """
+        Reads the ratings of all files relevant for rating with as few exiftool calls as possible.
+        """
+        self.prefetchedRatings = {}
+
+        if self.enforced_rating and self.enforced_rating in range(1, 6):
+            return
+
+        files = []
+        for file in self.toTreat:
+            if isinstance(file, VideoFile):
+                continue
+            files += (
+                [file.get_sidecar()] if file.has_sidecar() else file.getAllFileNames()
+            )
+
+        self.prefetchedRatings = self.fm.read_tags_many(files, tags=[MowTag.rating])
+
     def get_ratings_from(self, file: MediaFile) -> dict[Path, int]:
 
         if file.has_sidecar():
+            sidecar = file.get_sidecar()
             ratings = {
-                file.get_sidecar(): value
-                for _, value in self.fm.read_from_sidecar(
-                    file, tags=[MowTag.rating]
+                sidecar: value
+                for _, value in (
+                    self.prefetchedRatings[sidecar]
+                    if sidecar in self.prefetchedRatings
+                    else self.fm.read_from_sidecar(file, tags=[MowTag.rating])
                 ).items()
             }
             return ratings
@@ -118,7 +151,11 @@ class MediaRater(MediaTransitioner):
         ratings = {
             _file: value
             for _file in file.getAllFileNames()
-            for _, value in self.fm.read_tags(_file, tags=[MowTag.rating]).items()
+            for _, value in (
+                self.prefetchedRatings[_file]
+                if _file in self.prefetchedRatings
+                else self.fm.read_tags(_file, tags=[MowTag.rating])
+            ).items()
         }
 
         return ratings
@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from functools import partial
 import os
 from os.path import join
 from typing import Callable, Tuple
@@ -10,7 +11,11 @@ from modules.mow.mowtags import MowTag
 
 from .mediatransitioner import MediaTransitioner, TransitionerInput, TransitionTask
 
-from .filenamehelper import getMediaCreationDateFrom, timestampformat
+from .filenamehelper import (
+    getMediaCreationDateFrom,
+    getMediaCreationDatesOf,
+    timestampformat,
+)
 from rich.progress import track
 
 
@@ -26,12 +31,14 @@ class RenamerInput(TransitionerInput):
     dry: don't actually rename files
     writeMetaTags: sets XMP:Source to original filename and XMP:date to creationDate
     replace: a string such as '"^[0-9].*$",""', where the part before the comma is a regex that every file will be search after and the second part is how matches should be replaced. If given will just rename mediafiles without transitioning them to next stage.
+    subSecondNames: the filerenamer is called with withSubSeconds=True, so the timestamps of the new names contain milliseconds
     """
 
     restoreOldNames: bool = False
-    filerenamer: Callable[[str], str] = None
+    filerenamer: Callable[[str, datetime], str] = None
     useCurrentFilename: bool = False
     replace: str = ""
+    subSecondNames: bool = False
 
 
 class MediaRenamer(MediaTransitioner):
@@ -56,6 +63,12 @@ class MediaRenamer(MediaTransitioner):
 
         self.replace: str = input.replace
         self.transitionTasks: list[TransitionTask] = []
+        self.creationDates: dict[str, datetime] = {}
+        self.filerenamer = (
+            partial(input.filerenamer, withSubSeconds=True)
+            if input.subSecondNames
+            else input.filerenamer
+        )
 
         self.replace = self.initReplace(input.replace)
 
@@ -109,13 +122,32 @@ class MediaRenamer(MediaTransitioner):
                     filename[0:17], timestampformat
                 ).strftime("%Y:%m:%d %H:%M:%S")
             else:
-                creationDate = getMediaCreationDateFrom(str(mediafile)).strftime(
-                    "%Y:%m:%d %H:%M:%S"
-                )
+                creationDate = (
+                    self.creationDates[str(mediafile)]
+                    if str(mediafile) in self.creationDates
+                    else getMediaCreationDateFrom(str(mediafile))
+                ).strftime("%Y:%m:%d %H:%M:%S")
 
             task.metaTags = {MowTag.date: creationDate, MowTag.source: filename}
 
+    def readCreationDates(self):
+        """
+        Reads the capture dates of all files to rename at once, which is much faster for videos than reading them one by one.
+        """
+        if self.input.restoreOldNames or self.input.useCurrentFilename:
+            return
+
+        self.print_info("Read capture dates of files..")
+        self.creationDates = getMediaCreationDatesOf(
+            [
+                str(file)
+                for file in self.toTreat
+                if not self.fileWasAlreadyRenamed(str(file))
+            ]
+        )
+
     def createNewNames(self):
+        self.readCreationDates()
         self.print_info("Create new names for files..")
 
         for index, file in track(
@@ -155,9 +187,15 @@ class MediaRenamer(MediaTransitioner):
         if self.input.useCurrentFilename:
             return os.path.basename(file), None
 
-        return os.path.basename(self.input.filerenamer(file)), None
+        return (
+            os.path.basename(
+                self.filerenamer(file, self.creationDates.get(file))
+            ),
+            None,
+        )
 
-    def fileWasAlreadyRenamed(self, file: str):
+    @staticmethod
+    def fileWasAlreadyRenamed(file: str):
         if "_" in os.path.basename(file) and "@" in os.path.basename(file):
             return True
         return False
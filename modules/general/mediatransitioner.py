@@ -1,10 +1,12 @@
 from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass, field
 import os
 from os.path import join, basename
 from pathlib import Path
-from shutil import move
+from shutil import copyfile, move
 import sys
+import threading
 import traceback
 from typing import Dict, Callable
 from math import sqrt
@@ -13,12 +15,23 @@ from rich.progress import track
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
 
-from modules.mow.mowtags import MowTag, MowTagFileManipulator
-from modules.general.mediafile import MediaFile
+from modules.mow.mowtags import MowTag, MowTagFileManipulator, tags_all
+from modules.mow.mowfolder import get_mow_folder_of
+from modules.mow.tagcache import TAG_CACHE_FILE_NAME
+from modules.mow.skipverdictcache import SKIP_VERDICT_CACHE_FILE_NAME, SkipVerdictCache
+from modules.mow.transitionjournal import (
+    JOURNAL_FOLDER_NAME,
+    RELOCATED,
+    TAGGED,
+    TransitionJournal,
+)
+from modules.general.mediafile import MediaFile, StemIndex
 from modules.general.verboseprinterclass import VerbosePrinterClass
 
 DELETE_FOLDER_NAME = "_deleted"
 
+claimLock = threading.Lock()  # guards target claims shared by transitioners running concurrently
+
 
 @dataclass
 class TransitionTask:
@@ -29,6 +42,7 @@ class TransitionTask:
     skipReason: reason for skipping transition
     rewriteMetaTagsOnConverted: a transition can include a conversion, which should rewrite the meta tags of the file
     metaTags: dict with meta-tag-key : value entries to set to file
+    metaTagsWritten: meta tags were already written by an interrupted run that is resumed
     """
 
     index: int
@@ -36,6 +50,7 @@ class TransitionTask:
     skip: bool = False
     skipReason: str = None
     metaTags: dict[MowTag, str] = field(default_factory=dict)
+    metaTagsWritten: bool = False
 
     def getFailed(index: int, reason: str) -> "TransitionTask":
         return TransitionTask(index=index, skip=True, skipReason=reason)
@@ -48,7 +63,7 @@ class TransitionerInput:
     dst : directory where renamed files should be placed
     move : move files otherwise copy them
     recursive : if true, dives into every subdir to look for files
-    mediaFileFactory: factory to create Mediafiles
+    mediaFileFactory: factory to create Mediafiles, is called with the path and the keyword argument stemIndex (see StemIndex)
     dry: don't execute actual transition
     maintainFolderStructure: copy nested folders iff true
     removeEmptySubfolders: clean empty subfolders of source after transition
@@ -58,6 +73,12 @@ class TransitionerInput:
     rewriteMetaTagsOnConverted: a transition can include a conversion, which should rewrite the meta tags of the converted file (copying the meta tags of the original file). If converter is None, this option is ignored.
     converter: function to convert files, if None, no conversion is done. Signature: (file to convert, target directory, settings) -> converted file (possibly with different extensions AND name, if transition Task has diffent "newName" specified)
     settings: contains settings given in the .mowsettings-file, such as copy_source_dir, working_dir, etc.
+    nr_exiftool_processes: number of exiftool processes used for reading and writing meta tags of many files
+    transitionChunkSize: if > 0, tasks are tagged and relocated in chunks of this size, relocating one chunk while tagging the next
+    resume: continue the interrupted run recorded in the journal of this transitioner instead of collecting files and creating tasks anew
+    nr_relocation_threads: number of files moved or copied concurrently, helps a lot on network drives
+    claimedTargets: targets claimed by all transitioners running concurrently into the same destination; if given, a task whose target is claimed already is skipped
+    showProgress: shows progress bars while tagging and relocating; must be False if the transitioner does not run in the main thread, as there can only be one progress bar at a time
     """
 
     src: str
@@ -88,6 +109,14 @@ class TransitionerInput:
     nr_processes_for_conversion: int = (
         1  # 0 = unrestricted, 1 = one process , 2 = two processes etc
     )
+    nr_exiftool_processes: int = (
+        1  # number of exiftool processes reading and writing meta tags concurrently, 0 = one per cpu
+    )
+    transitionChunkSize: int = 0  # 0 = all tasks are tagged before the first one is relocated
+    resume: bool = False
+    nr_relocation_threads: int = 1
+    claimedTargets: set[str] = None
+    showProgress: bool = True
     settings: dict[str, str] = field(default_factory=dict)
 
 
@@ -96,6 +125,8 @@ class MediaTransitioner(VerbosePrinterClass):
     Abstract class for transitioning a certain mediafiletype into the next stage.
     """
 
+    supportsResume = True  # False for transitioners whose run does more than relocating the planned tasks, so they cannot be resumed from a journal
+
     # TODO: find a good solution to the problem that there is much duplication involved in copying over the input parameters to the class attributes.
     # Possible solutions:
     # 1. Use a dataclass for the input parameters and copy them over to the class attributes in the __init__ method by iterating over the fields of the dataclass. Problem: linter won't recognize the attributes of the class as they are not defined in the class itself.
@@ -113,6 +144,13 @@ class MediaTransitioner(VerbosePrinterClass):
         self.mediaFileFactory = input.mediaFileFactory
         self.converter = input.converter
         self.nr_processes_for_conversion = input.nr_processes_for_conversion
+        self.nr_exiftool_processes = input.nr_exiftool_processes
+        self.transitionChunkSize = input.transitionChunkSize
+        self.resume = input.resume
+        self.nr_relocation_threads = max(1, input.nr_relocation_threads)
+        self.claimedTargets = input.claimedTargets
+        self.journalKeyOfPartiallyMoved: dict[int, str] = {}
+        self.showProgress = input.showProgress
         self.rewriteMetaTagsOnConverted = input.rewriteMetaTagsOnConverted
         self.maintainFolderStructure = input.maintainFolderStructure
         self.removeEmptySubfolders = input.removeEmptySubfolders
@@ -126,11 +164,13 @@ class MediaTransitioner(VerbosePrinterClass):
         self.settings = input.settings
 
         self.toTreat: list[MediaFile] = []
+        self.mediaFilesToTreat: list[MediaFile] = None  # if set (see CompositeTransitioner), src is not walked again
         self.deleteFolder = join(self.src, DELETE_FOLDER_NAME)
 
         self._performedTransition = False
         self._toTransition: list[TransitionTask] = []
-        self.fm = MowTagFileManipulator()
+        self.fm = self.createTagFileManipulator()
+        self.journal = self.createJournal()
 
     def __call__(self):
         self.print_info(f"Start transition from source {self.src} into {self.dst}")
@@ -140,9 +180,13 @@ class MediaTransitioner(VerbosePrinterClass):
             )
 
         self.createDestinationDir()
-        self.toTreat = self.collectMediaFilesToTreat()
 
-        self._toTransition = self.getTasks()
+        self._toTransition = self.getResumedTasks() if self.resume else None
+        if self._toTransition is None:
+            self.toTreat = self.collectMediaFilesToTreat()
+            self._toTransition = self.getTasksUsingSkipVerdictCache()
+            self.startJournalOf(self._toTransition)
+
         self.performTransitionOf(self._toTransition)
         self.printSkipped(self._toTransition)
         self._performedTransition = True
@@ -150,11 +194,210 @@ class MediaTransitioner(VerbosePrinterClass):
         self.optionallyRemoveEmptyFolders()
         self.finalExecution()
 
-        self.fm.et.terminate()  # in order to avoid usage of destructor for that
+        if self.journal is not None:
+            self.journal.finish()
+        self.fm.close()  # in order to avoid usage of destructor for that
+
+    def createTagFileManipulator(self) -> MowTagFileManipulator:
+        """
+        Caches read tags in the mow folder of the working directory, if the settings contain one.
+        """
+        mowFolder = get_mow_folder_of(self.settings)
+        return MowTagFileManipulator(
+            cache_file=(
+                mowFolder / TAG_CACHE_FILE_NAME if mowFolder is not None else None
+            ),
+            nr_exiftool_processes=self.nr_exiftool_processes,
+        )
 
     def finalExecution(self):
         pass
 
+    def getSkipVerdictContext(self) -> str | None:
+        """
+        Transitioners whose skip verdicts in getTasks depend on nothing but the files of the single mediafiles and the returned context (e.g. command line options)
+        return a context here, which enables caching their verdicts: unchanged mediafiles that were skipped before are not evaluated again. None disables the cache.
+        """
+        return None
+
+    def isCacheableSkipVerdict(self, task: TransitionTask) -> bool:
+        """
+        Override to exclude skip verdicts based on transient errors from caching.
+        """
+        return True
+
+    def getTasksUsingSkipVerdictCache(self) -> list[TransitionTask]:
+        context = self.getSkipVerdictContext()
+        mowFolder = get_mow_folder_of(self.settings)
+        if context is None or mowFolder is None:
+            return self.getTasks()
+
+        cache = SkipVerdictCache(
+            mowFolder / SKIP_VERDICT_CACHE_FILE_NAME,
+            context=f"{type(self).__name__}:{context}",
+        )
+
+        fingerprints = {
+            str(mFile): cache.fingerprint_of(mFile.getAllFileNames())
+            for mFile in self.toTreat
+        }
+        cachedReasons = cache.get_many(fingerprints)
+        cachedSkipped = [m for m in self.toTreat if str(m) in cachedReasons]
+        self.toTreat = [m for m in self.toTreat if str(m) not in cachedReasons]
+        if len(cachedSkipped) > 0:
+            self.print_info(
+                f"Skip {len(cachedSkipped)} unchanged mediafiles that were skipped by a previous run."
+            )
+
+        # getTasks may reorder the mediafiles or even change their files, so they are identified by the objects themselves
+        keyOf = {id(mFile): str(mFile) for mFile in self.toTreat}
+
+        tasks = self.getTasks()
+
+        skipped: dict[str, tuple[str, str]] = {}
+        passed: list[str] = []
+        for task in tasks:
+            mFile = self.toTreat[task.index]
+            key = keyOf.get(id(mFile))
+            if key is None:
+                continue
+            if not task.skip:
+                passed.append(key)
+            elif self.isCacheableSkipVerdict(task) and fingerprints[
+                key
+            ] == cache.fingerprint_of(mFile.getAllFileNames()):
+                skipped[key] = (fingerprints[key], task.skipReason)
+        cache.update(skipped, passed)
+        cache.close()
+
+        for mFile in cachedSkipped:
+            self.toTreat.append(mFile)
+            tasks.append(
+                TransitionTask.getFailed(len(self.toTreat) - 1, cachedReasons[str(mFile)])
+            )
+
+        return tasks
+
+    def createJournal(self) -> TransitionJournal:
+        """
+        Journals are kept for relocating transitioners only and only if there is a working directory to store them in.
+        """
+        mowFolder = get_mow_folder_of(self.settings)
+        if (
+            mowFolder is None
+            or self.dry
+            or self.converter is not None
+            or not self.supportsResume
+        ):
+            return None
+
+        return TransitionJournal(
+            mowFolder
+            / JOURNAL_FOLDER_NAME
+            / f"{self.current_stage}_{type(self).__name__}.jsonl"
+        )
+
+    def startJournalOf(self, tasks: list[TransitionTask]):
+        if self.journal is None:
+            return
+
+        if self.journal.exists():
+            self.print_warning(
+                "Found the journal of an interrupted run, which is discarded now. Use --resume to continue an interrupted run."
+            )
+
+        self.journal.start(
+            [
+                {
+                    "file": self.getJournalKeyOf(task),
+                    "newName": task.newName,
+                    "metaTags": {tag.value: value for tag, value in task.metaTags.items()},
+                }
+                for task in self.getNonSkippedOf(tasks)
+            ]
+        )
+
+    def getResumedTasks(self) -> list[TransitionTask] | None:
+        """
+        Recreates the tasks of the interrupted run from the journal, leaving out all files that were already relocated.
+        Returns None if there is nothing to resume.
+        """
+        if self.journal is None or not self.journal.exists():
+            self.print_info("Found no interrupted run to resume, start a new one.")
+            return None
+
+        plannedTasks, tagged, relocated = self.journal.read()
+
+        stemIndex = StemIndex()
+        tasks: list[TransitionTask] = []
+        self.toTreat = []
+        self.journalKeyOfPartiallyMoved = {}
+        for planned in plannedTasks:
+            if planned["file"] in relocated:
+                continue
+
+            mFile = self.mediaFileFactory(planned["file"], stemIndex=stemIndex)
+            partiallyMoved = not mFile.isValid()
+            if partiallyMoved:
+                mFile = self.getRemainderOf(planned["file"], stemIndex)
+                if mFile is None:
+                    self.print_warning(
+                        f"Planned file {planned['file']} does not exist anymore, skip it."
+                    )
+                    continue
+                self.print_info(
+                    f"Planned file {planned['file']} was moved partially, move the remaining {mFile.getDescriptiveBasenames()} as well."
+                )
+                self.journalKeyOfPartiallyMoved[len(self.toTreat)] = planned["file"]
+
+            self.toTreat.append(mFile)
+            tasks.append(
+                TransitionTask(
+                    index=len(self.toTreat) - 1,
+                    newName=planned["newName"],
+                    metaTags={
+                        MowTag(tag): value for tag, value in planned["metaTags"].items()
+                    },
+                    # files are relocated only after they were tagged
+                    metaTagsWritten=planned["file"] in tagged or partiallyMoved,
+                )
+            )
+
+        self.print_info(
+            f"Resume interrupted run: {len(relocated)} of {len(plannedTasks)} mediafiles were already transitioned, {len(tasks)} remain."
+        )
+        self.journal.reopen()
+        return tasks
+
+    def getRemainderOf(self, file: str, stemIndex: StemIndex) -> MediaFile | None:
+        """
+        Returns the files left in place of the mediafile of file, whose first file was moved by an interrupted run, or None if none are left.
+        """
+        pathnoext = os.path.splitext(file)[0]
+        extensions = stemIndex.extensionsOf(pathnoext)
+        for ext in extensions:
+            mFile = self.mediaFileFactory(pathnoext + ext, stemIndex=stemIndex)
+            if mFile.isValid():
+                return mFile
+
+        if ".xmp" not in extensions:
+            return None
+        sidecar = MediaFile(pathnoext + ".xmp", [".xmp"], stemIndex=stemIndex)
+        sidecar.extensions = [".xmp"]  # the sidecar is not its own sidecar
+        return sidecar
+
+    def getJournalKeyOf(self, task: TransitionTask) -> str:
+        """
+        Only valid before the task is relocated.
+        """
+        if task.index in self.journalKeyOfPartiallyMoved:
+            return self.journalKeyOfPartiallyMoved[task.index]
+        return str(self.toTreat[task.index])
+
+    def recordInJournal(self, state: str, tasks: list[TransitionTask]):
+        if self.journal is not None:
+            self.journal.record(state, [self.getJournalKeyOf(task) for task in tasks])
+
     def createDestinationDir(self):
         if os.path.isdir(self.dst):
             return
@@ -162,17 +405,34 @@ class MediaTransitioner(VerbosePrinterClass):
         self.print_debug(f"Created dir {self.dst}")
 
     def collectMediaFilesToTreat(self) -> list[MediaFile]:
-        out: list[MediaFile] = []
+        if self.mediaFilesToTreat is not None:
+            self.print_info(f"Take {len(self.mediaFilesToTreat)} collected files.")
+            return self.mediaFilesToTreat
+
+        return self.collectMediaFilesOf([self.mediaFileFactory])[0]
+
+    def collectMediaFilesOf(
+        self,
+        mediaFileFactories: list[Callable[..., MediaFile]],
+        listing: list[tuple[str, list[str]]] = None,
+    ) -> list[list[MediaFile]]:
+        """
+        Walks src once and returns the mediafiles created by every factory, in the order of the factories.
+        A file may be part of the mediafiles of several factories, e.g. if a video and an image share their name.
+        listing: files of src as returned by listSourceFiles, taken instead of walking src if given
+        """
+        out: list[list[MediaFile]] = [[] for _ in mediaFileFactories]
 
         self.print_info("Collect files..")
+        if listing is None:
+            listing = self.listSourceFiles()
 
-        already_found_files = set()
+        already_found_files = [set() for _ in mediaFileFactories]
+        stemIndex = StemIndex()
 
-        for root, dirs, files in os.walk(self.src, topdown=True):
-            if not self.recursive and root != self.src:
-                return out
-            # ignore all files in deleteFolder
-            dirs[:] = [d for d in dirs if d != basename(self.deleteFolder)]
+        for root, files in listing:
+            # siblings and sidecars of the files are looked up in this listing instead of listing the folder for every file
+            stemIndex.addDirectory(root, files)
 
             filtermatches = 0
             for file in files:
@@ -184,23 +444,39 @@ class MediaTransitioner(VerbosePrinterClass):
                     else:
                         filtermatches += 1
 
-                mfile = self.mediaFileFactory(str(path))
-                if not mfile.isValid():
-                    continue
+                for factory, found, collected in zip(
+                    mediaFileFactories, already_found_files, out
+                ):
+                    mfile = factory(str(path), stemIndex=stemIndex)
+                    if not mfile.isValid():
+                        continue
 
-                if mfile.pathnoext in already_found_files:
-                    continue
+                    if mfile.pathnoext in found:
+                        continue
 
-                already_found_files.add(mfile.pathnoext)
-                out.append(mfile)
+                    found.add(mfile.pathnoext)
+                    collected.append(mfile)
 
             if self.filter is not None and filtermatches > 0:
                 self.print_info(f"Matched files in {root} {'.'*filtermatches}")
 
-        self.print_info(f"Collected {len(out)} files.")
+        self.print_info(f"Collected {sum(len(collected) for collected in out)} files.")
 
         return out
 
+    def listSourceFiles(self) -> list[tuple[str, list[str]]]:
+        """
+        Walks src and returns every folder with the names of the files it contains, skipping the delete folder.
+        """
+        listing: list[tuple[str, list[str]]] = []
+        for root, dirs, files in os.walk(self.src, topdown=True):
+            if not self.recursive and root != self.src:
+                break
+            # ignore all files in deleteFolder
+            dirs[:] = [d for d in dirs if d != basename(self.deleteFolder)]
+            listing.append((root, files))
+        return listing
+
     def getTargetDirectory(self, file: str, destinationFolder: str) -> str:
         if self.maintainFolderStructure:
             return join(
@@ -225,24 +501,97 @@ class MediaTransitioner(VerbosePrinterClass):
         self.print_info(f"Perform transition of {len(tasks)} mediafiles.. ")
 
         tasks = self.getNonSkippedOf(tasks)
+
+        if 0 < self.transitionChunkSize < len(tasks):
+            self.performChunkedTransitionOf(tasks)
+            return
+
         tasks = self.getNonOverwritingTasksOf(tasks)
+        if self.claimedTargets is not None:
+            tasks = self.getNonClaimedTasksOf(tasks, self.claimedTargets)
         tasks = self.getSuccesfulChangedMetaTagTasksOf(tasks)
 
         self.print_info(f"Start transition of {len(tasks)} mediafiles..")
         if self.converter is None:
-            self.doRelocationOf(tasks)
+            self.doRelocationOf(tasks, self.showProgress)
         else:
             self.doConversionOf(tasks)
 
+    def performChunkedTransitionOf(self, tasks: list[TransitionTask]):
+        """
+        Tags and relocates tasks chunk by chunk. A chunk is relocated in the background while the next chunk is tagged, so files arrive in the destination early
+        and an interrupted run leaves all finished chunks completely transitioned. Conversions are done chunk after chunk, as they run in their own processes.
+        Collecting files and creating tasks is still done for all files beforehand, since the tasks of most transitioners depend on each other.
+        """
+        chunks = [
+            tasks[start : start + self.transitionChunkSize]
+            for start in range(0, len(tasks), self.transitionChunkSize)
+        ]
+        claimedTargets = (
+            self.claimedTargets if self.claimedTargets is not None else set()
+        )
+        relocation: Future = None
+
+        with ThreadPoolExecutor(max_workers=1) as relocator:
+            for number, chunk in enumerate(chunks, start=1):
+                self.print_info(
+                    f"Transition chunk {number}/{len(chunks)} with {len(chunk)} mediafiles.."
+                )
+                chunk = self.getNonOverwritingTasksOf(chunk)
+                chunk = self.getNonClaimedTasksOf(chunk, claimedTargets)
+                chunk = self.getSuccesfulChangedMetaTagTasksOf(chunk)
+
+                if relocation is not None:
+                    relocation.result()
+
+                if self.converter is None:
+                    relocation = relocator.submit(self.doRelocationOf, chunk, False)
+                else:
+                    self.doConversionOf(chunk)
+
+            if relocation is not None:
+                relocation.result()
+
+    def getNonClaimedTasksOf(
+        self, tasks: list[TransitionTask], claimedTargets: set[str]
+    ) -> list[TransitionTask]:
+        """
+        Skips tasks whose target is already taken by a task of a previous chunk or of another transitioner, which might not be relocated yet.
+        """
+        for task in tasks:
+            newName = self.getNewNameFor(task)
+            with claimLock:
+                claimed = newName in claimedTargets
+                claimedTargets.add(newName)
+            if claimed:
+                task.skip = True
+                task.skipReason = f"File exists already in {newName}!"
+
+        return self.getNonSkippedOf(tasks)
+
     def getNonSkippedOf(self, tasks: list[TransitionTask]):
         return [task for task in tasks if not task.skip]
 
     def getNonOverwritingTasksOf(self, tasks: list[TransitionTask]):
+        """
+        Skips tasks that would overwrite an existing file or a file planned by a previous task. Existing files are looked up in one listing per target directory.
+        """
+        existing = StemIndex()
+        planned: set[str] = set()
         for task in tasks:
             newName = self.getNewNameFor(task)
-            if os.path.exists(newName):
+            targets = [
+                os.path.splitext(newName)[0] + ext
+                for ext in self.toTreat[task.index].extensions
+            ]
+            if any(existing.exists(target) for target in targets):
                 task.skip = True
                 task.skipReason = f"File exists already in {newName}!"
+            elif any(os.path.normcase(target) in planned for target in targets):
+                task.skip = True
+                task.skipReason = f"Another file is transitioned to {newName} already!"
+            else:
+                planned.update(os.path.normcase(target) for target in targets)
 
         return self.getNonSkippedOf(tasks)
 
@@ -288,50 +637,158 @@ class MediaTransitioner(VerbosePrinterClass):
         if not self.writeMetaTags:
             return tasks
 
+        alreadyTagged = [task for task in tasks if task.metaTagsWritten]
+        if len(alreadyTagged) > 0:
+            self.print_info(
+                f"Meta tags of {len(alreadyTagged)} mediafiles were already written by the interrupted run."
+            )
+        allTasks = tasks
+        tasks = [task for task in tasks if not task.metaTagsWritten]
+
         self.print_info("Set meta file tags..")
 
-        for task in track(tasks) if self.verbosityLevel >= 3 else tasks:
+        stageHistories = self.prefetchStageHistoriesOf(tasks)
+        initialSidecarReads = self.prefetchInitialSidecarReadsOf(tasks)
+
+        fileToTags: dict[Path, dict[MowTag, str | int | float]] = {}
+        fileToTask: dict[Path, TransitionTask] = {}
+        newSidecarTasks: list[TransitionTask] = []
+
+        for task in (
+            track(tasks) if self.verbosityLevel >= 3 and self.showProgress else tasks
+        ):
             try:
                 mFile = self.toTreat[task.index]
 
                 if self.dry:
                     continue
 
+                knownTags = stageHistories.get(self.getStageHistoryFileOf(mFile))
+                initialSidecarTags = {}
+
                 if self.writeMetaTagsToSidecar and not mFile.has_sidecar():
-                    self.fm.create_sidecar_from_file(
-                        mFile, ignore_differing_tags=[MowTag.stagehistory]
+                    initialSidecarTags = self.fm.get_initial_sidecar_tags_of(
+                        mFile,
+                        ignore_differing_tags=[MowTag.stagehistory],
+                        known_reads=initialSidecarReads,
                     )
+                    knownTags = {
+                        tag: value
+                        for tag, value in initialSidecarTags.items()
+                        if tag == MowTag.stagehistory
+                    }
+                    newSidecarTasks.append(task)
                 elif not self.writeMetaTagsToSidecar and mFile.has_sidecar():
                     self.fm.merge_sidecar_into_mediafile(mFile)
 
-                self.add_transition_to_files_stage_history(task, mFile)
+                self.add_transition_to_files_stage_history(task, mFile, knownTags)
 
                 if self.writeMetaTagsToSidecar:
-                    self.fm.write_to_sidecar(mFile, task.metaTags)
+                    sidecar = Path(mFile.get_sidecar())
+                    fileToTags[sidecar] = {**initialSidecarTags, **task.metaTags}
+                    fileToTask[sidecar] = task
                 else:
                     for file in mFile.getAllFileNames():
-                        self.fm.write_tags(file, task.metaTags)
+                        fileToTags[Path(file)] = task.metaTags
+                        fileToTask[Path(file)] = task
 
             except Exception as e:
-                task.skip = True
-                task.skipReason = f"Problem setting meta tag data {task.metaTags} with exiftool: {e}.\nTraceback: {traceback.format_exc()}"
-                if len(str(self.toTreat[task.index])) > 260:
-                    task.skipReason += (
-                        "Filename is too long. Exiftool supports only 260 characters."
-                    )
+                self.setMetaTagProblemOf(
+                    task, f"{e}.\nTraceback: {traceback.format_exc()}"
+                )
 
-        return self.getNonSkippedOf(tasks)
+        errors = self.fm.write_tags_many(
+            {
+                file: tags
+                for file, tags in fileToTags.items()
+                if not fileToTask[file].skip
+            }
+        )
+        for file, error in errors.items():
+            self.setMetaTagProblemOf(fileToTask[file], f"{error} (file {file.name})")
+
+        for task in newSidecarTasks:
+            mFile = self.toTreat[task.index]
+            if not task.skip and not mFile.has_sidecar():
+                mFile.extensions.append(".xmp")
+
+        if not self.dry:
+            for task in self.getNonSkippedOf(tasks):
+                task.metaTagsWritten = True
+            self.recordInJournal(TAGGED, self.getNonSkippedOf(tasks))
+
+        return self.getNonSkippedOf(allTasks)
+
+    def setMetaTagProblemOf(self, task: TransitionTask, problem: str):
+        if task.skip:
+            return
+        task.skip = True
+        task.skipReason = (
+            f"Problem setting meta tag data {task.metaTags} with exiftool: {problem}"
+        )
+        if len(str(self.toTreat[task.index])) > 260:
+            task.skipReason += (
+                "Filename is too long. Exiftool supports only 260 characters."
+            )
+
+    def getStageHistoryFileOf(self, mFile: MediaFile) -> Path:
+        return (
+            mFile.get_sidecar()
+            if self.writeMetaTagsToSidecar
+            else mFile.getAllFileNames()[0]
+        )
+
+    def prefetchStageHistoriesOf(
+        self, tasks: list[TransitionTask]
+    ) -> dict[Path, dict[MowTag, list[str]]]:
+        """
+        Reads the stage history of every file that already exists before setting meta tags in one go.
+        Files whose sidecar has to be created or merged first are read later on.
+        """
+        if self.dry:
+            return {}
+
+        files = [
+            self.getStageHistoryFileOf(mFile)
+            for mFile in (self.toTreat[task.index] for task in tasks)
+            if mFile.has_sidecar() == self.writeMetaTagsToSidecar
+        ]
+        return self.fm.read_tags_many(files, tags=[MowTag.stagehistory])
+
+    def prefetchInitialSidecarReadsOf(
+        self, tasks: list[TransitionTask]
+    ) -> dict[Path, dict[MowTag, str | int | float]]:
+        """
+        Reads the tags of all files that get a new sidecar in one go, so that the exiftool processes can work on them concurrently.
+        """
+        if self.dry or not self.writeMetaTagsToSidecar:
+            return {}
+
+        files = [
+            file
+            for mFile in (self.toTreat[task.index] for task in tasks)
+            if not mFile.has_sidecar()
+            for file in mFile.getAllFileNames()
+        ]
+        return self.fm.read_tags_many(files, tags=tags_all)
 
     def add_transition_to_files_stage_history(
-        self, task: TransitionTask, mFile: MediaFile
+        self,
+        task: TransitionTask,
+        mFile: MediaFile,
+        knownTags: dict[MowTag, list[str]] = None,
     ):
-        tags = (
-            self.fm.read_from_sidecar(mFile, tags=[MowTag.stagehistory])
-            if self.writeMetaTagsToSidecar
-            else self.fm.read_tags(
+        """
+        knownTags: already read stage history of the file, will be read from the file if None
+        """
+        if knownTags is not None:
+            tags = dict(knownTags)
+        elif self.writeMetaTagsToSidecar:
+            tags = self.fm.read_from_sidecar(mFile, tags=[MowTag.stagehistory])
+        else:
+            tags = self.fm.read_tags(
                 mFile.getAllFileNames()[0], tags=[MowTag.stagehistory]
             )
-        )
         if MowTag.stagehistory in tags:
             tags[MowTag.stagehistory].append(self.current_stage)
         else:
@@ -339,13 +796,41 @@ class MediaTransitioner(VerbosePrinterClass):
 
         task.metaTags[MowTag.stagehistory] = tags[MowTag.stagehistory]
 
-    def doRelocationOf(self, tasks: list[TransitionTask]):
-        for task in track(tasks):
-            self.relocateSingleTask(task)
+    def doRelocationOf(self, tasks: list[TransitionTask], showProgress: bool = True):
+        """
+        Creates all target directories at once and relocates the tasks with nr_relocation_threads threads. Errors are captured in the skipReason of the single tasks.
+        showProgress: must be False if not called from the main thread, as there can only be one progress bar at a time
+        """
+        if not self.dry:
+            self.createTargetDirectoriesOf(tasks)
+
+        relocate = lambda task: self.relocateSingleTask(task, createDirectory=False)  # noqa: E731
+
+        if self.nr_relocation_threads == 1 or len(tasks) <= 1:
+            for task in track(tasks) if showProgress else tasks:
+                relocate(task)
+            return
+
+        with ThreadPoolExecutor(max_workers=self.nr_relocation_threads) as executor:
+            relocations = executor.map(relocate, tasks)
+            for _ in (
+                track(relocations, total=len(tasks)) if showProgress else relocations
+            ):
+                pass
 
-    def relocateSingleTask(self, task: TransitionTask):
+    def createTargetDirectoriesOf(self, tasks: list[TransitionTask]):
+        directories = set(os.path.dirname(self.getNewNameFor(task)) for task in tasks)
+        for directory in sorted(directories):
+            try:
+                os.makedirs(directory, exist_ok=True)
+            except OSError as e:
+                # relocating the files of this directory will fail and report the problem
+                self.print_debug(f"Could not create directory {directory}: {e}")
+
+    def relocateSingleTask(self, task: TransitionTask, createDirectory: bool = True):
         toTransition = self.toTreat[task.index]
         newPath = self.getNewNameFor(task)
+        journalKey = self.getJournalKeyOf(task)
 
         self.print_debug(
             self.getTransitionInfoString(
@@ -362,16 +847,32 @@ class MediaTransitioner(VerbosePrinterClass):
             if self.dry:
                 return
 
-            os.makedirs(os.path.dirname(newPath), exist_ok=True)
+            if createDirectory:
+                os.makedirs(os.path.dirname(newPath), exist_ok=True)
 
             if self.move:
-                toTransition.moveTo(newPath)
+                oldFiles = toTransition.getAllFileNames()
+                toTransition.moveTo(newPath, createDirectory=False)
+                self.fm.relocate_cached_tags_of(
+                    dict(zip(oldFiles, toTransition.getAllFileNames()))
+                )
             else:
-                toTransition.copyTo(newPath)
+                toTransition.copyTo(
+                    newPath, createDirectory=False, copyFunc=self.copySingleFile
+                )
+
+            if self.journal is not None:
+                self.journal.record(RELOCATED, [journalKey])
 
         except Exception as e:
             task.skip = True
-            task.skipReason = traceback.format_exc(e)
+            task.skipReason = f"{e}.\nTraceback: {traceback.format_exc()}"
+
+    def copySingleFile(self, src: str, dst: str):
+        """
+        Copies a single file of a mediafile if files are not moved. Might be called concurrently.
+        """
+        copyfile(src, dst)
 
     def doConversionOf(self, tasks: list[TransitionTask]):
         raise NotImplementedError()
@@ -0,0 +1,124 @@
+import datetime as dt
+import mmap
+import struct
+
+JPEG_START = b"\xff\xd8"
+JPEG_APP1 = 0xE1
+JPEG_START_OF_SCAN = 0xDA
+EXIF_HEADER = b"Exif\x00\x00"
+TIFF_MAGICS = {42, 0x4F52, 0x5352}  # tiff (also dng and nef), olympus orf ('RO' and 'RS')
+TIFF_TYPE_ASCII = 2
+
+TAG_DATETIME = 306
+TAG_EXIF_IFD = 34665
+TAG_DATETIME_ORIGINAL = 36867
+TAG_DATETIME_DIGITIZED = 36868
+TAG_SUBSEC_TIME = 37520
+TAG_SUBSEC_TIME_ORIGINAL = 37521
+TAG_SUBSEC_TIME_DIGITIZED = 37522
+
+# date tags in order of preference, each with the tag of its fraction of seconds
+DATE_TAGS = [
+    (TAG_DATETIME_ORIGINAL, TAG_SUBSEC_TIME_ORIGINAL),
+    (TAG_DATETIME_DIGITIZED, TAG_SUBSEC_TIME_DIGITIZED),
+    (TAG_DATETIME, TAG_SUBSEC_TIME),
+]
+
+
+def readExifDateTimeOf(file: str) -> dt.datetime | None:
+    """
+    Returns the capture date of a jpg or a tiff based raw (orf, nef, dng) including its fraction of seconds, or None if it has none.
+    Only the exif header is parsed, the file is mapped into memory so that just the few pages containing it are read from disk.
+    """
+    try:
+        with open(file, "rb") as f, mmap.mmap(
+            f.fileno(), 0, access=mmap.ACCESS_READ
+        ) as data:
+            tags = _readDateTagsOf(data)
+    except (OSError, ValueError, struct.error):
+        return None
+
+    for dateTag, subSecTag in DATE_TAGS:
+        if dateTag not in tags:
+            continue
+        try:
+            date = dt.datetime.strptime(tags[dateTag][0:19], "%Y:%m:%d %H:%M:%S")
+        except ValueError:
+            continue
+        subSec = tags.get(subSecTag, "").strip()
+        if subSec.isdigit():
+            date = date.replace(microsecond=int(subSec[:6].ljust(6, "0")))
+        return date
+
+    return None
+
+
+def _readDateTagsOf(data: mmap.mmap) -> dict[int, str]:
+    if data[0:2] == JPEG_START:
+        start = _getTiffStartInJpeg(data)
+        return _readDateTagsOfTiff(data, start) if start is not None else {}
+    return _readDateTagsOfTiff(data, 0)
+
+
+def _getTiffStartInJpeg(data: mmap.mmap) -> int | None:
+    position = 2
+    while position + 4 <= len(data):
+        if data[position] != 0xFF:
+            return None
+        marker = data[position + 1]
+        if marker == JPEG_START_OF_SCAN:
+            return None  # image data follows, there are no more headers
+        length = struct.unpack(">H", data[position + 2 : position + 4])[0]
+        if length < 2:
+            return None
+        if marker == JPEG_APP1 and data[position + 4 : position + 10] == EXIF_HEADER:
+            return position + 10
+        position += 2 + length
+    return None
+
+
+def _readDateTagsOfTiff(data: mmap.mmap, start: int) -> dict[int, str]:
+    byteOrder = {b"II": "<", b"MM": ">"}.get(data[start : start + 2])
+    if byteOrder is None:
+        return {}
+    magic, ifdOffset = struct.unpack(byteOrder + "HI", data[start + 2 : start + 8])
+    if magic not in TIFF_MAGICS:
+        return {}
+
+    tags = _readAsciiTagsOfIfd(data, start, ifdOffset, byteOrder)
+    exifOffset = tags.pop(TAG_EXIF_IFD, None)
+    if exifOffset is not None:
+        tags.update(_readAsciiTagsOfIfd(data, start, exifOffset, byteOrder))
+    return tags
+
+
+def _readAsciiTagsOfIfd(
+    data: mmap.mmap, start: int, ifdOffset: int, byteOrder: str
+) -> dict:
+    """
+    Returns the date related ascii tags of the ifd and the offset of the exif ifd, if it contains one.
+    """
+    wanted = {tag for tags in DATE_TAGS for tag in tags}
+    position = start + ifdOffset
+    nrEntries = struct.unpack(byteOrder + "H", data[position : position + 2])[0]
+
+    out: dict = {}
+    for index in range(nrEntries):
+        entry = position + 2 + 12 * index
+        tag, type, count = struct.unpack(byteOrder + "HHI", data[entry : entry + 8])
+        if tag == TAG_EXIF_IFD:
+            out[tag] = struct.unpack(byteOrder + "I", data[entry + 8 : entry + 12])[0]
+            continue
+        if tag not in wanted or type != TIFF_TYPE_ASCII:
+            continue
+
+        if count <= 4:
+            value = data[entry + 8 : entry + 8 + count]
+        else:
+            valueOffset = struct.unpack(
+                byteOrder + "I", data[entry + 8 : entry + 12]
+            )[0]
+            value = data[start + valueOffset : start + valueOffset + count]
+        out[tag] = value.split(b"\x00")[0].decode("ascii", errors="ignore")
+
+    return out
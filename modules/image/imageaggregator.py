@@ -1,8 +1,22 @@
 from ..general.mediatransitioner import TransitionTask, TransitionerInput
 from ..image.imagefile import ImageFile
 from ..general.mediaaggregator import MediaAggregator
+from ..mow.mowfolder import get_mow_folder_of
+from ..mow.mowtags import MowTag
+from ..mow.importmanifest import copy_and_hash
+from ..mow.deferredoriginals import (
+    DEFERRED_ORIGINALS_FILE_NAME,
+    DEFERRED_STASH_SETTING,
+    DeferredOriginals,
+    get_deferral_key_of,
+)
 
 import os
+from pathlib import Path
+from shutil import move
+import threading
+
+DEFERRED_ORIGINALS_NOT_AVAILABLE = "Deferred originals are not available"
 
 
 class ImageAggregator(MediaAggregator):
@@ -12,6 +26,9 @@ class ImageAggregator(MediaAggregator):
         """
         input.mediaFileFactory = ImageFile
         self.jpgSingleSourceOfTruth = jpgSingleSourceOfTruth
+        self.deferredOriginalsOf: dict[int, tuple[str, list[str]]] = {}
+        self.fetchedDeferralKeys: list[str] = []
+        self.fetchedDeferralKeysLock = threading.Lock()
         super().__init__(input)
 
     def getAllTagRelevantFilenamesFor(self, file: ImageFile) -> list[str]:
@@ -21,6 +38,137 @@ class ImageAggregator(MediaAggregator):
             else super().getAllTagRelevantFilenamesFor(file)
         )
 
+    def getSkipVerdictContext(self) -> str | None:
+        return f"{super().getSkipVerdictContext()},jpgSingleSourceOfTruth={self.jpgSingleSourceOfTruth}"
+
+    def isCacheableSkipVerdict(self, task: TransitionTask) -> bool:
+        # the source of the originals may be available next time
+        return super().isCacheableSkipVerdict(task) and not task.skipReason.startswith(
+            DEFERRED_ORIGINALS_NOT_AVAILABLE
+        )
+
+    def deleteBasedOnRating(self, indexToTags: dict[int, list[dict[MowTag, str]]]):
+        database = self.getDeferredOriginalsDatabase()
+        if database is not None and database.exists():
+            deferredOriginals = DeferredOriginals(database)
+            self.planDeferredOriginals(deferredOriginals, indexToTags)
+            deferredOriginals.close()
+
+        super().deleteBasedOnRating(indexToTags)
+
+    def getDeferredOriginalsDatabase(self) -> Path | None:
+        mowFolder = get_mow_folder_of(self.settings)
+        return (
+            mowFolder / DEFERRED_ORIGINALS_FILE_NAME if mowFolder is not None else None
+        )
+
+    def planDeferredOriginals(
+        self,
+        deferredOriginals: DeferredOriginals,
+        indexToTags: dict[int, list[dict[MowTag, str]]],
+    ):
+        """
+        Plans to fetch the originals that were deferred while copying (see MediaCopier) for all images rated 4 or higher, they are fetched when the image is relocated.
+        The originals of lower rated images are not needed anymore, stashed ones are deleted.
+        """
+        stash = self.getStash()
+
+        for task in self.toTransition:
+            if task.skip:
+                continue
+
+            tags = indexToTags[task.index][0]
+            if MowTag.source not in tags or MowTag.date not in tags:
+                continue
+            key = get_deferral_key_of(tags[MowTag.source], tags[MowTag.date])
+            originals = deferredOriginals.get(key)
+            if len(originals) == 0:
+                continue
+
+            mfile: ImageFile = self.toTreat[task.index]
+            rating = int(self.getRatingOf(task, indexToTags))
+            if not (1 <= rating <= 5):
+                continue
+
+            if rating < 4:
+                self.print_debug(f"Drop deferred originals of {mfile}")
+                if not self.dry:
+                    for original in originals:
+                        if stash is not None and self.isStashed(original, stash):
+                            os.remove(original)
+                    deferredOriginals.remove(key)
+                continue
+
+            missing = [
+                original for original in originals if not os.path.exists(original)
+            ]
+            if len(missing) > 0:
+                task.skip = True
+                task.skipReason = (
+                    f"{DEFERRED_ORIGINALS_NOT_AVAILABLE}: {', '.join(missing)}"
+                )
+                continue
+
+            self.deferredOriginalsOf[task.index] = (key, originals)
+
+    def getStash(self) -> str | None:
+        stash = self.settings.get(DEFERRED_STASH_SETTING) if self.settings else None
+        return os.path.abspath(stash) if stash else None
+
+    def relocateSingleTask(self, task: TransitionTask, createDirectory: bool = True):
+        newPathNoExt = os.path.splitext(self.getNewNameFor(task))[0]
+        super().relocateSingleTask(task, createDirectory)
+
+        if task.skip or self.dry or task.index not in self.deferredOriginalsOf:
+            return
+
+        key, originals = self.deferredOriginalsOf[task.index]
+        try:
+            self.fetchDeferredOriginals(task, originals, newPathNoExt)
+        except Exception as e:
+            # the image is relocated already, the originals stay deferred and can be fetched by hand
+            self.print_warning(
+                f"Could not fetch deferred originals {', '.join(originals)} of {self.toTreat[task.index]}: {e}"
+            )
+            return
+
+        with self.fetchedDeferralKeysLock:
+            self.fetchedDeferralKeys.append(key)
+
+    def fetchDeferredOriginals(
+        self, task: TransitionTask, originals: list[str], newPathNoExt: str
+    ):
+        """
+        Fetches the originals next to the relocated image. Stashed originals are moved, the others are copied from their source.
+        """
+        mfile: ImageFile = self.toTreat[task.index]
+        stash = self.getStash()
+        for original in originals:
+            extension = os.path.splitext(original)[1]
+            if extension in mfile.extensions:
+                continue
+
+            self.print_debug(f"Fetch deferred original {original} for {mfile}")
+            if stash is not None and self.isStashed(original, stash):
+                move(original, newPathNoExt + extension)
+            else:
+                copy_and_hash(original, newPathNoExt + extension)
+            if self.move:
+                mfile.extensions.append(extension)
+
+    def finalExecution(self):
+        super().finalExecution()
+        if self.dry or len(self.fetchedDeferralKeys) == 0:
+            return
+
+        deferredOriginals = DeferredOriginals(self.getDeferredOriginalsDatabase())
+        for key in self.fetchedDeferralKeys:
+            deferredOriginals.remove(key)
+        deferredOriginals.close()
+
+    def isStashed(self, file: str, stash: str) -> bool:
+        return os.path.commonpath([os.path.abspath(file), stash]) == stash
+
     def treatTaskBasedOnRating(self, task: TransitionTask, rating: int):
         mfile: ImageFile = self.toTreat[task.index]
         match rating:
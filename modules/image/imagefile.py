@@ -1,7 +1,7 @@
 from __future__ import annotations
-from pathlib import Path
 
-from ..general.mediafile import MediaFile
+from ..general.mediafile import MediaFile, StemIndex
+from .exifdatereader import readExifDateTimeOf
 import datetime as dt
 
 from PIL import Image
@@ -12,23 +12,23 @@ class ImageFile(MediaFile):
     supportedRawFormats = set({".ORF", ".NEF", ".dng", ".DNG"})
     allSupportedFormats = set(supportedJpgFormats.union(supportedRawFormats))
 
-    def __init__(self, file, check_for_other_extensions=True):
+    def __init__(
+        self, file, check_for_other_extensions=True, stemIndex: StemIndex = None
+    ):
         super().__init__(
             path=file,
             validExtensions=self.allSupportedFormats,
+            stemIndex=stemIndex,
         )
         if not self.isValid() or not check_for_other_extensions:
             return
 
-        path_no_ext = Path(self.pathnoext)
-        candidates = [
-            item
-            for item in path_no_ext.parent.iterdir()
-            if item.stem == path_no_ext.name and item.suffix in self.allSupportedFormats
-        ]
+        if stemIndex is None:
+            stemIndex = StemIndex()
 
-        for candidate in candidates:
-            candidate_new_extension = Path(candidate).suffix
+        for candidate_new_extension in stemIndex.extensionsOf(self.pathnoext):
+            if candidate_new_extension not in self.allSupportedFormats:
+                continue
             if candidate_new_extension not in self.extensions:
                 self.extensions.append(candidate_new_extension)
 
@@ -45,6 +45,18 @@ class ImageFile(MediaFile):
         return self.pathnoext + raw_ending.pop()
 
     def readDateTime(self):
+        for file in [self.getJpg(), self.getRaw()]:
+            if file is None:
+                continue
+            date = readExifDateTimeOf(file)
+            if date is not None:
+                return date
+
+        if self.getJpg() is None:
+            return None
+        return self.readDateTimeWithPIL()
+
+    def readDateTimeWithPIL(self):
         try:
             date = None
             img = Image.open(self.getJpg())
@@ -0,0 +1,58 @@
+import json
+import os
+from pathlib import Path
+import sqlite3
+import threading
+
+DEFERRED_ORIGINALS_FILE_NAME = "deferredoriginals.sqlite"
+DEFERRED_STASH_SETTING = "deferred_stash_dir"  # settings key of the local folder deferred originals are copied into instead of being left on the source
+
+
+def get_deferral_key_of(source: str, date: str) -> str:
+    """
+    source: name of the imported jpg before renaming (meta tag 'source'), its extension is ignored
+    date: capture date as written by the renamer (meta tag 'date'), anything after the seconds (e.g. a timezone) is ignored
+    """
+    if isinstance(date, list):
+        date = date[0]
+    return f"{os.path.splitext(os.path.basename(source))[0]}|{str(date)[:19]}"
+
+
+class DeferredOriginals:
+    """
+    Persistent record of originals (raws and videos) that were not imported together with their jpg, stored as sqlite database (usually in the mow folder of the working directory).
+    Entries are keyed by original name and capture date of the jpg, which the renamer keeps in the meta tags of the mediafile, so they can be found again in later stages.
+    """
+
+    def __init__(self, database: Path):
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(str(database), check_same_thread=False)
+        with self.lock, self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS deferred (key TEXT PRIMARY KEY, files TEXT NOT NULL)"
+            )
+
+    def put_many(self, deferred: dict[str, list[str]]):
+        """
+        deferred: key to the absolute paths of the deferred originals
+        """
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO deferred (key, files) VALUES (?, ?)",
+                [(key, json.dumps(files)) for key, files in deferred.items()],
+            )
+
+    def get(self, key: str) -> list[str]:
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT files FROM deferred WHERE key = ?", (key,)
+            ).fetchone()
+        return json.loads(row[0]) if row is not None else []
+
+    def remove(self, key: str):
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM deferred WHERE key = ?", (key,))
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
@@ -0,0 +1,46 @@
+import os
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # not available on windows
+    fcntl = None
+
+FICLONE = 0x40049409  # ioctl request of linux to share all data blocks of a file with another one (reflink)
+LINK_PART_SUFFIX = ".linking"
+
+
+def is_on_same_filesystem(src: Path, dstDir: Path) -> bool:
+    return os.stat(src).st_dev == os.stat(dstDir).st_dev
+
+
+def reflink(src: Path, dst: Path) -> bool:
+    """
+    Creates dst as copy-on-write clone of src, which takes no space until one of both files is changed.
+    Returns False if the platform or filesystem does not support it (e.g. ext4 or ntfs), in that case dst is not created.
+    """
+    if fcntl is None:
+        return False
+
+    part = Path(str(dst) + LINK_PART_SUFFIX)
+    try:
+        with open(src, "rb") as source, open(part, "wb") as target:
+            fcntl.ioctl(target.fileno(), FICLONE, source.fileno())
+    except OSError:
+        if part.exists():
+            os.remove(part)
+        return False
+
+    os.replace(part, dst)
+    return True
+
+
+def hardlink(src: Path, dst: Path) -> bool:
+    """
+    Creates dst as hardlink of src. Returns False if that is not possible, e.g. because the filesystem does not support it.
+    """
+    try:
+        os.link(src, dst)
+    except OSError:
+        return False
+    return True
@@ -0,0 +1,74 @@
+from concurrent.futures import ThreadPoolExecutor
+import os
+from pathlib import Path
+import sys
+import threading
+
+FSYNC_BATCH_BYTES = 512 * 1024 * 1024  # written bytes after which a batch is synced while writing goes on
+FSYNC_THREADS = 8  # fsyncs issued concurrently, lets the device reorder and merge them
+
+
+class FsyncBatch:
+    """
+    Collects written files and syncs them together with their directories to disk in batches, which costs far less than syncing every single file.
+    Call flush before anything relies on the files being durable, e.g. before marking them as imported.
+    """
+
+    def __init__(self, batch_bytes: int = FSYNC_BATCH_BYTES):
+        self.batch_bytes = batch_bytes
+        self.lock = threading.Lock()
+        self.pending: list[Path] = []
+        self.pending_bytes = 0
+
+    def add(self, file: Path):
+        with self.lock:
+            self.pending.append(Path(file))
+            self.pending_bytes += os.path.getsize(file)
+            if self.pending_bytes < self.batch_bytes:
+                return
+            files = self._take_pending()
+        self._sync(files)
+
+    def discard(self, files: list[Path]):
+        """
+        Removes pending files that were deleted again, as they cannot be synced anymore.
+        """
+        discarded = set(Path(file) for file in files)
+        with self.lock:
+            self.pending = [file for file in self.pending if file not in discarded]
+
+    def flush(self):
+        with self.lock:
+            files = self._take_pending()
+        self._sync(files)
+
+    def _take_pending(self) -> list[Path]:
+        files = self.pending
+        self.pending = []
+        self.pending_bytes = 0
+        return files
+
+    def _sync(self, files: list[Path]):
+        if len(files) == 0:
+            return
+
+        # files first, so that no directory entry can point to data that is not on disk yet
+        directories = set(file.parent for file in files)
+        with ThreadPoolExecutor(max_workers=FSYNC_THREADS) as executor:
+            list(executor.map(_fsync_file, files))
+            if sys.platform != "win32":  # directories can't be opened on windows, ntfs journals them anyway
+                list(executor.map(_fsync_directory, directories))
+
+
+def _fsync_file(file: Path):
+    mode = "r+b" if sys.platform == "win32" else "rb"  # windows needs write access for flushing
+    with open(file, mode) as f:
+        os.fsync(f.fileno())
+
+
+def _fsync_directory(directory: Path):
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
@@ -0,0 +1,120 @@
+from hashlib import blake2b
+import os
+from pathlib import Path
+import sqlite3
+import threading
+import time
+
+IMPORT_LEDGER_FILE_NAME = "importledger.sqlite"
+FINGERPRINT_BLOCK_SIZE = 4096  # bytes read from head and tail of a file
+QUERY_CHUNK_SIZE = 500  # sqlite limits the number of variables of a single query
+
+
+class ImportLedger:
+    """
+    Persistent record of all files that were imported (copied from a source like a memory card), stored as sqlite database (usually in the mow folder of the working directory).
+    Files are identified by a quick fingerprint: their size plus a hash of the first and last block of their content.
+    That makes the ledger independent of file names, modification times and the order in which files appear on the source.
+    """
+
+    def __init__(self, database: Path):
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(str(database), check_same_thread=False)
+        with self.lock, self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS imported (fingerprint TEXT PRIMARY KEY, size INTEGER NOT NULL, source TEXT NOT NULL, imported_ns INTEGER NOT NULL)"
+            )
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS imported_size ON imported (size)"
+            )
+
+    @staticmethod
+    def fingerprint_of(file: Path, size: int = None) -> str:
+        if size is None:
+            size = os.path.getsize(file)
+
+        hasher = blake2b(digest_size=16)
+        with open(file, "rb") as f:
+            hasher.update(f.read(FINGERPRINT_BLOCK_SIZE))
+            if size > FINGERPRINT_BLOCK_SIZE:
+                f.seek(max(FINGERPRINT_BLOCK_SIZE, size - FINGERPRINT_BLOCK_SIZE))
+                hasher.update(f.read(FINGERPRINT_BLOCK_SIZE))
+        return f"{size}:{hasher.hexdigest()}"
+
+    def is_empty(self) -> bool:
+        with self.lock:
+            row = self.connection.execute("SELECT 1 FROM imported LIMIT 1").fetchone()
+        return row is None
+
+    def get_unknown(self, files: list[Path]) -> set[Path]:
+        """
+        Returns all files that were not imported yet. Only files having the size of an imported file are read.
+        """
+        sizes = {file: os.path.getsize(file) for file in files}
+        knownSizes = self._get_known("size", list(set(sizes.values())))
+
+        out = {file for file, size in sizes.items() if size not in knownSizes}
+        fingerprints = {
+            file: self.fingerprint_of(file, size)
+            for file, size in sizes.items()
+            if size in knownSizes
+        }
+        knownFingerprints = self._get_known(
+            "fingerprint", list(set(fingerprints.values()))
+        )
+        out.update(
+            file
+            for file, fingerprint in fingerprints.items()
+            if fingerprint not in knownFingerprints
+        )
+        return out
+
+    @staticmethod
+    def fingerprint_of_member(
+        archive: str, member: str, size: int, checksum: int
+    ) -> str:
+        """
+        Returns the fingerprint of a member of an archive, made of the name of the archive, the path of the member, its size and a checksum
+        stored in the archive (e.g. the crc of a zip member), so members are recognized without reading them.
+        """
+        return f"{size}:{os.path.basename(archive)}/{member}:{checksum}"
+
+    def get_known_fingerprints(self, fingerprints: list[str]) -> set[str]:
+        return self._get_known("fingerprint", fingerprints)
+
+    def add(self, files: list[Path]):
+        entries = []
+        for file in files:
+            size = os.path.getsize(file)
+            entries.append((self.fingerprint_of(file, size), size, str(file)))
+        self.add_fingerprints(entries)
+
+    def add_fingerprints(self, entries: list[tuple[str, int, str]]):
+        """
+        Records fingerprint, size and source of each entry as imported.
+        """
+        now = time.time_ns()
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO imported (fingerprint, size, source, imported_ns) VALUES (?, ?, ?, ?)",
+                [
+                    (fingerprint, size, source, now)
+                    for fingerprint, size, source in entries
+                ],
+            )
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+    def _get_known(self, column: str, values: list) -> set:
+        out = set()
+        with self.lock:
+            for start in range(0, len(values), QUERY_CHUNK_SIZE):
+                chunk = values[start : start + QUERY_CHUNK_SIZE]
+                rows = self.connection.execute(
+                    f"SELECT DISTINCT {column} FROM imported WHERE {column} IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+                out.update(row[0] for row in rows)
+        return out
@@ -0,0 +1,165 @@
+import datetime as dt
+import hashlib
+import json
+import os
+from pathlib import Path
+import threading
+from typing import BinaryIO
+
+from .importledger import ImportLedger
+
+IMPORT_MANIFEST_FILE_NAME = "importmanifest.jsonl"
+HASH_BUFFER_SIZE = 1024 * 1024
+PART_SUFFIX = ".part"  # suffix of files being copied, renamed to their final name once complete
+
+# one lock per manifest file, shared by all instances, as concurrent copiers create their own instance of the same manifest
+_locksOfManifests: dict[str, threading.Lock] = {}
+_locksOfManifestsLock = threading.Lock()
+
+
+def _get_lock_of(file: Path) -> threading.Lock:
+    key = os.path.normcase(os.path.abspath(file))
+    with _locksOfManifestsLock:
+        return _locksOfManifests.setdefault(key, threading.Lock())
+
+
+def md5_of(file: Path) -> str:
+    md5 = hashlib.md5()
+    with open(file, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_BUFFER_SIZE), b""):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+
+def copy_and_hash(src: Path, dst: Path) -> str:
+    """
+    Copies src to dst like shutil.copyfile and returns the md5 hash of the copied bytes, so every byte is read only once.
+    The copy is written to dst with PART_SUFFIX and renamed to dst after it was checked against size and fingerprint of src.
+    If a part of an interrupted copy exists already and its end matches src, copying resumes at its end.
+    """
+    part = Path(str(dst) + PART_SUFFIX)
+    size = os.path.getsize(src)
+    md5 = hashlib.md5()
+
+    offset = _get_resumable_offset_of(part, src, size)
+    mode = "r+b" if offset > 0 else "wb"
+    with open(src, "rb") as source, open(part, mode) as target:
+        if offset > 0:
+            # the already copied bytes are hashed from the local part, not from the (usually slower) source
+            for chunk in iter(lambda: target.read(HASH_BUFFER_SIZE), b""):
+                md5.update(chunk)
+            source.seek(offset)
+        _stream_into(source, target, md5)
+
+    if os.path.getsize(part) != size or (
+        ImportLedger.fingerprint_of(part) != ImportLedger.fingerprint_of(src)
+    ):
+        os.remove(part)
+        raise Exception(f"Copy of {src} to {dst} differs from its source!")
+
+    os.replace(part, dst)
+    return md5.hexdigest()
+
+
+def stream_and_hash(source: BinaryIO, dst: Path) -> str:
+    """
+    Writes all data of source to dst and returns its md5 hash. The data is written to dst with PART_SUFFIX first and renamed to dst once complete.
+    """
+    part = Path(str(dst) + PART_SUFFIX)
+    md5 = hashlib.md5()
+    with open(part, "wb") as target:
+        _stream_into(source, target, md5)
+    os.replace(part, dst)
+    return md5.hexdigest()
+
+
+def _stream_into(source: BinaryIO, target: BinaryIO, md5):
+    buffer = bytearray(HASH_BUFFER_SIZE)
+    view = memoryview(buffer)
+    while True:
+        read = source.readinto(buffer)
+        if not read:
+            break
+        md5.update(view[:read])
+        target.write(view[:read])
+
+
+def _get_resumable_offset_of(part: Path, src: Path, size: int) -> int:
+    """
+    Returns the size of part, if its last block equals the block of src at the same position, otherwise 0.
+    """
+    if not part.exists():
+        return 0
+
+    offset = os.path.getsize(part)
+    if offset > size:
+        return 0
+
+    start = max(0, offset - HASH_BUFFER_SIZE)
+    with open(part, "rb") as partial, open(src, "rb") as source:
+        partial.seek(start)
+        source.seek(start)
+        if partial.read(offset - start) != source.read(offset - start):
+            return 0
+    return offset
+
+
+class ImportManifest:
+    """
+    Record of all imported files with their md5 hash, stored as json lines file (usually in the mow folder of the working directory).
+    The hash is calculated while copying, it is the hash of the bytes read from the source and written to the target.
+    """
+
+    def __init__(self, file: Path):
+        self.file = Path(file)
+        self.lock = _get_lock_of(self.file)
+
+    def record(self, entries: list[dict]):
+        """
+        entries: one dict per copied file with the keys 'source', 'target', 'size' and 'md5'
+        """
+        if len(entries) == 0:
+            return
+        imported = dt.datetime.now().isoformat(timespec="seconds")
+        with self.lock, open(self.file, "a", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps({**entry, "imported": imported}, default=str) + "\n")
+
+    def read(self) -> dict[str, dict]:
+        """
+        Returns the latest entry of every target.
+        """
+        out: dict[str, dict] = {}
+        if not self.file.exists():
+            return out
+
+        with open(self.file, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                out[entry["target"]] = entry
+        return out
+
+    def verify(self) -> tuple[list[str], list[str], list[str]]:
+        """
+        Hashes all targets again and returns the targets that are correct, that differ from the recorded hash and that do not exist anymore
+        (e.g. because they were transitioned to the next stage already).
+        """
+        correct: list[str] = []
+        mismatching: list[str] = []
+        missing: list[str] = []
+
+        for target, entry in self.read().items():
+            if not os.path.exists(target):
+                missing.append(target)
+            elif (
+                os.path.getsize(target) != entry["size"]
+                or md5_of(target) != entry["md5"]
+            ):
+                mismatching.append(target)
+            else:
+                correct.append(target)
+
+        return correct, mismatching, missing
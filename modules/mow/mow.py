@@ -1,3 +1,7 @@
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import os
 from pathlib import Path
 import sys
 from typing import Callable, Dict, Tuple
@@ -13,8 +17,10 @@ from rich.logging import RichHandler
 from ..image.imagefile import ImageFile
 from ..video.videofile import VideoFile
 from ..general.mediaconverter import PassthroughConverter
-from ..general.mediacopier import MediaCopier
+from ..general.mediacopier import CopierInput, MediaCopier
+from ..general.archiveimporter import ArchiveImporter, isArchive
 from ..general.mediatransitioner import DELETE_FOLDER_NAME, TransitionerInput
+from ..general.compositetransitioner import CompositeTransitioner
 from ..general.tkinterhelper import getInputDir, getInputFile
 from ..general.mediarenamer import RenamerInput
 from ..image.imagerenamer import ImageRenamer
@@ -34,6 +40,9 @@ from ..general.medialocalizer import (
 )
 from ..general.mediatagger import MediaTagger
 from .mowstatusprinter import MowStatusPrinter
+from .mowfolder import get_mow_folder_of
+from .importmanifest import IMPORT_MANIFEST_FILE_NAME, ImportManifest
+from .tagcache import TAG_CACHE_FILE_NAME
 from .foldertreeprinter import FolderTreePrinter
 
 
@@ -66,6 +75,11 @@ class Mow:
         dry: bool = True,
         filter: str = None,
         verbosity: int = 3,
+        exiftoolProcesses: int = 1,
+        chunkSize: int = 0,
+        resume: bool = False,
+        relocationThreads: int = 1,
+        clearTagCache: bool = False,
     ):
         self._setup_logger(verbosity)
 
@@ -73,6 +87,8 @@ class Mow:
         self.settings = (
             self._readsettings()
         )  # settings are stored in yaml-file at root dir of the script and tags are snake_case
+        if clearTagCache:
+            self._clearTagCache()
         self.stageFolders = [
             "1_copy",
             "2_rename",
@@ -98,41 +114,151 @@ class Mow:
             "dry": dry,
             "filter": filter,
             "settings": self.settings,
+            "nr_exiftool_processes": exiftoolProcesses,
+            "transitionChunkSize": chunkSize,
+            "resume": resume,
+            "nr_relocation_threads": relocationThreads,
         }
 
-    def copy(self, askForNewSource: bool = False):
-        self._read_settings_folder_path_if_missing(
-            key="copy_source_dir",
-            message="Specify source dir from where to copy!",
-            force=askForNewSource,
+    def copy(
+        self,
+        askForNewSource: bool = False,
+        sources: list[str] = None,
+        rename: bool = False,
+        subSecondNames: bool = False,
+        since: datetime = None,
+        until: datetime = None,
+        link: bool = False,
+        durable: bool = False,
+        deferOriginals: bool = False,
+    ):
+        """
+        sources: directories or zip/tar archives to copy from, if not given, copy_source_dir of settings is taken (which may contain a list as well).
+        Mediafiles in archives are streamed into a subfolder of the stage after copying named like the archive (renaming and date ranges do not apply to them).
+        Sources on different devices are copied concurrently, sources on the same device one after another.
+        rename: files are renamed while copying and put directly into the stage after the rename stage
+        subSecondNames: if renaming, the new names contain the milliseconds of the capture time like those of rename with subSecondNames
+        since, until: if given, only files captured within this range are copied
+        link: files on the same filesystem as the working dir are reflinked or hardlinked instead of copied
+        durable: copied files are synced to disk before they are marked as imported
+        deferOriginals: only jpgs are copied, their raws and videos are fetched by the aggregate stage for images rated 4 or higher
+        """
+        if not sources:
+            self._read_settings_folder_path_if_missing(
+                key="copy_source_dir",
+                message="Specify source dir from where to copy!",
+                force=askForNewSource,
+            )
+            sources = self._getStageFolder("copy")
+            if isinstance(sources, str):
+                sources = [sources]
+
+        dst = self._getStageFolder(
+            self._getStageAfter("rename" if rename else "copy")
         )
+        self._printEmphasized("Stage copy" + (" and rename" if rename else ""))
 
-        src, dst = self._getSrcDstForStage("copy")
-        self._printEmphasized("Stage copy")
+        sourcesOfDevice: dict[int, list[str]] = defaultdict(list)
+        for src in sources:
+            if not os.path.exists(src):
+                self.logger.warning(f"Source {src} does not exist, skip it.")
+                continue
+            sourcesOfDevice[os.stat(src).st_dev].append(src)
 
-        MediaCopier(TransitionerInput(src=src, dst=dst, **self.basicInputParameter))()
+        if len(sourcesOfDevice) == 0:
+            self.logger.warning("Found no source to copy from!")
+            return
+
+        claimedTargets: set[str] = set()
+        # progress bars of concurrent copies would interleave, so they are shown only for a single device
+        concurrent = len(sourcesOfDevice) > 1
+
+        def copyFrom(sourcesOnDevice: list[str]):
+            for src in sourcesOnDevice:
+                if isArchive(src):
+                    ArchiveImporter(
+                        TransitionerInput(
+                            src=src,
+                            dst=self._getStageFolder(self._getStageAfter("copy")),
+                            claimedTargets=claimedTargets,
+                            **self.basicInputParameter,
+                        )
+                    )()
+                    continue
+
+                MediaCopier(
+                    CopierInput(
+                        src=src,
+                        dst=dst,
+                        claimedTargets=claimedTargets,
+                        fusedRenameStage=(
+                            self.stageToFolder["rename"] if rename else None
+                        ),
+                        subSecondNames=subSecondNames,
+                        since=since,
+                        until=until,
+                        linkFiles=link,
+                        durable=durable,
+                        deferOriginals=deferOriginals,
+                        showProgress=not concurrent,
+                        **self.basicInputParameter,
+                    )
+                )()
+
+        if not concurrent:
+            copyFrom(next(iter(sourcesOfDevice.values())))
+            return
 
-    def rename(self, useCurrentFilename=False, replace=""):
+        with ThreadPoolExecutor(max_workers=len(sourcesOfDevice)) as executor:
+            copies = [
+                executor.submit(copyFrom, sourcesOnDevice)
+                for sourcesOnDevice in sourcesOfDevice.values()
+            ]
+            for copying in copies:
+                copying.result()
+
+    def verifyCopies(self):
+        """
+        Hashes all copied files recorded in the import manifest again and reports the ones that differ from the hash calculated while copying.
+        """
+        self._printEmphasized("Verify copied files")
+        mowFolder = get_mow_folder_of(self.settings)
+        correct, mismatching, missing = ImportManifest(
+            mowFolder / IMPORT_MANIFEST_FILE_NAME
+        ).verify()
+
+        for target in mismatching:
+            self.logger.error(f"{target} differs from the file that was copied!")
+        self.logger.info(
+            f"Verified {len(correct) + len(mismatching)} copied files: {len(correct)} correct, {len(mismatching)} differing. "
+            f"{len(missing)} files are not in place anymore (e.g. already transitioned to the next stage)."
+        )
+
+    def rename(self, useCurrentFilename=False, replace="", subSecondNames=False):
         src, dst = self._getSrcDstForStage("rename")
         renamers = [ImageRenamer, VideoRenamer, AudioRenamer]
-        for renamer in renamers:
-            self._printEmphasized(f"Stage rename: {renamer.__name__}")
-            renamer(
-                RenamerInput(
-                    src=src,
-                    dst=dst,
-                    useCurrentFilename=useCurrentFilename,
-                    replace=replace,
-                    **self.basicInputParameter,
+        self._printEmphasized("Stage rename")
+        CompositeTransitioner(
+            [
+                renamer(
+                    RenamerInput(
+                        src=src,
+                        dst=dst,
+                        useCurrentFilename=useCurrentFilename,
+                        replace=replace,
+                        subSecondNames=subSecondNames,
+                        **self.basicInputParameter,
+                    )
                 )
-            )()
+                for renamer in renamers
+            ]
+        )()
 
     def convert(self, enforcePassthrough: bool = False, jpg_quality=100):
-        transitionerInput = self._getBasicTransitionerInputFor("convert")
         if enforcePassthrough:
             self._printEmphasized("Stage Convert: Passthrough")
             PassthroughConverter(
-                transitionerInput,
+                self._getBasicTransitionerInputFor("convert"),
                 valid_extensions=list(
                     ImageFile.allSupportedFormats.union(VideoFile.supportedFormats)
                 ),
@@ -141,10 +267,17 @@ class Mow:
             self._read_settings_file_path_if_missing(
                 "dng_converter_exe", "Specify path to dng converter executable!"
             )
-            self._printEmphasized("Stage Convert: Images")
-            ImageConverter(transitionerInput, jpg_quality=jpg_quality)()
-            self._printEmphasized("Stage Convert: Videos")
-            VideoConverter(transitionerInput)()
+            self._printEmphasized("Stage Convert")
+            # every transitioner gets its own input, as transitioners change their input
+            CompositeTransitioner(
+                [
+                    ImageConverter(
+                        self._getBasicTransitionerInputFor("convert"),
+                        jpg_quality=jpg_quality,
+                    ),
+                    VideoConverter(self._getBasicTransitionerInputFor("convert")),
+                ]
+            )()
 
     def group(
         self,
@@ -192,16 +325,23 @@ class Mow:
         )()
 
     def aggregate(self, jpgIsSingleSourceOfTruth: bool):
-        transitionerInput = self._getBasicTransitionerInputFor("aggregate")
-        transitionerInput.writeMetaTagsToSidecar = False
+        def getAggregatorInput() -> TransitionerInput:
+            transitionerInput = self._getBasicTransitionerInputFor("aggregate")
+            transitionerInput.writeMetaTagsToSidecar = False
+            return transitionerInput
 
         self._printEmphasized("Stage Aggregate")
 
-        ImageAggregator(
-            transitionerInput,
-            jpgSingleSourceOfTruth=jpgIsSingleSourceOfTruth,
+        # every transitioner gets its own input, as transitioners change their input
+        CompositeTransitioner(
+            [
+                ImageAggregator(
+                    getAggregatorInput(),
+                    jpgSingleSourceOfTruth=jpgIsSingleSourceOfTruth,
+                ),
+                VideoAggregator(getAggregatorInput()),
+            ]
         )()
-        VideoAggregator(transitionerInput)()
 
     def status(self):
         MowStatusPrinter(
@@ -262,6 +402,16 @@ class Mow:
             self._getStageAfter(stage)
         )
 
+    def _clearTagCache(self):
+        """
+        Removes the cached tags of the working directory, e.g. after the files were edited by a tool that restores their timestamps.
+        """
+        mowFolder = get_mow_folder_of(self.settings)
+        if mowFolder is None or not os.path.exists(mowFolder / TAG_CACHE_FILE_NAME):
+            return
+        os.remove(mowFolder / TAG_CACHE_FILE_NAME)
+        self.logger.info("Cleared the tag cache.")
+
     def _printEmphasized(self, toprint: str):
         self.logger.info(f"{'#'*10} {toprint} {'#'*10}")
 
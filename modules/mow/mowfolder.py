@@ -0,0 +1,17 @@
+import os
+from pathlib import Path
+
+MOW_FOLDER_NAME = ".mow"  # folder inside the working directory where mow keeps its internal state, e.g. caches
+
+
+def get_mow_folder_of(settings: dict[str, str]) -> Path | None:
+    """
+    Returns the mow folder of the working directory given in settings and creates it if necessary.
+    Returns None if settings contain no working directory.
+    """
+    if settings is None or "working_dir" not in settings or not settings["working_dir"]:
+        return None
+
+    folder = Path(settings["working_dir"]) / MOW_FOLDER_NAME
+    os.makedirs(folder, exist_ok=True)
+    return folder
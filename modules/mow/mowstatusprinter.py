@@ -6,6 +6,7 @@ from math import sqrt
 from ..general.verboseprinterclass import VerbosePrinterClass
 from ..general.mediatransitioner import DELETE_FOLDER_NAME
 from ..general.medafilefactories import createAnyValidMediaFile
+from ..general.mediafile import StemIndex
 
 
 class MowStatusPrinter(VerbosePrinterClass):
@@ -53,9 +54,11 @@ class MowStatusPrinter(VerbosePrinterClass):
             ):
                 # ignore all files in deleteFolder
                 dirs[:] = [d for d in dirs if d != DELETE_FOLDER_NAME]
+                stemIndex = StemIndex()
+                stemIndex.addDirectory(root, files)
                 for file in files:
                     mediafile = createAnyValidMediaFile(
-                        join(root, file), fast_creation=True
+                        join(root, file), fast_creation=True, stemIndex=stemIndex
                     )
                     if mediafile.isValid():
                         out[stage].append(mediafile)
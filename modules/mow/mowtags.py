@@ -1,12 +1,21 @@
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 import json
+import math
 import os
+import queue
 from pathlib import Path
+import re
+import tempfile
 from time import sleep
+from typing import Callable, TypeVar
 from exiftool import ExifToolHelper
+from exiftool.exceptions import ExifToolExecuteError
 from enum import StrEnum
 
 from ..general.mediafile import MediaFile
+from .xmpsidecar import XmpSidecarEngine
+from .tagcache import TagCache
 
 
 class MowTag(StrEnum):
@@ -49,15 +58,84 @@ tags_optional = [
 ]
 tags_all = tags_expected + tags_optional
 
+READ_CHUNK_SIZE = 200  # number of files read by a single exiftool call in read_tags_many
+WRITE_CHUNK_SIZE = 200  # number of files written by a single exiftool call in write_tags_many
+WRITE_MARKER = "{mow-write-done}"
+WRITE_SUCCESS_PATTERN = r"\b1 image files (updated|created|unchanged)"
+
+T = TypeVar("T")
+R = TypeVar("R")
+
 
 class MowTagFileManipulator:
     class InternalTag(StrEnum):
         GPSAltitude = "XMP:GPSAltitude"
         GPSAltitudeRef = "XMP:GPSAltitudeRef"
 
-    def __init__(self):
-        self.et = ExifToolHelper()
-        self.et.encoding = "utf8"
+    def __init__(
+        self,
+        native_sidecars: bool = True,
+        cache_file: Path = None,
+        nr_exiftool_processes: int = 1,
+    ):
+        """
+        native_sidecars: if True, xmp sidecars are read and written in-process by XmpSidecarEngine instead of exiftool, which is much faster for the many small sidecar writes of the stages.
+        cache_file: sqlite database of a TagCache; if given, read tags are cached across runs and stages as long as the files do not change.
+        nr_exiftool_processes: number of exiftool processes the chunks of read_tags_many and write_tags_many are distributed to (0 = one per cpu). Processes are started on first use.
+        """
+        if nr_exiftool_processes == 0:
+            nr_exiftool_processes = os.cpu_count() or 1
+
+        self.exiftools: list[ExifToolHelper] = []
+        for _ in range(max(1, nr_exiftool_processes)):
+            et = ExifToolHelper()
+            et.encoding = "utf8"
+            self.exiftools.append(et)
+        self.et = self.exiftools[0]  # used by all single file operations
+        self.sidecar_engine = XmpSidecarEngine() if native_sidecars else None
+        self.tag_cache = TagCache(cache_file) if cache_file is not None else None
+        self.cacheable_tags = self._prepare_gps_reading(list(tags_all))
+
+    def close(self):
+        for et in self.exiftools:
+            if et.running:
+                et.terminate()
+        if self.tag_cache is not None:
+            self.tag_cache.close()
+
+    def _map_on_exiftools(
+        self, func: Callable[[ExifToolHelper, T], R], items: list[T]
+    ) -> list[R]:
+        """
+        Calls func(exiftool, item) for every item, concurrently if there is more than one exiftool process.
+        Every exiftool process is used by only one thread at a time. Results are in the order of items.
+        """
+        if len(self.exiftools) == 1 or len(items) <= 1:
+            return [func(self.et, item) for item in items]
+
+        idle: queue.Queue[ExifToolHelper] = queue.Queue()
+        for et in self.exiftools:
+            idle.put(et)
+
+        def run(item: T) -> R:
+            et = idle.get()
+            try:
+                return func(et, item)
+            finally:
+                idle.put(et)
+
+        with ThreadPoolExecutor(max_workers=len(self.exiftools)) as executor:
+            return list(executor.map(run, items))
+
+    def _get_chunks(self, items: list[T], chunk_size: int) -> list[list[T]]:
+        """
+        Splits items into chunks of at most chunk_size items, but into at least as many chunks as there are exiftool processes.
+        """
+        chunk_size = max(1, min(chunk_size, math.ceil(len(items) / len(self.exiftools))))
+        return [items[start : start + chunk_size] for start in range(0, len(items), chunk_size)]
+
+    def _is_native_sidecar(self, file: Path | str) -> bool:
+        return self.sidecar_engine is not None and Path(file).suffix.lower() == ".xmp"
 
     def read_tags(
         self,
@@ -70,14 +148,116 @@ class MowTagFileManipulator:
 
         tags = self._prepare_gps_reading(tags)
 
-        # -n formats the gps output as decimal numbers (for gps data relevant), -struct makes hierarchical data readable as list
-        out = self.et.get_tags(
-            file, [tag.value for tag in tags], params=["-n", "-struct"]
-        )[0]
+        out = self._read_raw_tags([Path(file)], tags, skip_unreadable=False)[Path(file)]
+
+        return self._extract_read_tags(out, tags)
+
+    def read_tags_many(
+        self,
+        files: list[Path],
+        tags: list[MowTag],
+        chunk_size: int = READ_CHUNK_SIZE,
+    ) -> dict[Path, dict[MowTag, str | int | float]]:
+        """
+        Reads the same tags from many files, sending up to chunk_size files per exiftool call (exiftool answers with one json list per call).
+        Returns a dict keyed by Path(file) whose values are the same as read_tags would return.
+        If a chunk fails (e.g. because one of its files is broken), its files are read one by one and files that fail individually are missing in the result,
+        so callers can decide how to report them, e.g. by calling read_tags for them again.
+        """
+        tags = self._prepare_gps_reading(list(tags))
+        files = list(dict.fromkeys(Path(file) for file in files))
+
+        out = self._read_raw_tags(files, tags, skip_unreadable=True, chunk_size=chunk_size)
 
-        read_tags = {tag: out[tag.value] for tag in tags if tag.value in out}
+        return {file: self._extract_read_tags(out[file], tags) for file in files if file in out}
 
-        out = self._convert_to_outer_gps_tags(read_tags)
+    def _read_raw_tags(
+        self,
+        files: list[Path],
+        tags: list[MowTag],
+        skip_unreadable: bool,
+        chunk_size: int = READ_CHUNK_SIZE,
+    ) -> dict[Path, dict[str, str | int | float]]:
+        """
+        Returns the tags as given by exiftool, served from the tag cache where possible.
+        With a tag cache, all cacheable tags are read, so that later reads of other tags of the same files hit the cache as well.
+        """
+        use_cache = self.tag_cache is not None and set(tags) <= set(self.cacheable_tags)
+        if not use_cache:
+            return self._read_raw_tags_from_files(files, tags, skip_unreadable, chunk_size)
+
+        fingerprints = {file: self.tag_cache.fingerprint_of(file) for file in files}
+        out = self.tag_cache.get_many(fingerprints)
+        for file, cached in out.items():
+            cached[MowTag.sourcefile.value] = str(file)
+
+        read = self._read_raw_tags_from_files(
+            [file for file in files if file not in out],
+            self.cacheable_tags,
+            skip_unreadable,
+            chunk_size,
+        )
+        self.tag_cache.put_many(
+            {
+                file: (
+                    fingerprints[file],
+                    {k: v for k, v in result.items() if k != MowTag.sourcefile.value},
+                )
+                for file, result in read.items()
+            }
+        )
+
+        out.update(read)
+        return out
+
+    def _read_raw_tags_from_files(
+        self,
+        files: list[Path],
+        tags: list[MowTag],
+        skip_unreadable: bool,
+        chunk_size: int,
+    ) -> dict[Path, dict[str, str | int | float]]:
+        values = [tag.value for tag in tags]
+        out: dict[Path, dict[str, str | int | float]] = {}
+
+        for file in [file for file in files if self._is_native_sidecar(file)]:
+            try:
+                out[file] = self.sidecar_engine.read_tags(file, values)
+            except Exception:
+                if not skip_unreadable:
+                    raise
+
+        files = [file for file in files if not self._is_native_sidecar(file)]
+
+        def read_chunk(et: ExifToolHelper, chunk: list[Path]) -> dict[Path, dict]:
+            try:
+                # -n formats the gps output as decimal numbers (for gps data relevant), -struct makes hierarchical data readable as list
+                results = et.get_tags(
+                    [str(file) for file in chunk], values, params=["-n", "-struct"]
+                )
+            except Exception:
+                if not skip_unreadable:
+                    raise
+                results = None
+
+            if results is not None and len(results) == len(chunk):
+                return dict(zip(chunk, results))
+
+            read = {}
+            for file in chunk:
+                try:
+                    read[file] = et.get_tags(
+                        str(file), values, params=["-n", "-struct"]
+                    )[0]
+                except Exception:
+                    if not skip_unreadable:
+                        raise
+            return read
+
+        for read in self._map_on_exiftools(
+            read_chunk, self._get_chunks(files, chunk_size)
+        ):
+            out.update(read)
 
         return out
 
@@ -103,11 +283,169 @@ class MowTagFileManipulator:
 
         tags = self._convert_to_inner_gps_tags(tags)
 
-        self.et.set_tags(
-            file,
-            {tag.value: value for tag, value in tags.items()},
-            params=params,
-        )
+        try:
+            if self._is_native_sidecar(file):
+                self.sidecar_engine.write_tags(
+                    Path(file), {tag.value: value for tag, value in tags.items()}
+                )
+            else:
+                self.et.set_tags(
+                    file,
+                    {tag.value: value for tag, value in tags.items()},
+                    params=params,
+                )
+        finally:
+            # exiftool preserves the mtime (-P), so the cache would not notice the change by itself
+            self.invalidate_cached_tags_of([file])
+
+    def invalidate_cached_tags_of(self, files: list[Path]):
+        """
+        Has to be called before changing the tags of files without the write functions of this class.
+        """
+        if self.tag_cache is not None:
+            self.tag_cache.invalidate(files)
+
+    def relocate_cached_tags_of(self, moves: dict[Path, Path]):
+        """
+        moves: old path to new path of files that were moved (not copied), so that their cached tags remain usable.
+        """
+        if self.tag_cache is not None:
+            self.tag_cache.relocate(moves)
+
+    def write_tags_many(
+        self,
+        file_to_tags: dict[Path, dict[MowTag, str | int | float]],
+        overwrite_original: bool = True,
+        chunk_size: int = WRITE_CHUNK_SIZE,
+    ) -> dict[Path, str]:
+        """
+        Writes individual tags to many files, sending up to chunk_size files per exiftool call.
+        The per-file commands are written into an argfile (-@) and separated by -execute, every command echoes a marker after processing
+        so that the output of exiftool can be mapped back to the single files.
+        Returns the error messages of all files that could not be written, keyed by Path(file).
+        """
+        commands: list[tuple[Path, list[str]]] = []
+        errors: dict[Path, str] = {}
+
+        for file, tags in file_to_tags.items():
+            args = self._get_write_args(tags, overwrite_original)
+            if args is None:
+                continue
+            if self._is_native_sidecar(file) or any("\n" in arg for arg in args):
+                # argfiles are line based, so files with multiline values are written on their own, as are sidecars written without exiftool
+                try:
+                    self.write_tags(file, dict(tags), overwrite_original)
+                except Exception as e:
+                    errors[Path(file)] = str(e)
+                continue
+            commands.append((Path(file), args))
+
+        def write_chunk(
+            et: ExifToolHelper, chunk: list[tuple[Path, list[str]]]
+        ) -> dict[Path, str]:
+            try:
+                return self._execute_write_commands(et, chunk)
+            finally:
+                self.invalidate_cached_tags_of([file for file, _ in chunk])
+
+        for chunk_errors in self._map_on_exiftools(
+            write_chunk, self._get_chunks(commands, chunk_size)
+        ):
+            errors.update(chunk_errors)
+
+        return errors
+
+    def _get_write_args(
+        self, tags: dict[MowTag, str | int | float], overwrite_original: bool
+    ) -> list[str] | None:
+        """
+        Returns the exiftool arguments write_tags would use for the given tags (without the file) or None if there is nothing to write.
+        """
+        tags = {tag: value for tag, value in tags.items() if tag != MowTag.sourcefile}
+
+        if len(tags) == 0:
+            return None
+
+        args = ["-P", "-L", "-m"]
+        if overwrite_original:
+            args.append("-overwrite_original")
+
+        for tag, value in self._convert_to_inner_gps_tags(tags).items():
+            if isinstance(value, list):
+                args += [f"-{tag.value}={item}" for item in value]
+            else:
+                args.append(f"-{tag.value}={value}")
+
+        return args
+
+    def _execute_write_commands(
+        self, et: ExifToolHelper, commands: list[tuple[Path, list[str]]]
+    ) -> dict[Path, str]:
+        lines: list[str] = []
+        for index, (file, args) in enumerate(commands):
+            if index > 0:
+                lines.append("-execute")
+            # ${status} is replaced by exiftool with the exit status of this command
+            marker = f"{WRITE_MARKER} {index} ${{status}}"
+            lines += args + [str(file), "-echo3", marker, "-echo4", marker]
+
+        with tempfile.NamedTemporaryFile(
+            "w", suffix=".args", encoding=et.encoding, delete=False
+        ) as argfile:
+            argfile.write("\n".join(lines) + "\n")
+
+        try:
+            stdout, stderr = et.execute("-@", argfile.name), et.last_stderr
+        except ExifToolExecuteError as e:
+            stdout, stderr = e.stdout, e.stderr
+        finally:
+            os.remove(argfile.name)
+
+        stdout_parts = self._split_by_write_markers(stdout)
+        stderr_parts = self._split_by_write_markers(stderr)
+
+        errors: dict[Path, str] = {}
+        for index, (file, _) in enumerate(commands):
+            status, stdout_part = stdout_parts.get(index, (None, ""))
+            _, stderr_part = stderr_parts.get(index, (None, ""))
+            error_lines = [
+                line for line in stderr_part.splitlines() if line.startswith("Error")
+            ]
+
+            if status is None:
+                failed = (
+                    len(error_lines) > 0
+                    or re.search(WRITE_SUCCESS_PATTERN, stdout_part) is None
+                )
+            else:
+                failed = status != 0
+
+            if failed:
+                errors[file] = (
+                    "\n".join(error_lines)
+                    if len(error_lines) > 0
+                    else f"exiftool did not write the file: {stdout_part.strip()} {stderr_part.strip()}"
+                )
+
+        return errors
+
+    @staticmethod
+    def _split_by_write_markers(output: str) -> dict[int, tuple[int | None, str]]:
+        """
+        Every marker is echoed after the output of its command, so the text before a marker belongs to the command with the markers index.
+        Returns index to (exit status if known, output).
+        """
+        out: dict[int, tuple[int | None, str]] = {}
+        text = ""
+        for line in (output or "").splitlines():
+            if not line.startswith(WRITE_MARKER):
+                text += line + "\n"
+                continue
+            parts = line.split()
+            status = int(parts[2]) if len(parts) > 2 and parts[2].isdigit() else None
+            out[int(parts[1])] = (status, text)
+            text = ""
+        return out
 
     def write_to_mediafile(
         self, mFile: MediaFile, tags: dict[MowTag, int | str | float]
@@ -152,17 +490,35 @@ class MowTagFileManipulator:
         if mFile.has_sidecar():
             raise ValueError("Mediafile already has a sidecar.")
 
-        tags = self._get_combined_file_tags_from(
+        tags = self.get_initial_sidecar_tags_of(
             mFile, ignore_differing_tags=ignore_differing_tags
         )
 
-        if len(tags) == 0:
-            tags = {MowTag.label: "created by mow"}
-
         self.write_to_sidecar(mFile, tags)
 
         return Path(mFile.get_sidecar())
 
+    def get_initial_sidecar_tags_of(
+        self,
+        mFile: MediaFile,
+        ignore_differing_tags: list[MowTag] = [],
+        known_reads: dict[Path, dict[MowTag, str | int | float]] = None,
+    ) -> dict[MowTag, str | int | float]:
+        """
+        Returns the tags a newly created sidecar of the mediafile should contain.
+        known_reads: tags_all of (some of) the files of the mediafile, as returned by read_tags_many. Missing files are read.
+        """
+        tags = self._get_combined_file_tags_from(
+            mFile,
+            ignore_differing_tags=ignore_differing_tags,
+            known_reads=known_reads,
+        )
+
+        if len(tags) == 0:
+            tags = {MowTag.label: "created by mow"}
+
+        return tags
+
     def merge_sidecar_into_mediafile(self, mFile: MediaFile):
         """
         Copies all tags from the sidecar to the file(s) and removes the sidecar.
@@ -174,6 +530,14 @@ class MowTagFileManipulator:
         self.write_to_mediafile(mFile, tags)
 
         sidecar.unlink()
+        self.invalidate_cached_tags_of([sidecar])
+
+    def _extract_read_tags(
+        self, result: dict[str, str | int | float], tags: list[MowTag]
+    ) -> dict[MowTag, str | int | float]:
+        read_tags = {tag: result[tag.value] for tag in tags if tag.value in result}
+
+        return self._convert_to_outer_gps_tags(read_tags)
 
     def _convert_to_inner_gps_tags(
         self, tags: dict[MowTag, str | int | float]
@@ -249,10 +613,22 @@ class MowTagFileManipulator:
         self,
         mFile: MediaFile,
         ignore_differing_tags: list[MowTag],
+        known_reads: dict[Path, dict[MowTag, str | int | float]] = None,
     ) -> dict[MowTag, str]:
         tags = {}
-        for file in mFile.getAllFileNames():
-            new_tags = self.read_tags(file, tags_all)
+        files = mFile.getAllFileNames()
+        known_reads = known_reads if known_reads is not None else {}
+        missing = [file for file in files if file not in known_reads]
+        missing_reads = (
+            self.read_tags_many(missing, tags_all) if len(missing) > 0 else {}
+        )
+        for file in files:
+            if file in known_reads:
+                new_tags = dict(known_reads[file])
+            elif file in missing_reads:
+                new_tags = dict(missing_reads[file])
+            else:
+                new_tags = self.read_tags(file, tags_all)
 
             if MowTag.sourcefile in new_tags:
                 new_tags.pop(MowTag.sourcefile)
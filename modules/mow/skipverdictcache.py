@@ -0,0 +1,83 @@
+import json
+import os
+from pathlib import Path
+import sqlite3
+import threading
+
+SKIP_VERDICT_CACHE_FILE_NAME = "skipverdicts.sqlite"
+QUERY_CHUNK_SIZE = 500  # sqlite limits the number of variables of a single query
+
+
+class SkipVerdictCache:
+    """
+    Persistent cache of the reasons why mediafiles were skipped by a transitioner, stored as sqlite database (usually in the mow folder of the working directory).
+    A verdict is keyed by the context (transitioner and its options) and the path of the mediafile and is only valid as long as
+    none of the files of the mediafile changed, i.e. size and mtime of all its files are the same as when the verdict was made.
+    """
+
+    def __init__(self, database: Path, context: str):
+        self.context = context
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(str(database), check_same_thread=False)
+        with self.lock, self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS verdicts (context TEXT NOT NULL, path TEXT NOT NULL, fingerprint TEXT NOT NULL, reason TEXT NOT NULL, PRIMARY KEY (context, path))"
+            )
+
+    @staticmethod
+    def fingerprint_of(files: list[Path]) -> str | None:
+        """
+        Returns None if one of the files does not exist.
+        """
+        entries = []
+        for file in files:
+            try:
+                stat = os.stat(file)
+            except OSError:
+                return None
+            entries.append((os.path.splitext(file)[1], stat.st_size, stat.st_mtime_ns))
+        return json.dumps(sorted(entries))
+
+    def get_many(self, fingerprints: dict[str, str | None]) -> dict[str, str]:
+        """
+        fingerprints: path of mediafile to its current fingerprint
+        Returns the skip reasons of all mediafiles that did not change since their verdict.
+        """
+        paths = [path for path, fingerprint in fingerprints.items() if fingerprint]
+        out: dict[str, str] = {}
+
+        with self.lock:
+            for start in range(0, len(paths), QUERY_CHUNK_SIZE):
+                chunk = paths[start : start + QUERY_CHUNK_SIZE]
+                rows = self.connection.execute(
+                    f"SELECT path, fingerprint, reason FROM verdicts WHERE context = ? AND path IN ({','.join('?' * len(chunk))})",
+                    [self.context, *chunk],
+                ).fetchall()
+                for path, fingerprint, reason in rows:
+                    if fingerprints[path] == fingerprint:
+                        out[path] = reason
+
+        return out
+
+    def update(self, skipped: dict[str, tuple[str, str]], passed: list[str]):
+        """
+        skipped: path of mediafile to (fingerprint taken before the verdict, skip reason)
+        passed: paths of mediafiles that were not skipped, their verdicts are removed
+        """
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO verdicts (context, path, fingerprint, reason) VALUES (?, ?, ?, ?)",
+                [
+                    (self.context, path, fingerprint, reason)
+                    for path, (fingerprint, reason) in skipped.items()
+                    if fingerprint is not None
+                ],
+            )
+            self.connection.executemany(
+                "DELETE FROM verdicts WHERE context = ? AND path = ?",
+                [(self.context, path) for path in passed],
+            )
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
@@ -0,0 +1,122 @@
+import datetime as dt
+import os
+from pathlib import Path
+import sqlite3
+import sys
+import threading
+
+SOURCE_DATE_INDEX_FILE_NAME = "sourcedates.sqlite"
+QUERY_CHUNK_SIZE = 500  # sqlite limits the number of variables of a single query
+
+
+def get_mount_point_of(path: str) -> str:
+    path = os.path.abspath(path)
+    while not os.path.ismount(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+    return path
+
+
+def get_volume_id_of(path: str) -> str:
+    """
+    Returns an id of the volume (e.g. memory card) containing path that stays the same if the volume is mounted at another place.
+    Falls back to the device number if no such id can be found.
+    """
+    mountPoint = get_mount_point_of(path)
+
+    if sys.platform == "win32":
+        import ctypes
+
+        serial = ctypes.c_ulong()
+        if ctypes.windll.kernel32.GetVolumeInformationW(
+            ctypes.c_wchar_p(mountPoint),
+            None,
+            0,
+            ctypes.byref(serial),
+            None,
+            None,
+            None,
+            0,
+        ):
+            return f"serial:{serial.value:08X}"
+
+    uuidFolder = "/dev/disk/by-uuid"
+    device = os.stat(mountPoint).st_dev
+    if os.path.isdir(uuidFolder):
+        for uuid in os.listdir(uuidFolder):
+            try:
+                if os.stat(os.path.join(uuidFolder, uuid)).st_rdev == device:
+                    return f"uuid:{uuid}"
+            except OSError:
+                continue
+
+    return f"dev:{device}"
+
+
+class SourceDateIndex:
+    """
+    Persistent index of the capture dates of files on import sources, stored as sqlite database (usually in the mow folder of the working directory).
+    Files are keyed by the id of their volume and their path relative to its mount point, so a card is recognized wherever it is mounted.
+    A date is only valid as long as size and mtime of the file did not change.
+    """
+
+    def __init__(self, database: Path, source: str):
+        self.volume = get_volume_id_of(source)
+        self.mountPoint = get_mount_point_of(source)
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(str(database), check_same_thread=False)
+        with self.lock, self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS dates (volume TEXT NOT NULL, path TEXT NOT NULL, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, date TEXT NOT NULL, PRIMARY KEY (volume, path))"
+            )
+
+    def _key_of(self, file: Path) -> str:
+        return Path(os.path.relpath(file, self.mountPoint)).as_posix()
+
+    def get_many(self, files: list[Path]) -> dict[Path, dt.datetime]:
+        """
+        Returns the dates of all files that did not change since their date was put into the index.
+        """
+        stats = {self._key_of(file): (file, os.stat(file)) for file in files}
+        keys = list(stats.keys())
+        out: dict[Path, dt.datetime] = {}
+
+        with self.lock:
+            for start in range(0, len(keys), QUERY_CHUNK_SIZE):
+                chunk = keys[start : start + QUERY_CHUNK_SIZE]
+                rows = self.connection.execute(
+                    f"SELECT path, size, mtime_ns, date FROM dates WHERE volume = ? AND path IN ({','.join('?' * len(chunk))})",
+                    [self.volume, *chunk],
+                ).fetchall()
+                for key, size, mtime_ns, date in rows:
+                    file, stat = stats[key]
+                    if stat.st_size == size and stat.st_mtime_ns == mtime_ns:
+                        out[file] = dt.datetime.fromisoformat(date)
+
+        return out
+
+    def put_many(self, dates: dict[Path, dt.datetime]):
+        entries = []
+        for file, date in dates.items():
+            stat = os.stat(file)
+            entries.append(
+                (
+                    self.volume,
+                    self._key_of(file),
+                    stat.st_size,
+                    stat.st_mtime_ns,
+                    date.isoformat(),
+                )
+            )
+
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO dates (volume, path, size, mtime_ns, date) VALUES (?, ?, ?, ?, ?)",
+                entries,
+            )
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
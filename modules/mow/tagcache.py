@@ -0,0 +1,114 @@
+import json
+import os
+from pathlib import Path
+import sqlite3
+import threading
+
+TAG_CACHE_FILE_NAME = "tagcache.sqlite"
+QUERY_CHUNK_SIZE = 500  # sqlite limits the number of variables of a single query
+
+Fingerprint = tuple[int, int, int]
+
+
+class TagCache:
+    """
+    Persistent cache of the tags read by MowTagFileManipulator, stored as sqlite database (usually in the mow folder of the working directory).
+    Entries are keyed by the absolute path of a file and are only valid as long as size, mtime and inode of the file are the same as when the tags were read.
+    As exiftool is called with -P (preserving mtime) when writing tags, every write has to invalidate the entries of the written files.
+    External tools writing with preserved mtime are noticed by the changed inode, as long as they write a new file like exiftool does.
+    Changes of tools that edit files in place and restore their timestamps are not noticed, for those the cache has to be cleared (mow --clear-tag-cache).
+    """
+
+    def __init__(self, database: Path):
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(str(database), check_same_thread=False)
+        with self.lock, self.connection:
+            columns = [
+                row[1]
+                for row in self.connection.execute("PRAGMA table_info(tags)").fetchall()
+            ]
+            if len(columns) > 0 and "inode" not in columns:
+                # written by a version keyed without inode, which is just read again
+                self.connection.execute("DROP TABLE tags")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS tags (path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, inode INTEGER NOT NULL, tags TEXT NOT NULL)"
+            )
+
+    @staticmethod
+    def fingerprint_of(file: Path) -> Fingerprint | None:
+        try:
+            stat = os.stat(file)
+        except OSError:
+            return None
+        return (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+
+    def get_many(
+        self, fingerprints: dict[Path, Fingerprint | None]
+    ) -> dict[Path, dict[str, str | int | float]]:
+        """
+        fingerprints: file to fingerprint_of(file) at the time of reading
+        Returns the cached tags of all files whose fingerprint did not change.
+        """
+        keys = {self._key_of(file): file for file, fp in fingerprints.items() if fp}
+        out: dict[Path, dict[str, str | int | float]] = {}
+
+        paths = list(keys.keys())
+        with self.lock:
+            for start in range(0, len(paths), QUERY_CHUNK_SIZE):
+                chunk = paths[start : start + QUERY_CHUNK_SIZE]
+                rows = self.connection.execute(
+                    f"SELECT path, size, mtime_ns, inode, tags FROM tags WHERE path IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+                for path, size, mtime_ns, inode, tags in rows:
+                    file = keys[path]
+                    if fingerprints[file] == (size, mtime_ns, inode):
+                        out[file] = json.loads(tags)
+
+        return out
+
+    def put_many(
+        self, entries: dict[Path, tuple[Fingerprint | None, dict[str, str | int | float]]]
+    ):
+        """
+        entries: file to (fingerprint of the file taken before reading its tags, read tags)
+        """
+        rows = [
+            (self._key_of(file), *fingerprint, json.dumps(tags))
+            for file, (fingerprint, tags) in entries.items()
+            if fingerprint is not None
+        ]
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO tags (path, size, mtime_ns, inode, tags) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def invalidate(self, files: list[Path]):
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "DELETE FROM tags WHERE path = ?",
+                [(self._key_of(file),) for file in files],
+            )
+
+    def relocate(self, moves: dict[Path, Path]):
+        """
+        moves: old path to new path of moved files. As moving keeps size, mtime and inode (on the same filesystem), the entries stay valid.
+        """
+        with self.lock, self.connection:
+            for src, dst in moves.items():
+                self.connection.execute(
+                    "DELETE FROM tags WHERE path = ?", (self._key_of(dst),)
+                )
+                self.connection.execute(
+                    "UPDATE tags SET path = ? WHERE path = ?",
+                    (self._key_of(dst), self._key_of(src)),
+                )
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+    @staticmethod
+    def _key_of(file: Path) -> str:
+        return os.path.normcase(os.path.abspath(file))
@@ -0,0 +1,94 @@
+import json
+import os
+from pathlib import Path
+import threading
+
+JOURNAL_FOLDER_NAME = "journal"
+
+PLANNED = "planned"
+TAGGED = "tagged"
+RELOCATED = "relocated"
+
+
+class TransitionJournal:
+    """
+    Write-ahead journal of a single transition run, stored as json lines file.
+    The first line contains the planned tasks (source file, new name and meta tags to write), every following line marks one or more
+    source files as tagged (meta tags were written) or relocated (transition finished). The journal is removed once the run finishes,
+    so an existing journal always belongs to an interrupted run.
+    """
+
+    def __init__(self, file: Path):
+        self.file = Path(file)
+        self.lock = threading.Lock()
+        self._handle = None
+
+    def exists(self) -> bool:
+        return self.file.exists()
+
+    def start(self, plannedTasks: list[dict]):
+        """
+        plannedTasks: one dict per task with the keys 'file', 'newName' and 'metaTags'
+        """
+        os.makedirs(self.file.parent, exist_ok=True)
+        with self.lock:
+            self._handle = open(self.file, "w", encoding="utf-8")
+            self._write({"type": PLANNED, "tasks": plannedTasks}, sync=True)
+
+    def reopen(self):
+        with self.lock:
+            self._handle = open(self.file, "a", encoding="utf-8")
+
+    def record(self, state: str, files: list[str]):
+        if len(files) == 0:
+            return
+        with self.lock:
+            if self._handle is not None:
+                # tags are written in batches, so they are synced to disk; relocations are only flushed, as they are cheap to check on resume
+                self._write({"type": state, "files": files}, sync=state == TAGGED)
+
+    def read(self) -> tuple[list[dict], set[str], set[str]]:
+        """
+        Returns planned tasks, tagged files, relocated files. A line that was only partially written when the run was killed is ignored.
+        """
+        plannedTasks: list[dict] = []
+        tagged: set[str] = set()
+        relocated: set[str] = set()
+
+        with open(self.file, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if entry["type"] == PLANNED:
+                    plannedTasks = entry["tasks"]
+                elif entry["type"] == TAGGED:
+                    tagged.update(entry["files"])
+                elif entry["type"] == RELOCATED:
+                    relocated.update(entry["files"])
+
+        return plannedTasks, tagged, relocated
+
+    def finish(self):
+        """
+        Closes and removes the journal.
+        """
+        with self.lock:
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
+            if self.file.exists():
+                self.file.unlink()
+
+    def close(self):
+        with self.lock:
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
+
+    def _write(self, entry: dict, sync: bool):
+        self._handle.write(json.dumps(entry, default=str) + "\n")
+        self._handle.flush()
+        if sync:
+            os.fsync(self._handle.fileno())
@@ -0,0 +1,341 @@
+from dataclasses import dataclass
+from fractions import Fraction
+import io
+import os
+from pathlib import Path
+import re
+import tempfile
+import xml.etree.ElementTree as ET
+
+NS_X = "adobe:ns:meta/"
+NS_RDF = "http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+NS_XML = "http://www.w3.org/XML/1998/namespace"
+
+namespaces = {
+    "x": NS_X,
+    "rdf": NS_RDF,
+    "dc": "http://purl.org/dc/elements/1.1/",
+    "xmp": "http://ns.adobe.com/xap/1.0/",
+    "lr": "http://ns.adobe.com/lightroom/1.0/",
+    "exif": "http://ns.adobe.com/exif/1.0/",
+}
+
+XPACKET_BEGIN = "<?xpacket begin='﻿' id='W5M0MpCehiHzreSzNTczkc9d'?>"
+XPACKET_END = "<?xpacket end='w'?>"
+
+
+@dataclass(frozen=True)
+class XmpProperty:
+    """
+    namespace: uri of the namespace of the property
+    name: local name of the property
+    container: None for simple properties, otherwise 'Bag', 'Seq' or 'Alt' (language alternatives)
+    kind: how the value is converted, one of 'text', 'number', 'date', 'gps', 'rational'
+    """
+
+    namespace: str
+    name: str
+    container: str = None
+    kind: str = "text"
+
+    def tag(self) -> str:
+        return f"{{{self.namespace}}}{self.name}"
+
+
+# keys are the exiftool tag names used by MowTag and MowTagFileManipulator.InternalTag
+xmp_properties: dict[str, XmpProperty] = {
+    "XMP:Date": XmpProperty(namespaces["dc"], "date", "Seq", "date"),
+    "XMP:Source": XmpProperty(namespaces["dc"], "source"),
+    "XMP:Description": XmpProperty(namespaces["dc"], "description", "Alt"),
+    "XMP:Rating": XmpProperty(namespaces["xmp"], "Rating", kind="number"),
+    "XMP:Subject": XmpProperty(namespaces["dc"], "subject", "Bag"),
+    "XMP:HierarchicalSubject": XmpProperty(
+        namespaces["lr"], "hierarchicalSubject", "Bag"
+    ),
+    "XMP:Label": XmpProperty(namespaces["xmp"], "Label"),
+    "XMP:Contributor": XmpProperty(namespaces["dc"], "contributor", "Bag"),
+    "XMP:GPSLatitude": XmpProperty(namespaces["exif"], "GPSLatitude", kind="gps"),
+    "XMP:GPSLongitude": XmpProperty(namespaces["exif"], "GPSLongitude", kind="gps"),
+    "XMP:GPSAltitude": XmpProperty(namespaces["exif"], "GPSAltitude", kind="rational"),
+    "XMP:GPSAltitudeRef": XmpProperty(
+        namespaces["exif"], "GPSAltitudeRef", kind="number"
+    ),
+}
+
+SOURCEFILE_TAG = "SourceFile"
+
+# write_tags calls exiftool with -L, so exiftool reads the utf-8 encoded values as cp1252 (bytes cp1252 leaves undefined are kept as they are).
+_cp1252_high_chars = {}
+for _byte in range(0x80, 0xA0):
+    try:
+        _cp1252_high_chars[_byte] = bytes([_byte]).decode("cp1252")
+    except UnicodeDecodeError:
+        pass
+
+
+class XmpSidecarEngine:
+    """
+    Reads and writes the tags of xmp sidecar files in-process, without starting exiftool.
+    Tags are given and returned with their exiftool names, and the values are converted the way exiftool does with the parameters used by MowTagFileManipulator
+    (-n -struct for reading, -L for writing), so that sidecars written by this engine and by exiftool are interchangeable.
+    Other content of existing sidecars, e.g. tags written by Lightroom or XnView, is preserved.
+    """
+
+    def read_tags(self, file: Path, tags: list[str]) -> dict[str, str | int | float]:
+        root = self._parse(file)
+        descriptions = self._get_descriptions(root)
+
+        out: dict[str, str | int | float] = {SOURCEFILE_TAG: str(file)}
+        for tag in tags:
+            if tag not in xmp_properties:
+                continue
+            value = self._read_property(descriptions, xmp_properties[tag])
+            if value is not None:
+                out[tag] = value
+
+        return out
+
+    def write_tags(self, file: Path, tags: dict[str, str | int | float | list]):
+        """
+        Creates the sidecar if it does not exist yet. Empty lists leave the tag untouched, as exiftool does.
+        """
+        if os.path.exists(file):
+            with open(file, "r", encoding="utf-8") as f:
+                content = f.read()
+            self._register_namespaces_of(content)
+            root = ET.fromstring(self._strip_xpacket(content))
+        else:
+            content = ""
+            root = ET.Element(f"{{{NS_X}}}xmpmeta")
+            ET.SubElement(root, f"{{{NS_RDF}}}RDF")
+
+        for tag, value in tags.items():
+            if tag not in xmp_properties:
+                raise ValueError(f"Tag {tag} is not supported by the xmp sidecar engine.")
+            if isinstance(value, list) and len(value) == 0:
+                continue
+            self._write_property(root, xmp_properties[tag], value)
+
+        self._save(file, content, root)
+
+    def _parse(self, file: Path) -> ET.Element:
+        with open(file, "r", encoding="utf-8") as f:
+            content = f.read()
+        return ET.fromstring(self._strip_xpacket(content))
+
+    @staticmethod
+    def _strip_xpacket(content: str) -> str:
+        return re.sub(r"<\?xpacket[^>]*\?>", "", content).strip().lstrip("﻿")
+
+    @staticmethod
+    def _register_namespaces_of(content: str):
+        """
+        Makes ElementTree keep the prefixes of the file instead of inventing ns0, ns1, ...
+        """
+        for _, (prefix, uri) in ET.iterparse(
+            io.StringIO(XmpSidecarEngine._strip_xpacket(content)), events=("start-ns",)
+        ):
+            try:
+                ET.register_namespace(prefix, uri)
+            except ValueError:
+                pass
+
+    @staticmethod
+    def _get_rdf(root: ET.Element) -> ET.Element:
+        if root.tag == f"{{{NS_RDF}}}RDF":
+            return root
+        rdf = root.find(f".//{{{NS_RDF}}}RDF")
+        if rdf is None:
+            raise ValueError("Xmp sidecar does not contain a rdf:RDF element.")
+        return rdf
+
+    def _get_descriptions(self, root: ET.Element) -> list[ET.Element]:
+        return self._get_rdf(root).findall(f"{{{NS_RDF}}}Description")
+
+    def _read_property(
+        self, descriptions: list[ET.Element], prop: XmpProperty
+    ) -> str | int | float | list | None:
+        for description in descriptions:
+            if prop.tag() in description.attrib:
+                return self._convert_read(description.attrib[prop.tag()], prop, True)
+
+            element = description.find(prop.tag())
+            if element is None:
+                continue
+
+            container = element.find(f"{{{NS_RDF}}}{prop.container}") if prop.container else None
+            if container is None:
+                return self._convert_read(element.text or "", prop, True)
+
+            items = container.findall(f"{{{NS_RDF}}}li")
+            if prop.container == "Alt":
+                default = [
+                    li for li in items if li.get(f"{{{NS_XML}}}lang") == "x-default"
+                ]
+                chosen = default[0] if len(default) > 0 else (items[0] if items else None)
+                return None if chosen is None else chosen.text or ""
+
+            return [self._convert_read(li.text or "", prop, False) for li in items]
+
+        return None
+
+    def _convert_read(
+        self, text: str, prop: XmpProperty, single: bool
+    ) -> str | int | float | list:
+        text = text.strip() if prop.kind != "text" else text
+        match prop.kind:
+            case "number":
+                value = self._to_number(float(text))
+            case "rational":
+                value = self._to_number(float(Fraction(text)))
+            case "gps":
+                value = self._to_number(self._parse_gps_coordinate(text))
+            case "date":
+                value = self._xmp_date_to_exiftool(text)
+            case _:
+                value = text
+
+        if single and prop.container in ["Bag", "Seq"]:
+            return [value]
+        return value
+
+    def _write_property(
+        self, root: ET.Element, prop: XmpProperty, value: str | int | float | list
+    ):
+        descriptions = self._get_descriptions(root)
+        for description in descriptions:
+            description.attrib.pop(prop.tag(), None)
+            for element in description.findall(prop.tag()):
+                description.remove(element)
+
+        description = next(
+            (
+                d
+                for d in descriptions
+                if any(key.startswith(f"{{{prop.namespace}}}") for key in d.attrib)
+                or any(child.tag.startswith(f"{{{prop.namespace}}}") for child in d)
+            ),
+            descriptions[0] if len(descriptions) > 0 else None,
+        )
+        if description is None:
+            description = ET.SubElement(
+                self._get_rdf(root), f"{{{NS_RDF}}}Description", {f"{{{NS_RDF}}}about": ""}
+            )
+
+        element = ET.SubElement(description, prop.tag())
+        values = value if isinstance(value, list) else [value]
+
+        if prop.container is None:
+            element.text = self._convert_write(values[-1], prop)
+            return
+
+        container = ET.SubElement(element, f"{{{NS_RDF}}}{prop.container}")
+        if prop.container == "Alt":
+            li = ET.SubElement(container, f"{{{NS_RDF}}}li", {f"{{{NS_XML}}}lang": "x-default"})
+            li.text = self._convert_write(values[-1], prop)
+            return
+
+        for item in values:
+            li = ET.SubElement(container, f"{{{NS_RDF}}}li")
+            li.text = self._convert_write(item, prop)
+
+    def _convert_write(self, value: str | int | float, prop: XmpProperty) -> str:
+        match prop.kind:
+            case "number":
+                return str(self._to_number(float(value)))
+            case "rational":
+                fraction = Fraction(str(value)).limit_denominator(1000000)
+                return f"{fraction.numerator}/{fraction.denominator}"
+            case "gps":
+                return self._format_gps_coordinate(float(value), prop.name)
+            case "date":
+                return self._exiftool_date_to_xmp(self._as_latin_input(str(value)))
+            case _:
+                return self._as_latin_input(str(value))
+
+    def _save(self, file: Path, original_content: str, root: ET.Element):
+        for prefix, uri in namespaces.items():
+            ET.register_namespace(prefix, uri)
+
+        ET.indent(root, space=" ")
+        body = ET.tostring(root, encoding="unicode")
+
+        begin = re.search(r"<\?xpacket begin[^>]*\?>", original_content)
+        content = "\n".join(
+            [begin.group(0) if begin else XPACKET_BEGIN, body, XPACKET_END]
+        )
+
+        # write into a temporary file first, so that an interrupted write never leaves a broken sidecar behind
+        directory = os.path.dirname(os.path.abspath(file))
+        fd, tmp = tempfile.mkstemp(suffix=".xmp.tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8", newline="\n") as f:
+                f.write(content + "\n")
+            os.replace(tmp, file)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    @staticmethod
+    def _to_number(value: float) -> int | float:
+        """
+        exiftool prints numbers with 15 significant digits, integers without decimal places.
+        """
+        text = f"{value:.15g}"
+        return int(text) if re.fullmatch(r"-?\d+", text) else float(text)
+
+    @staticmethod
+    def _parse_gps_coordinate(text: str) -> float:
+        """
+        Xmp stores coordinates as 'DDD,MM.mmk' or 'DDD,MM,SSk' with k being one of N,S,E,W.
+        """
+        sign = 1
+        if text[-1:].upper() in ["N", "S", "E", "W"]:
+            sign = -1 if text[-1].upper() in ["S", "W"] else 1
+            text = text[:-1]
+
+        parts = [float(part) for part in text.split(",")]
+        if parts[0] < 0:
+            sign = -1
+        value = sum(abs(part) / 60**i for i, part in enumerate(parts))
+        return sign * value
+
+    @staticmethod
+    def _format_gps_coordinate(value: float, name: str) -> str:
+        if name == "GPSLatitude":
+            ref = "N" if value >= 0 else "S"
+        else:
+            ref = "E" if value >= 0 else "W"
+
+        degrees = int(abs(value))
+        minutes = (abs(value) - degrees) * 60
+        return f"{degrees},{minutes:.8f}{ref}"
+
+    @staticmethod
+    def _xmp_date_to_exiftool(text: str) -> str:
+        match = re.fullmatch(r"(\d{4})-(\d{2})(?:-(\d{2}))?(?:T(.*))?", text.strip())
+        if match is None:
+            return text
+        year, month, day, time = match.groups()
+        date = ":".join(part for part in [year, month, day] if part is not None)
+        return date if time is None else f"{date} {time}"
+
+    @staticmethod
+    def _exiftool_date_to_xmp(text: str) -> str:
+        match = re.fullmatch(
+            r"(\d{4})[:-](\d{2})[:-](\d{2})(?:[ T](\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?)(.*))?",
+            text.strip(),
+        )
+        if match is None:
+            return text
+        year, month, day, time, zone = match.groups()
+        date = f"{year}-{month}-{day}"
+        return date if time is None else f"{date}T{time}{zone.strip()}"
+
+    @staticmethod
+    def _as_latin_input(value: str) -> str:
+        """
+        Mirrors exiftools -L option for the utf-8 encoded values sent by pyexiftool.
+        """
+        return value.encode("utf-8").decode("latin-1").translate(_cp1252_high_chars)
@@ -0,0 +1,102 @@
+import datetime as dt
+import os
+import re
+import struct
+from typing import BinaryIO, Iterator, Tuple
+
+QUICKTIME_EPOCH = dt.datetime(1904, 1, 1)
+BOX_HEADER_SIZE = 8
+MAX_HEADER_BOX_SIZE = 64 * 1024 * 1024  # moov and udta hold no media data, anything larger is a broken file
+ISO6709_PATTERN = re.compile(r"([+-]\d+(?:\.\d*)?)([+-]\d+(?:\.\d*)?)([+-]\d+(?:\.\d*)?)?")
+
+
+def readCreationDateOf(file: str) -> dt.datetime | None:
+    """
+    Returns the creation time of the movie header (moov/mvhd) of a mp4/mov file like exiftool's QuickTime:CreateDate, i.e. as naive datetime in utc.
+    Returns None if the file is no iso media file or its creation time is not set.
+    Only the box headers on the way to the movie header are read, the media data is skipped.
+    """
+    try:
+        with open(file, "rb") as f:
+            mvhd = _readBoxContent(f, ["moov", "mvhd"])
+    except (OSError, struct.error, ValueError):
+        return None
+    if mvhd is None or len(mvhd) < 4:
+        return None
+
+    version = mvhd[0]
+    seconds = (
+        struct.unpack(">Q", mvhd[4:12])[0]
+        if version == 1
+        else struct.unpack(">I", mvhd[4:8])[0]
+    )
+    if seconds == 0:
+        return None
+    return QUICKTIME_EPOCH + dt.timedelta(seconds=seconds)
+
+
+def readGpsPositionOf(file: str) -> Tuple[float, float, float | None] | None:
+    """
+    Returns latitude, longitude and elevation (None if not given) of the '©xyz' box of a mp4/mov file as written by phones and many cameras,
+    or None if the file has no position.
+    """
+    try:
+        with open(file, "rb") as f:
+            xyz = _readBoxContent(f, ["moov", "udta", "\xa9xyz"])
+    except (OSError, struct.error, ValueError):
+        return None
+    if xyz is None or len(xyz) < 4:
+        return None
+
+    length = struct.unpack(">H", xyz[0:2])[0]  # followed by 2 bytes language
+    match = ISO6709_PATTERN.match(xyz[4 : 4 + length].decode("ascii", errors="ignore"))
+    if match is None:
+        return None
+    latitude, longitude, elevation = match.groups()
+    return (
+        float(latitude),
+        float(longitude),
+        float(elevation) if elevation is not None else None,
+    )
+
+
+def _readBoxContent(f: BinaryIO, path: list[str]) -> bytes | None:
+    """
+    Follows path through the nested boxes and returns the content of the last box of path.
+    """
+    end = os.fstat(f.fileno()).st_size
+    for depth, name in enumerate(path):
+        for boxName, contentStart, contentEnd in _iterateBoxes(f, f.tell(), end):
+            if boxName != name:
+                continue
+            if contentEnd - contentStart > MAX_HEADER_BOX_SIZE:
+                return None
+            f.seek(contentStart)
+            if depth == len(path) - 1:
+                return f.read(contentEnd - contentStart)
+            end = contentEnd
+            break
+        else:
+            return None
+    return None
+
+
+def _iterateBoxes(f: BinaryIO, start: int, end: int) -> Iterator[Tuple[str, int, int]]:
+    """
+    Yields name, start and end of the content of all boxes between start and end, by seeking from box header to box header.
+    """
+    position = start
+    while position + BOX_HEADER_SIZE <= end:
+        f.seek(position)
+        size, name = struct.unpack(">I4s", f.read(BOX_HEADER_SIZE))
+        contentStart = position + BOX_HEADER_SIZE
+        if size == 1:  # 64 bit size follows the name
+            size = struct.unpack(">Q", f.read(8))[0]
+            contentStart += 8
+        elif size == 0:  # box extends to the end of the file
+            size = end - position
+        if size < contentStart - position:
+            raise ValueError(f"Invalid box size {size} at {position}")
+
+        yield name.decode("latin-1"), contentStart, position + size
+        position += size
@@ -1,32 +1,52 @@
 from shutil import copyfile
 from exiftool import ExifToolHelper
-from ..general.mediafile import MediaFile
+from typing import Tuple
+from ..general.mediafile import MediaFile, StemIndex
+from .quicktimereader import readCreationDateOf, readGpsPositionOf
 import datetime as dt
 
 
 class VideoFile(MediaFile):
     supportedFormats = [".MOV", ".mp4", ".3gp", ".m4v"]
 
-    def __init__(self, path: str):
-        super().__init__(path, validExtensions=self.supportedFormats)
+    def __init__(self, path: str, stemIndex: StemIndex = None):
+        super().__init__(path, validExtensions=self.supportedFormats, stemIndex=stemIndex)
+
+    dateTags = [
+        "QuickTime:CreateDate",
+        # "QuickTime:MediaCreateDate",
+        "File:FileModifyDate",
+    ]
 
     def readDateTime(self) -> dt.datetime:
         file = self.pathnoext + self.extensions[0]
+        result = readCreationDateOf(file)
+        if result is not None:
+            return result
+
         with ExifToolHelper() as et:
-            result = et.get_tags(
-                file,
-                [
-                    "QuickTime:CreateDate",
-                    #"QuickTime:MediaCreateDate",
-                    "File:FileModifyDate",
-                ],
-            )[0]
-            for key, value in result.items():
-                if key == "SourceFile":
-                    continue
-                try:
-                    return dt.datetime.strptime(value[0:19], "%Y:%m:%d %H:%M:%S")
-                except:  # noqa: E722
-                    pass
+            result = self.getDateTimeFrom(et.get_tags(file, self.dateTags)[0])
+            if result is not None:
+                return result
 
         raise Exception(f"Did not find creation date of video file {file}!")
+
+    def readGpsPosition(self) -> Tuple[float, float, float | None] | None:
+        """
+        Returns latitude, longitude and elevation embedded into the video, if any.
+        """
+        return readGpsPositionOf(self.pathnoext + self.extensions[0])
+
+    @staticmethod
+    def getDateTimeFrom(tags: dict[str, str]) -> dt.datetime | None:
+        """
+        tags: date tags of a video file as read by exiftool
+        """
+        for key, value in tags.items():
+            if key == "SourceFile":
+                continue
+            try:
+                return dt.datetime.strptime(value[0:19], "%Y:%m:%d %H:%M:%S")
+            except:  # noqa: E722
+                pass
+        return None
@@ -9,6 +9,12 @@ from ..modules.image.imageaggregator import (
     ImageAggregator,
     ImageFile,
 )
+from ..modules.mow.mowfolder import get_mow_folder_of
+from ..modules.mow.deferredoriginals import (
+    DEFERRED_ORIGINALS_FILE_NAME,
+    DeferredOriginals,
+    get_deferral_key_of,
+)
 from pathlib import Path
 from exiftool import ExifToolHelper, ExifTool
 
@@ -791,6 +797,48 @@ def test_rating4BothImagefilesAreTransitioned():
     assert not jpgWasDeleted(fullname) and not rawWasDeleted(fullname)
 
 
+def test_rating4ImageFetchesDeferredRawFromStash():
+    groupname = "2022-12-12@121212_TEST"
+    fullname = join(src, groupname, "2022-12-12@121212_test.jpg")
+    prepareTest(srcname=fullname)
+    settings = {
+        "working_dir": join(testsfolder, "mow_deferred_workingdir"),
+        "deferred_stash_dir": join(testsfolder, "mow_deferred_stash"),
+    }
+    shutil.rmtree(settings["working_dir"], ignore_errors=True)
+    shutil.rmtree(settings["deferred_stash_dir"], ignore_errors=True)
+    os.makedirs(settings["deferred_stash_dir"])
+
+    stashed = join(settings["deferred_stash_dir"], "test_aggregate.ORF")
+    shutil.move(fullname.replace(".jpg", ".ORF"), stashed)
+    key = get_deferral_key_of("test_aggregate.jpg", "2022:07:27 21:55:55")
+    deferredOriginals = DeferredOriginals(
+        get_mow_folder_of(settings) / DEFERRED_ORIGINALS_FILE_NAME
+    )
+    deferredOriginals.put_many({key: [stashed]})
+    deferredOriginals.close()
+
+    ImageAggregator(
+        input=TransitionerInput(
+            src=src,
+            dst=dst,
+            dry=False,
+            writeMetaTagsToSidecar=False,
+            settings=settings,
+        )
+    )()
+
+    assert transitionTookPlace(fullname)
+    assert not exists(stashed)
+    deferredOriginals = DeferredOriginals(
+        get_mow_folder_of(settings) / DEFERRED_ORIGINALS_FILE_NAME
+    )
+    assert deferredOriginals.get(key) == []
+    deferredOriginals.close()
+    shutil.rmtree(settings["working_dir"], ignore_errors=True)
+    shutil.rmtree(settings["deferred_stash_dir"], ignore_errors=True)
+
+
 def test_rating5BothImagefilesAreTransitioned():
     groupname = "2022-12-12@121212_TEST"
     fullname = join(src, groupname, "2022-12-12@121212_test.jpg")
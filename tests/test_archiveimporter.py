@@ -0,0 +1,132 @@
+import os
+from os.path import join, abspath, dirname, exists
+import shutil
+import tarfile
+import zipfile
+
+import pytest
+
+from ..modules.general.mediatransitioner import TransitionerInput
+from ..modules.general.archiveimporter import ArchiveImporter, isArchive
+
+testfolder = abspath(dirname(__file__))
+src = join(testfolder, "filestotreat")
+dst = join(testfolder, "test_treated")
+dummyfile = join(testfolder, "test.jpg")
+workingdir = join(testfolder, "mow_archive_workingdir")
+
+
+@pytest.fixture(autouse=True)
+def removeWorkingDir():
+    yield
+    shutil.rmtree(workingdir, ignore_errors=True)
+
+
+def prepareTest():
+    shutil.rmtree(src, ignore_errors=True)
+    shutil.rmtree(dst, ignore_errors=True)
+    os.makedirs(src)
+
+
+def assertImported(archiveName: str):
+    assert exists(join(dst, archiveName, "Photos", "IMG_0001.jpg"))
+    assert exists(join(dst, archiveName, "Photos", "VID_0002.mp4"))
+    assert not exists(join(dst, archiveName, "Photos", "IMG_0001.jpg.json"))
+    with open(dummyfile, "rb") as f, open(
+        join(dst, archiveName, "Photos", "IMG_0001.jpg"), "rb"
+    ) as imported:
+        assert f.read() == imported.read()
+
+
+def test_zip_members_are_imported_without_non_media_files():
+    prepareTest()
+    archive = join(src, "takeout.zip")
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.write(dummyfile, "Photos/IMG_0001.jpg")
+        zf.writestr("Photos/IMG_0001.jpg.json", "{}")
+        zf.writestr("Photos/VID_0002.mp4", b"video")
+
+    assert isArchive(archive)
+    ArchiveImporter(TransitionerInput(src=archive, dst=dst))()
+
+    assertImported("takeout")
+
+
+def test_compressed_tar_members_are_streamed():
+    prepareTest()
+    archive = join(src, "phone.tar.gz")
+    with open(join(src, "VID_0002.mp4"), "wb") as f:
+        f.write(b"video")
+    with open(join(src, "IMG_0001.jpg.json"), "w") as f:
+        f.write("{}")
+    with tarfile.open(archive, "w:gz") as tf:
+        tf.add(dummyfile, "Photos/IMG_0001.jpg")
+        tf.add(join(src, "IMG_0001.jpg.json"), "Photos/IMG_0001.jpg.json")
+        tf.add(join(src, "VID_0002.mp4"), "Photos/VID_0002.mp4")
+
+    ArchiveImporter(TransitionerInput(src=archive, dst=dst))()
+
+    assertImported("phone")
+
+
+def test_members_imported_before_are_skipped_by_the_ledger():
+    prepareTest()
+    shutil.rmtree(workingdir, ignore_errors=True)
+    archive = join(src, "takeout.zip")
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.write(dummyfile, "Photos/IMG_0001.jpg")
+
+    importArchive = lambda: ArchiveImporter(
+        TransitionerInput(src=archive, dst=dst, settings={"working_dir": workingdir})
+    )()
+    importArchive()
+    shutil.rmtree(dst)  # the rename stage moves the files away
+    importArchive()
+
+    assert not exists(join(dst, "takeout", "Photos", "IMG_0001.jpg"))
+
+
+def test_members_leaving_the_import_folder_are_skipped():
+    prepareTest()
+    archive = join(src, "evil.zip")
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("..\\..\\escaped.jpg", b"image")
+        zf.writestr("C:\\escaped.jpg", b"image")
+        zf.writestr("../escaped.jpg", b"image")
+        zf.writestr("Photos\\IMG_0001.jpg", b"image")
+
+    ArchiveImporter(TransitionerInput(src=archive, dst=dst))()
+
+    assert sorted(
+        os.path.relpath(join(root, file), dst)
+        for root, _, files in os.walk(dst)
+        for file in files
+    ) == [join("evil", "Photos", "IMG_0001.jpg")]
+    assert not exists(join(testfolder, "escaped.jpg"))
+    assert not exists(join(src, "escaped.jpg"))
+
+
+def test_corrupt_member_is_removed_and_import_continues():
+    prepareTest()
+    shutil.rmtree(workingdir, ignore_errors=True)
+    archive = join(src, "takeout.zip")
+    with zipfile.ZipFile(archive, "w", zipfile.ZIP_STORED) as zf:
+        zf.writestr("Photos/IMG_0001.jpg", b"corrupted image")
+        zf.writestr("Photos/VID_0002.mp4", b"video")
+    with open(archive, "rb") as f:
+        content = f.read()
+    with open(archive, "wb") as f:
+        f.write(content.replace(b"corrupted image", b"CORRUPTED IMAGE"))
+
+    ArchiveImporter(
+        TransitionerInput(src=archive, dst=dst, settings={"working_dir": workingdir})
+    )()
+
+    corrupted = join(dst, "takeout", "Photos", "IMG_0001.jpg")
+    assert not exists(corrupted)
+    assert not exists(corrupted + ".part")
+    assert exists(join(dst, "takeout", "Photos", "VID_0002.mp4"))
+    with open(join(workingdir, ".mow", "importmanifest.jsonl")) as f:
+        manifest = f.read()
+    assert "VID_0002.mp4" in manifest
+    assert "IMG_0001.jpg" not in manifest
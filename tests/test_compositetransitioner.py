@@ -0,0 +1,66 @@
+from pathlib import Path
+import shutil
+import os
+
+from ..modules.general.compositetransitioner import CompositeTransitioner
+from ..modules.general.mediaconverter import PassthroughConverter
+from ..modules.general.mediatransitioner import TransitionerInput
+
+testfolder = Path("tests").absolute()
+src = testfolder / "filestotreat"
+dst = testfolder / "test_treated"
+
+
+class CountingPassthroughConverter(PassthroughConverter):
+    walks = 0
+
+    def listSourceFiles(self):
+        CountingPassthroughConverter.walks += 1
+        return super().listSourceFiles()
+
+
+def prepareTest(files: list[str]):
+    shutil.rmtree(src, ignore_errors=True)
+    shutil.rmtree(dst, ignore_errors=True)
+    os.makedirs(src / "sub")
+    for file in files:
+        (src / file).touch()
+    CountingPassthroughConverter.walks = 0
+
+
+def getConverterFor(extensions: list[str]) -> PassthroughConverter:
+    return CountingPassthroughConverter(
+        TransitionerInput(src=src, dst=dst, writeMetaTags=False),
+        valid_extensions=extensions,
+    )
+
+
+def test_all_mediafile_types_are_transitioned_with_a_single_walk():
+    prepareTest(["test.JPG", "sub/test2.JPG", "test.MOV", "sub/test.mp4", "test.txt"])
+
+    CompositeTransitioner(
+        [getConverterFor([".JPG"]), getConverterFor([".MOV", ".mp4"])]
+    )()
+
+    assert CountingPassthroughConverter.walks == 1
+    assert sorted(
+        str(file.relative_to(dst)) for file in dst.rglob("*") if file.is_file()
+    ) == ["sub/test.mp4", "sub/test2.JPG", "test.JPG", "test.MOV"]
+    assert (src / "test.txt").exists()
+
+
+def test_files_sharing_their_name_are_transitioned_by_each_type():
+    prepareTest(["test.JPG", "test.MOV"])
+
+    CompositeTransitioner([getConverterFor([".JPG"]), getConverterFor([".MOV"])])()
+
+    assert sorted(os.listdir(dst)) == ["test.JPG", "test.MOV"]
+
+
+def test_sidecar_shared_by_image_and_video_is_not_taken_twice():
+    prepareTest(["test.JPG", "test.MOV", "test.xmp"])
+
+    CompositeTransitioner([getConverterFor([".JPG"]), getConverterFor([".MOV"])])()
+
+    assert sorted(os.listdir(dst)) == ["test.JPG", "test.MOV", "test.xmp"]
+    assert os.listdir(src) == ["sub"]
@@ -1,9 +1,37 @@
 import os
 from os.path import join, abspath, dirname, exists
 import shutil
+from concurrent.futures import ThreadPoolExecutor
+import datetime
+from pathlib import Path
+import threading
+
+import pytest
 
 from ..modules.general.mediatransitioner import TransitionerInput
-from ..modules.general.mediacopier import MediaCopier
+from ..modules.general.mediacopier import CopierInput, MediaCopier
+from ..modules.general.filenamehelper import (
+    getMediaCreationDateFrom,
+    isCorrectTimestamp,
+)
+from ..modules.mow.mowtags import MowTag, MowTagFileManipulator
+from ..modules.mow.mowfolder import MOW_FOLDER_NAME
+from ..modules.mow.fsyncbatch import FsyncBatch
+from ..modules.mow.deferredoriginals import (
+    DEFERRED_ORIGINALS_FILE_NAME,
+    DeferredOriginals,
+    get_deferral_key_of,
+)
+from ..modules.mow.sourcedateindex import (
+    SOURCE_DATE_INDEX_FILE_NAME,
+    SourceDateIndex,
+)
+from ..modules.mow.importmanifest import (
+    IMPORT_MANIFEST_FILE_NAME,
+    PART_SUFFIX,
+    ImportManifest,
+    md5_of,
+)
 
 testfolder = abspath(dirname(__file__))
 tempsrcfolder = "filestotreat"
@@ -147,3 +175,398 @@ def test_LAST_is_not_copied():
     assert not exists(join(dst, f"test_05_LAST.ORF"))
     assert not exists(join(dst, f"test_05.jpg"))
     assert not exists(join(dst, f"test_05.ORF"))
+
+
+def test_chunked_transition_copies_everything():
+    prepareTest(7, 6)
+
+    MediaCopier(TransitionerInput(src=src, dst=dst, transitionChunkSize=2))()
+
+    for i in range(0, 7):
+        assert exists(join(dst, f"test_{i:02}.jpg"))
+        assert exists(join(dst, f"test_{i:02}.ORF"))
+
+
+class InterruptedChunkCopier(MediaCopier):
+    """
+    Fails while tagging the third chunk. Relocating the first chunk waits until the second chunk is tagged, which only returns if both overlap.
+    """
+
+    def __init__(self, input: TransitionerInput):
+        super().__init__(input)
+        self.nrTaggedChunks = 0
+        self.secondChunkTagged = threading.Event()
+        self.relocationOverlappedTagging = None
+
+    def getSuccesfulChangedMetaTagTasksOf(self, tasks):
+        self.nrTaggedChunks += 1
+        if self.nrTaggedChunks == 3:
+            raise RuntimeError("Interrupted while tagging")
+        tasks = super().getSuccesfulChangedMetaTagTasksOf(tasks)
+        if self.nrTaggedChunks == 2:
+            self.secondChunkTagged.set()
+        return tasks
+
+    def doRelocationOf(self, tasks, showProgress=True):
+        if self.relocationOverlappedTagging is None:
+            self.relocationOverlappedTagging = self.secondChunkTagged.wait(timeout=10)
+        super().doRelocationOf(tasks, showProgress)
+
+
+def test_interrupted_chunked_transition_leaves_finished_chunks_complete():
+    prepareTest(7, 6)
+
+    copier = InterruptedChunkCopier(
+        TransitionerInput(src=src, dst=dst, transitionChunkSize=2)
+    )
+    with pytest.raises(RuntimeError):
+        copier()
+
+    assert copier.relocationOverlappedTagging
+    # the chunks tagged before the interruption are relocated completely, i.e. jpg and raw of 4 mediafiles
+    copied = os.listdir(dst)
+    assert len(copied) == 8
+    for name in copied:
+        assert os.path.splitext(name)[0] + ".jpg" in copied
+        assert os.path.splitext(name)[0] + ".ORF" in copied
+
+
+def test_parallel_relocation_copies_everything():
+    prepareTest(7, 6)
+
+    copier = MediaCopier(TransitionerInput(src=src, dst=dst, nr_relocation_threads=4))
+    copier()
+
+    assert copier.getSkippedTasks() == []
+    for i in range(0, 7):
+        assert exists(join(dst, f"test_{i:02}.jpg"))
+        assert exists(join(dst, f"test_{i:02}.ORF"))
+
+
+ledgerworkingdir = join(testfolder, "mow_ledger_workingdir")
+secondsrc = join(testfolder, "filestotreat_second")
+
+
+@pytest.fixture(autouse=True)
+def removeWorkingDir():
+    yield
+    shutil.rmtree(ledgerworkingdir, ignore_errors=True)
+    shutil.rmtree(secondsrc, ignore_errors=True)
+
+
+def prepareLedgerTest(names: list[str]):
+    shutil.rmtree(src, ignore_errors=True)
+    shutil.rmtree(dst, ignore_errors=True)
+    shutil.rmtree(ledgerworkingdir, ignore_errors=True)
+    os.makedirs(src)
+    addUniqueFiles(names)
+
+
+def addUniqueFiles(names: list[str]):
+    for name in names:
+        with open(join(src, name), "wb") as f:
+            f.write(name.encode() * 2000)
+
+
+def copyWithLedger():
+    MediaCopier(
+        TransitionerInput(src=src, dst=dst, settings={"working_dir": ledgerworkingdir})
+    )()
+
+
+def test_ledger_takes_over_LAST_and_copies_only_unknown_files():
+    prepareLedgerTest(["test_00.jpg", "test_01_LAST.jpg", "test_02.jpg"])
+    os.utime(join(src, "test_00.jpg"), (0, 0))
+
+    copyWithLedger()
+
+    assert sorted(os.listdir(dst)) == ["test_02.jpg"]
+    assert exists(join(src, "test_01.jpg"))
+
+    # a file with an older modification time, e.g. after a reset of the camera clock, is still recognized as new
+    shutil.rmtree(dst)
+    addUniqueFiles(["test_03.jpg"])
+    os.utime(join(src, "test_03.jpg"), (0, 0))
+
+    copyWithLedger()
+
+    assert sorted(os.listdir(dst)) == ["test_03.jpg"]
+    assert not any(name.endswith("_LAST.jpg") for name in os.listdir(src))
+
+
+def test_concurrent_copiers_do_not_overwrite_each_other():
+    prepareTest(3, 2)
+    shutil.rmtree(secondsrc, ignore_errors=True)
+    shutil.copytree(src, secondsrc)
+
+    claimedTargets: set[str] = set()
+    copiers = [
+        MediaCopier(TransitionerInput(src=source, dst=dst, claimedTargets=claimedTargets))
+        for source in [src, secondsrc]
+    ]
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        for copying in [executor.submit(copier) for copier in copiers]:
+            copying.result()
+
+    skipped = copiers[0].getSkippedTasks() + copiers[1].getSkippedTasks()
+    assert len(skipped) == 3
+    assert len(os.listdir(dst)) == 6
+
+
+def test_copied_files_are_hashed_into_verifiable_manifest():
+    prepareLedgerTest(["test_00.jpg", "test_00.ORF", "test_01.jpg"])
+
+    copyWithLedger()
+
+    manifest = ImportManifest(
+        Path(ledgerworkingdir) / MOW_FOLDER_NAME / IMPORT_MANIFEST_FILE_NAME
+    )
+    entries = manifest.read()
+    assert len(entries) == 3
+    for name in ["test_00.jpg", "test_00.ORF", "test_01.jpg"]:
+        assert entries[join(dst, name)]["md5"] == md5_of(join(src, name))
+
+    with open(join(dst, "test_01.jpg"), "r+b") as f:
+        f.write(b"corrupted")
+    os.remove(join(dst, "test_00.ORF"))
+
+    correct, mismatching, missing = manifest.verify()
+    assert correct == [join(dst, "test_00.jpg")]
+    assert mismatching == [join(dst, "test_01.jpg")]
+    assert missing == [join(dst, "test_00.ORF")]
+
+
+def test_fused_rename_copies_into_final_names_with_sidecar():
+    prepareTest(2, 1)
+    shutil.rmtree(ledgerworkingdir, ignore_errors=True)
+    renamed = "2022-07-27@215555_renamed.jpg"
+    shutil.copy(dummyfile, join(src, renamed))
+
+    MediaCopier(
+        CopierInput(
+            src=src,
+            dst=dst,
+            fusedRenameStage="2_rename",
+            settings={"working_dir": ledgerworkingdir},
+        )
+    )()
+
+    copied = sorted(os.listdir(dst))
+    assert len(copied) == 8
+    assert renamed in copied  # already renamed files keep their name
+    for name in copied:
+        assert isCorrectTimestamp(name[0:17]).ok
+    assert sorted(os.listdir(src)) == [
+        renamed,
+        "test_00.ORF",
+        "test_00.jpg",
+        "test_01.ORF",
+        "test_01.jpg",
+    ]
+
+    sidecar = next(join(dst, name) for name in copied if name.endswith("test_00.xmp"))
+    tags = MowTagFileManipulator().read_tags(
+        sidecar, [MowTag.source, MowTag.stagehistory]
+    )
+    assert tags[MowTag.source].startswith("test_00.")
+    assert tags[MowTag.stagehistory] == ["2_rename"]
+
+
+class FailingTagFileManipulator:
+    """
+    Fails to write any meta tags, as exiftool does e.g. for a corrupt file.
+    """
+
+    def read_tags_many(self, files, tags):
+        return {}
+
+    def get_initial_sidecar_tags_of(self, mFile, ignore_differing_tags, known_reads):
+        return {}
+
+    def __init__(self):
+        self.written = []
+
+    def write_tags_many(self, fileToTags):
+        self.written.extend(fileToTags)
+        return {file: "Could not write tags" for file in fileToTags}
+
+    def close(self):
+        pass
+
+
+def test_fused_rename_removes_copies_whose_tags_could_not_be_written():
+    renamed = "2022-07-27@215555_renamed.jpg"
+    prepareLedgerTest([renamed])
+
+    fm = FailingTagFileManipulator()
+
+    class UntaggingCopier(MediaCopier):
+        def createTagFileManipulator(self):
+            return fm
+
+    copy = lambda: UntaggingCopier(
+        CopierInput(
+            src=src,
+            dst=dst,
+            fusedRenameStage="2_rename",
+            settings={"working_dir": ledgerworkingdir},
+        )
+    )()
+    copy()
+
+    assert os.listdir(dst) == []
+    manifest = ImportManifest(
+        Path(ledgerworkingdir) / MOW_FOLDER_NAME / IMPORT_MANIFEST_FILE_NAME
+    )
+    assert manifest.read() == {}
+
+    copy()
+
+    assert os.listdir(dst) == []
+    assert len(fm.written) == 2  # not recorded as imported, so it was tried again
+
+
+def test_interrupted_copy_is_resumed_from_part_file():
+    prepareLedgerTest(["test_00.MOV"])
+    with open(join(src, "test_00.MOV"), "wb") as f:
+        f.write(os.urandom(3 * 1024 * 1024 + 17))
+    with open(join(src, "test_00.MOV"), "rb") as f:
+        partial = f.read(2 * 1024 * 1024 + 5)
+    os.makedirs(dst)
+    with open(join(dst, "test_00.MOV" + PART_SUFFIX), "wb") as f:
+        f.write(partial)
+
+    copyWithLedger()
+
+    assert os.listdir(dst) == ["test_00.MOV"]
+    manifest = ImportManifest(
+        Path(ledgerworkingdir) / MOW_FOLDER_NAME / IMPORT_MANIFEST_FILE_NAME
+    )
+    assert manifest.read()[join(dst, "test_00.MOV")]["md5"] == md5_of(
+        join(src, "test_00.MOV")
+    )
+    assert md5_of(join(dst, "test_00.MOV")) == md5_of(join(src, "test_00.MOV"))
+
+
+def test_mismatching_part_file_is_copied_anew():
+    prepareLedgerTest(["test_00.MOV"])
+    os.makedirs(dst)
+    with open(join(dst, "test_00.MOV" + PART_SUFFIX), "wb") as f:
+        f.write(b"something else")
+
+    copyWithLedger()
+
+    assert os.listdir(dst) == ["test_00.MOV"]
+    assert md5_of(join(dst, "test_00.MOV")) == md5_of(join(src, "test_00.MOV"))
+
+
+def test_date_range_selects_files_and_indexes_their_dates():
+    prepareLedgerTest(["test_00.jpg", "test_01.jpg", "test_02.jpg"])
+    for day, name in enumerate(["test_00.jpg", "test_01.jpg", "test_02.jpg"], start=1):
+        timestamp = datetime.datetime(2024, 5, day, 12).timestamp()
+        os.utime(join(src, name), (timestamp, timestamp))
+
+    MediaCopier(
+        CopierInput(
+            src=src,
+            dst=dst,
+            since=datetime.datetime(2024, 5, 2),
+            until=datetime.datetime(2024, 5, 2, 23, 59, 59),
+            settings={"working_dir": ledgerworkingdir},
+        )
+    )()
+
+    assert os.listdir(dst) == ["test_01.jpg"]
+
+    index = SourceDateIndex(
+        Path(ledgerworkingdir) / MOW_FOLDER_NAME / SOURCE_DATE_INDEX_FILE_NAME, src
+    )
+    dates = index.get_many([Path(join(src, "test_00.jpg"))])
+    assert dates[Path(join(src, "test_00.jpg"))].astimezone().replace(
+        tzinfo=None
+    ) == datetime.datetime(2024, 5, 1, 12)
+    index.close()
+
+
+def test_linked_files_share_data_with_source():
+    prepareLedgerTest(["test_00.jpg", "test_01.jpg"])
+
+    MediaCopier(
+        CopierInput(
+            src=src,
+            dst=dst,
+            linkFiles=True,
+            settings={"working_dir": ledgerworkingdir},
+        )
+    )()
+
+    for name in ["test_00.jpg", "test_01.jpg"]:
+        with open(join(src, name), "rb") as f, open(join(dst, name), "rb") as copy:
+            assert f.read() == copy.read()
+        # either reflinked (own inode) or hardlinked (same inode), but never a partial leftover
+        assert not exists(join(dst, name + ".linking"))
+
+
+def test_durable_copy_syncs_in_batches():
+    prepareLedgerTest(["test_00.jpg", "test_01.jpg", "test_02.jpg"])
+    syncedBatches = []
+
+    class RecordingFsyncBatch(FsyncBatch):
+        def _sync(self, files):
+            if len(files) > 0:
+                syncedBatches.append(sorted(file.name for file in files))
+            super()._sync(files)
+
+    copier = MediaCopier(
+        CopierInput(
+            src=src,
+            dst=dst,
+            durable=True,
+            settings={"working_dir": ledgerworkingdir},
+        )
+    )
+    copier.fsyncBatch = RecordingFsyncBatch(
+        batch_bytes=2 * os.path.getsize(join(src, "test_00.jpg"))
+    )
+    copier()
+
+    assert len(os.listdir(dst)) == 3
+    assert len(syncedBatches) == 2
+    assert sum(len(batch) for batch in syncedBatches) == 3
+
+
+def test_deferred_originals_are_recorded_instead_of_copied():
+    prepareLedgerTest(["test_00.jpg", "test_00.ORF", "test_00.MOV", "test_01.jpg"])
+
+    MediaCopier(
+        CopierInput(
+            src=src,
+            dst=dst,
+            deferOriginals=True,
+            settings={"working_dir": ledgerworkingdir},
+        )
+    )()
+
+    assert sorted(os.listdir(dst)) == ["test_00.jpg", "test_01.jpg"]
+
+    date = getMediaCreationDateFrom(join(src, "test_00.jpg"))
+    deferredOriginals = DeferredOriginals(
+        Path(ledgerworkingdir) / MOW_FOLDER_NAME / DEFERRED_ORIGINALS_FILE_NAME
+    )
+    assert sorted(
+        deferredOriginals.get(
+            get_deferral_key_of("test_00.jpg", date.strftime("%Y:%m:%d %H:%M:%S"))
+        )
+    ) == [abspath(join(src, "test_00.MOV")), abspath(join(src, "test_00.ORF"))]
+    deferredOriginals.close()
+
+    # deferred originals count as imported
+    shutil.rmtree(dst)
+    copyWithLedger()
+    assert not exists(dst) or os.listdir(dst) == []
+
+
+def test_manifests_of_the_same_file_share_their_lock():
+    file = Path(ledgerworkingdir) / MOW_FOLDER_NAME / IMPORT_MANIFEST_FILE_NAME
+
+    assert ImportManifest(file).lock is ImportManifest(file).lock
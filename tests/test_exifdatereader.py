@@ -0,0 +1,74 @@
+from pathlib import Path
+import datetime as dt
+import shutil
+import struct
+import os
+
+from PIL import Image
+
+from ..modules.image.exifdatereader import readExifDateTimeOf
+from ..modules.image.imagefile import ImageFile
+
+testfolder = Path("tests").absolute()
+src = testfolder / "filestotreat"
+
+
+def prepareTest():
+    shutil.rmtree(src, ignore_errors=True)
+    os.makedirs(src)
+
+
+def saveImageWithExif(file: Path, original: str = None, subSec: str = None):
+    exif = Image.Exif()
+    exif[306] = "2020:01:01 10:00:00"
+    if original is not None:
+        exif.get_ifd(0x8769)[36867] = original
+    if subSec is not None:
+        exif.get_ifd(0x8769)[37521] = subSec
+    Image.new("RGB", (8, 8)).save(file, format="JPEG", exif=exif)
+
+
+def saveRawWithDate(file: Path, original: str):
+    """
+    Writes a minimal olympus raw consisting of the tiff header, an ifd0 pointing to the exif ifd and the exif ifd containing the date.
+    """
+    header = b"IIRO" + struct.pack("<I", 8)
+    ifd0 = struct.pack("<HHHII", 1, 34665, 4, 1, 26) + struct.pack("<I", 0)
+    exifIfd = struct.pack("<HHHII", 1, 36867, 2, 20, 44) + struct.pack("<I", 0)
+    with open(file, "wb") as f:
+        f.write(header + ifd0 + exifIfd + original.encode() + b"\x00")
+
+
+def test_date_original_with_subseconds_is_read_from_jpg():
+    prepareTest()
+    saveImageWithExif(src / "test.jpg", "2022:07:27 21:55:55", "12")
+
+    assert readExifDateTimeOf(str(src / "test.jpg")) == dt.datetime(
+        2022, 7, 27, 21, 55, 55, 120000
+    )
+
+
+def test_datetime_is_taken_if_date_original_is_missing():
+    prepareTest()
+    saveImageWithExif(src / "test.jpg")
+
+    assert readExifDateTimeOf(str(src / "test.jpg")) == dt.datetime(
+        2020, 1, 1, 10, 0, 0
+    )
+
+
+def test_raw_only_imagefile_has_date():
+    prepareTest()
+    saveRawWithDate(src / "test.ORF", "2022:07:27 21:55:55")
+
+    assert ImageFile(str(src / "test.ORF")).readDateTime() == dt.datetime(
+        2022, 7, 27, 21, 55, 55
+    )
+
+
+def test_file_without_exif_has_no_date():
+    prepareTest()
+    Image.new("RGB", (8, 8)).save(src / "test.jpg")
+
+    assert readExifDateTimeOf(str(src / "test.jpg")) is None
+    assert readExifDateTimeOf(str(testfolder / "test.gpx")) is None
@@ -0,0 +1,107 @@
+import os
+from os.path import join, abspath, dirname, exists
+from pathlib import Path
+import shutil
+
+import pytest
+
+from ..modules.general.mediatransitioner import TransitionerInput
+from ..modules.general.mediatagger import MediaTagger
+from ..modules.mow.mowfolder import MOW_FOLDER_NAME
+from ..modules.mow.transitionjournal import (
+    JOURNAL_FOLDER_NAME,
+    RELOCATED,
+    TransitionJournal,
+)
+
+testfolder = abspath(dirname(__file__))
+workingdir = join(testfolder, "mow_journal_workingdir")
+src = join(workingdir, "5.2_tag")
+dst = join(workingdir, "5.3_localize")
+dummyfile = join(testfolder, "test.jpg")
+journalfile = Path(workingdir) / MOW_FOLDER_NAME / JOURNAL_FOLDER_NAME / "5.2_tag_MediaTagger.jsonl"
+
+
+@pytest.fixture(autouse=True)
+def removeWorkingDir():
+    yield
+    shutil.rmtree(workingdir, ignore_errors=True)
+
+
+def prepareTest(nrFiles: int = 3):
+    shutil.rmtree(workingdir, ignore_errors=True)
+    os.makedirs(src)
+    for i in range(nrFiles):
+        shutil.copy(dummyfile, join(src, f"test_{i:02}.jpg"))
+
+
+def getInput(resume: bool = False) -> TransitionerInput:
+    return TransitionerInput(
+        src=src,
+        dst=dst,
+        writeMetaTags=False,
+        resume=resume,
+        settings={"working_dir": workingdir},
+    )
+
+
+def test_journal_is_removed_after_finished_run():
+    prepareTest()
+
+    MediaTagger(getInput())()
+
+    for i in range(3):
+        assert exists(join(dst, f"test_{i:02}.jpg"))
+    assert not journalfile.exists()
+
+
+def test_resume_continues_planned_tasks_only():
+    prepareTest()
+    # simulate a run that was killed after relocating the first file
+    journal = TransitionJournal(journalfile)
+    journal.start(
+        [
+            {"file": join(src, f"test_{i:02}.jpg"), "newName": None, "metaTags": {}}
+            for i in range(2)
+        ]
+    )
+    os.makedirs(dst)
+    shutil.move(join(src, "test_00.jpg"), join(dst, "test_00.jpg"))
+    journal.record(RELOCATED, [join(src, "test_00.jpg")])
+    journal.close()
+
+    MediaTagger(getInput(resume=True))()
+
+    assert exists(join(dst, "test_00.jpg"))
+    assert exists(join(dst, "test_01.jpg"))
+    # test_02 was not planned by the interrupted run, so it is not touched by resuming
+    assert exists(join(src, "test_02.jpg"))
+    assert not journalfile.exists()
+
+
+def test_resume_moves_the_rest_of_a_partially_moved_mediafile():
+    prepareTest(nrFiles=1)
+    shutil.copy(dummyfile, join(src, "test_00.ORF"))
+    # simulate a run that was killed after moving the jpg but before moving the raw
+    journal = TransitionJournal(journalfile)
+    journal.start(
+        [{"file": join(src, "test_00.jpg"), "newName": None, "metaTags": {}}]
+    )
+    os.makedirs(dst)
+    shutil.move(join(src, "test_00.jpg"), join(dst, "test_00.jpg"))
+    journal.close()
+
+    MediaTagger(getInput(resume=True))()
+
+    assert sorted(os.listdir(dst)) == ["test_00.ORF", "test_00.jpg"]
+    assert os.listdir(src) == []
+    assert not journalfile.exists()
+
+
+def test_resume_without_journal_starts_new_run():
+    prepareTest()
+
+    MediaTagger(getInput(resume=True))()
+
+    for i in range(3):
+        assert exists(join(dst, f"test_{i:02}.jpg"))
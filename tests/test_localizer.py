@@ -14,6 +14,7 @@ from ..modules.general.medialocalizer import (
     MediaLocalizer,
     LocalizerInput,
 )
+from .test_quicktimereader import CREATION_SECONDS, saveMovie
 
 
 testfolder = "tests"
@@ -302,3 +303,17 @@ def test_image_made_after_last_gps_entry_but_too_small_tolerance_does_not_transi
 # map.save("map.html")
 
 # %%
+
+
+def test_position_embedded_into_video_is_taken():
+    shutil.rmtree(src, ignore_errors=True)
+    shutil.rmtree(dst, ignore_errors=True)
+    os.makedirs(src)
+    saveMovie(CREATION_SECONDS, location=b"+52.5200+013.4050+034.000/")
+
+    perform_transition()
+
+    tags = MowTagFileManipulator().read_tags(Path(dst) / "test.xmp", tags_gps_all)
+    assert tags[MowTag.gps_latitude] == 52.52
+    assert tags[MowTag.gps_longitude] == 13.405
+    assert tags[MowTag.gps_elevation] == 34.0
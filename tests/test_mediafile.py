@@ -0,0 +1,42 @@
+from pathlib import Path
+import shutil
+import os
+
+from ..modules.general.mediafile import StemIndex
+from ..modules.image.imagefile import ImageFile
+from ..modules.general.medafilefactories import createAnyValidMediaFile
+
+testfolder = Path("tests").absolute()
+src = testfolder / "filestotreat"
+
+
+def prepareTest(files: list[str]):
+    shutil.rmtree(src, ignore_errors=True)
+    os.makedirs(src)
+    for file in files:
+        (src / file).touch()
+
+
+def test_stem_index_finds_siblings_and_sidecar():
+    prepareTest(["test.JPG", "test.ORF", "test.xmp", "test2.JPG", "test.txt"])
+    stemIndex = StemIndex()
+    stemIndex.addDirectory(str(src), os.listdir(src))
+
+    mfile = ImageFile(str(src / "test.JPG"), stemIndex=stemIndex)
+
+    assert mfile.isValid()
+    assert sorted(mfile.extensions) == [".JPG", ".ORF", ".xmp"]
+    assert ImageFile(str(src / "test2.JPG"), stemIndex=stemIndex).extensions == [
+        ".JPG"
+    ]
+
+
+def test_stem_index_gives_same_result_as_disk_lookup():
+    prepareTest(["test.ORF", "test.JPG", "test.xmp", "video.mp4", "video.xmp"])
+    stemIndex = StemIndex()
+
+    for file in sorted(os.listdir(src)):
+        with_index = createAnyValidMediaFile(str(src / file), stemIndex=stemIndex)
+        without_index = createAnyValidMediaFile(str(src / file))
+        assert with_index.isValid() == without_index.isValid()
+        assert sorted(with_index.extensions) == sorted(without_index.extensions)
@@ -0,0 +1,52 @@
+from pathlib import Path
+import shutil
+import os
+
+from ..modules.general.mediaconverter import PassthroughConverter
+from ..modules.general.mediatransitioner import TransitionerInput
+from ..modules.image.imagefile import ImageFile
+
+testfolder = Path("tests").absolute()
+src = testfolder / "filestotreat"
+dst = testfolder / "test_treated"
+
+
+def prepareTest(files: list[str]):
+    shutil.rmtree(src, ignore_errors=True)
+    shutil.rmtree(dst, ignore_errors=True)
+    for file in files:
+        os.makedirs((src / file).parent, exist_ok=True)
+        with open(src / file, "w") as f:
+            f.write(file)
+
+
+def transitionFlat():
+    converter = PassthroughConverter(
+        TransitionerInput(
+            src=src, dst=dst, writeMetaTags=False, maintainFolderStructure=False
+        ),
+    )
+    converter.mediaFileFactory = ImageFile  # keeps jpg and raw together
+    converter()
+
+
+def test_planned_targets_do_not_overwrite_each_other():
+    prepareTest(["a/test.JPG", "b/test.JPG", "c/other.JPG"])
+
+    transitionFlat()
+
+    assert sorted(os.listdir(dst)) == ["other.JPG", "test.JPG"]
+    assert len(list(src.rglob("test.JPG"))) == 1
+
+
+def test_existing_files_of_all_extensions_are_not_overwritten():
+    prepareTest(["a/test.JPG", "a/test.ORF", "a/other.JPG"])
+    os.makedirs(dst)
+    with open(dst / "test.ORF", "w") as f:
+        f.write("existing")
+
+    transitionFlat()
+
+    assert sorted(os.listdir(dst)) == ["other.JPG", "test.ORF"]
+    assert (dst / "test.ORF").read_text() == "existing"
+    assert (src / "a" / "test.JPG").exists()
@@ -331,3 +331,80 @@ def test_write_to_mediafile():
 
     assert read_tags_jpg == complex_tags
     assert read_tags_raw == complex_tags
+
+
+def test_read_tags_many():
+    prepareTest(copy_raw=True)
+    fm = MowTagFileManipulator()
+    fm.write_tags(testfile, {MowTag.rating: 1})
+    fm.write_tags(testfile.with_suffix(".ORF"), {MowTag.rating: 5})
+
+    result = fm.read_tags_many(
+        [testfile, testfile.with_suffix(".ORF")], tags=[MowTag.rating], chunk_size=1
+    )
+
+    assert result[testfile] == {MowTag.rating: 1}
+    assert result[testfile.with_suffix(".ORF")] == {MowTag.rating: 5}
+
+
+def test_read_tags_many_skips_unreadable_files():
+    prepareTest()
+    fm = MowTagFileManipulator()
+    missing = testfile.with_name("missing.JPG")
+
+    result = fm.read_tags_many([testfile, missing], tags=[MowTag.rating])
+
+    assert result[testfile] == {MowTag.rating: 2}
+    assert missing not in result
+
+
+def test_write_tags_many():
+    prepareTest(copy_raw=True)
+    fm = MowTagFileManipulator()
+    sidecar = testfile.with_suffix(".xmp")
+
+    errors = fm.write_tags_many(
+        {
+            testfile: {MowTag.rating: 1},
+            testfile.with_suffix(".ORF"): {MowTag.rating: 5},
+            sidecar: complex_tags,
+        }
+    )
+
+    assert errors == {}
+    assert fm.read_tags(testfile, tags=[MowTag.rating])[MowTag.rating] == 1
+    assert fm.read_tags(testfile.with_suffix(".ORF"), [MowTag.rating]) == {
+        MowTag.rating: 5
+    }
+    assert fm.read_tags(sidecar, tags=list(complex_tags.keys())) == complex_tags
+
+
+def test_write_tags_many_maps_errors_to_files():
+    prepareTest()
+    fm = MowTagFileManipulator()
+    missing = testfile.with_name("missing.JPG")
+
+    errors = fm.write_tags_many(
+        {missing: {MowTag.rating: 1}, testfile: {MowTag.rating: 4}}
+    )
+
+    assert list(errors.keys()) == [missing]
+    assert fm.read_tags(testfile, tags=[MowTag.rating])[MowTag.rating] == 4
+
+
+def test_exiftool_pool_keeps_order_of_files():
+    prepareTest(copy_raw=True)
+    fm = MowTagFileManipulator(nr_exiftool_processes=2)
+    files = [testfile, testfile.with_suffix(".ORF")]
+
+    errors = fm.write_tags_many(
+        {file: {MowTag.rating: rating} for file, rating in zip(files, [1, 5])},
+        chunk_size=1,
+    )
+    result = fm.read_tags_many(files, tags=[MowTag.rating], chunk_size=1)
+    fm.close()
+
+    assert errors == {}
+    assert list(result.keys()) == files
+    assert result[testfile] == {MowTag.rating: 1}
+    assert result[testfile.with_suffix(".ORF")] == {MowTag.rating: 5}
@@ -0,0 +1,83 @@
+from pathlib import Path
+import datetime as dt
+import shutil
+import struct
+import os
+
+from ..modules.video.quicktimereader import readCreationDateOf, readGpsPositionOf
+from ..modules.video.videofile import VideoFile
+
+testfolder = Path("tests").absolute()
+src = testfolder / "filestotreat"
+testfile = src / "test.mp4"
+CREATION_SECONDS = 3741803755  # 2022-07-27 21:55:55 in seconds since 1904
+
+
+def prepareTest():
+    shutil.rmtree(src, ignore_errors=True)
+    os.makedirs(src)
+
+
+def box(name: bytes, content: bytes) -> bytes:
+    return struct.pack(">I", 8 + len(content)) + name + content
+
+
+def largeBox(name: bytes, content: bytes) -> bytes:
+    return struct.pack(">I", 1) + name + struct.pack(">Q", 16 + len(content)) + content
+
+
+def saveMovie(
+    creationSeconds: int, version: int = 0, location: bytes = None, largeMdat=False
+):
+    times = (
+        struct.pack(">QQ", creationSeconds, creationSeconds)
+        if version == 1
+        else struct.pack(">II", creationSeconds, creationSeconds)
+    )
+    mvhd = box(b"mvhd", bytes([version, 0, 0, 0]) + times + bytes(80))
+    udta = (
+        box(b"udta", box(b"\xa9xyz", struct.pack(">HH", len(location), 0) + location))
+        if location is not None
+        else b""
+    )
+    mdat = (largeBox if largeMdat else box)(b"mdat", bytes(100_000))
+
+    with open(testfile, "wb") as f:
+        f.write(box(b"ftyp", b"qt  " + bytes(4)) + mdat + box(b"moov", mvhd + udta))
+
+
+def test_creation_date_is_read_from_movie_header_behind_media_data():
+    prepareTest()
+    saveMovie(CREATION_SECONDS)
+
+    assert readCreationDateOf(str(testfile)) == dt.datetime(2022, 7, 27, 21, 55, 55)
+    assert VideoFile(str(testfile)).readDateTime() == dt.datetime(
+        2022, 7, 27, 21, 55, 55
+    )
+
+
+def test_64bit_sizes_and_times_are_supported():
+    prepareTest()
+    saveMovie(CREATION_SECONDS, version=1, largeMdat=True)
+
+    assert readCreationDateOf(str(testfile)) == dt.datetime(2022, 7, 27, 21, 55, 55)
+
+
+def test_unset_creation_date_and_broken_files_have_no_date():
+    prepareTest()
+    saveMovie(0)
+    assert readCreationDateOf(str(testfile)) is None
+
+    with open(testfile, "wb") as f:
+        f.write(b"no movie at all")
+    assert readCreationDateOf(str(testfile)) is None
+
+
+def test_gps_position_is_read():
+    prepareTest()
+    saveMovie(CREATION_SECONDS, location=b"+52.5200+013.4050+034.000/")
+
+    assert readGpsPositionOf(str(testfile)) == (52.52, 13.405, 34.0)
+
+    saveMovie(CREATION_SECONDS)
+    assert readGpsPositionOf(str(testfile)) is None
@@ -2,8 +2,15 @@ from datetime import datetime
 from pathlib import Path
 
 from ..modules.audio.audiorenamer import AudioRenamer
+from ..modules.general.filenamehelper import (
+    _getDateTagsOf,
+    getDateTimeFileNameFor,
+    getMediaCreationDateFrom,
+    getMediaCreationDatesOf,
+)
 from ..modules.general.mediarenamer import MediaRenamer, RenamerInput
 from ..modules.image.imagerenamer import ImageRenamer
+from ..modules.video.videofile import VideoFile
 import shutil
 from os.path import join, exists
 import os
@@ -233,3 +240,41 @@ def test_replaceWithRegexWorks():
     print(renamers[0].getFinishedTasks())
 
     assert exists(join(src, "subsubfolder", "test99.JPG"))
+
+
+def test_batchCreationDatesEqualSingleOnes():
+    prepareTest()
+
+    dates = getMediaCreationDatesOf([srcimagefile, srcaudiofile])
+
+    assert dates[srcimagefile] == getMediaCreationDateFrom(srcimagefile)
+    assert dates[srcaudiofile] == getMediaCreationDateFrom(srcaudiofile)
+
+
+def test_subSecondsAreAddedBehindTheTimestamp():
+    date = datetime(2022, 7, 27, 21, 55, 55, 120000)
+
+    assert getDateTimeFileNameFor("test.JPG", date) == "2022-07-27@215555_test.JPG"
+    assert (
+        getDateTimeFileNameFor("test.JPG", date, withSubSeconds=True)
+        == "2022-07-27@215555.120_test.JPG"
+    )
+
+
+class ShortAnsweringExifTool:
+    """
+    Answers a batch with a single result, as exiftool does if it silently skips files.
+    """
+
+    def get_tags(self, files, tags):
+        if isinstance(files, list):
+            return [{"QuickTime:CreateDate": "2000:01:01 00:00:00"}]
+        return [{"SourceFile": files}]
+
+
+def test_shortBatchAnswerIsReadFileByFile():
+    tags = _getDateTagsOf(
+        ShortAnsweringExifTool(), {"a.mp4": VideoFile, "b.mp4": VideoFile}
+    )
+
+    assert tags == {"a.mp4": {"SourceFile": "a.mp4"}, "b.mp4": {"SourceFile": "b.mp4"}}
@@ -0,0 +1,83 @@
+import os
+from os.path import join, abspath, dirname, exists
+from pathlib import Path
+import shutil
+
+import pytest
+
+from ..modules.general.mediagrouper import MediaGrouper, GrouperInput
+from ..modules.mow.mowfolder import MOW_FOLDER_NAME
+from ..modules.mow.skipverdictcache import (
+    SKIP_VERDICT_CACHE_FILE_NAME,
+    SkipVerdictCache,
+)
+
+testfolder = abspath(dirname(__file__))
+workingdir = join(testfolder, "mow_skipverdict_workingdir")
+src = join(workingdir, "4_group")
+dst = join(workingdir, "5.1_tag")
+dummyfile = join(testfolder, "test.jpg")
+cachefile = Path(workingdir) / MOW_FOLDER_NAME / SKIP_VERDICT_CACHE_FILE_NAME
+ungrouped = join(src, "test.jpg")
+grouped = join(src, "2022-12-12@121212_TEST", "test2.jpg")
+
+
+@pytest.fixture(autouse=True)
+def removeWorkingDir():
+    yield
+    shutil.rmtree(workingdir, ignore_errors=True)
+
+
+def prepareTest():
+    shutil.rmtree(workingdir, ignore_errors=True)
+    os.makedirs(dirname(grouped))
+    shutil.copy(dummyfile, ungrouped)
+    shutil.copy(dummyfile, grouped)
+
+
+def runGrouper(**kwargs):
+    MediaGrouper(
+        GrouperInput(
+            src=src,
+            dst=dst,
+            writeMetaTags=False,
+            settings={"working_dir": workingdir},
+            **kwargs,
+        )
+    )()
+
+
+def getCachedVerdicts(context: str = "MediaGrouper:src=" + src) -> dict[str, str]:
+    cache = SkipVerdictCache(cachefile, context)
+    verdicts = cache.get_many(
+        {
+            ungrouped: SkipVerdictCache.fingerprint_of([Path(ungrouped)]),
+            grouped: SkipVerdictCache.fingerprint_of([Path(grouped)]),
+        }
+    )
+    cache.close()
+    return verdicts
+
+
+def test_skip_verdicts_are_cached_until_file_changes():
+    prepareTest()
+    runGrouper()
+
+    assert exists(ungrouped)
+    assert exists(join(dst, "2022-12-12@121212_TEST", "test2.jpg"))
+    assert getCachedVerdicts() == {ungrouped: "File is not in a group folder."}
+
+    # a cached verdict is reused, so the file is still skipped
+    runGrouper()
+    assert exists(ungrouped)
+
+    stat = os.stat(ungrouped)
+    os.utime(ungrouped, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+    assert getCachedVerdicts() == {}
+
+
+def test_helper_modes_do_not_use_skip_verdict_cache():
+    prepareTest()
+    runGrouper(checkSequence=True)
+
+    assert not cachefile.exists() or getCachedVerdicts() == {}
@@ -0,0 +1,87 @@
+from pathlib import Path
+import shutil
+import os
+
+from ..modules.mow.mowtags import MowTag, MowTagFileManipulator
+from ..modules.mow.tagcache import TagCache
+
+testfolder = Path("tests").absolute()
+src = testfolder / "filestotreat"
+cache_file = src / "tagcache.sqlite"
+sidecar = src / "test.xmp"
+
+
+def prepareTest() -> MowTagFileManipulator:
+    shutil.rmtree(src, ignore_errors=True)
+    os.makedirs(src)
+    fm = MowTagFileManipulator(cache_file=cache_file)
+    fm.write_tags(sidecar, {MowTag.rating: 3, MowTag.label: "created by mow"})
+    return fm
+
+
+def test_cached_tags_are_served_until_file_changes():
+    fm = prepareTest()
+    assert fm.read_tags(sidecar, [MowTag.rating]) == {MowTag.rating: 3}
+
+    # change the rating behind the back of the cache while keeping size and mtime
+    stat = os.stat(sidecar)
+    with open(sidecar, "r", encoding="utf-8") as f:
+        content = f.read()
+    with open(sidecar, "w", encoding="utf-8") as f:
+        f.write(content.replace(">3<", ">4<"))
+    os.utime(sidecar, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    # all cacheable tags were read at once, so other tags are served from the cache as well
+    assert fm.read_tags(sidecar, [MowTag.rating, MowTag.label]) == {
+        MowTag.rating: 3,
+        MowTag.label: "created by mow",
+    }
+
+    os.utime(sidecar, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+    assert fm.read_tags(sidecar, [MowTag.rating]) == {MowTag.rating: 4}
+    fm.close()
+
+
+def test_replaced_file_with_same_mtime_is_read_again():
+    fm = prepareTest()
+    assert fm.read_tags(sidecar, [MowTag.rating]) == {MowTag.rating: 3}
+
+    # write a new file like exiftool -P does, which keeps size and mtime but not the inode
+    stat = os.stat(sidecar)
+    with open(sidecar, "r", encoding="utf-8") as f:
+        content = f.read()
+    replacement = src / "replacement.xmp"
+    with open(replacement, "w", encoding="utf-8") as f:
+        f.write(content.replace(">3<", ">4<"))
+    os.utime(replacement, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    os.replace(replacement, sidecar)
+
+    assert fm.read_tags(sidecar, [MowTag.rating]) == {MowTag.rating: 4}
+    fm.close()
+
+
+def test_writing_invalidates_cached_tags():
+    fm = prepareTest()
+    assert fm.read_tags_many([sidecar], [MowTag.rating]) == {
+        sidecar: {MowTag.rating: 3}
+    }
+
+    fm.write_tags_many({sidecar: {MowTag.rating: 5}})
+    assert fm.read_tags(sidecar, [MowTag.rating]) == {MowTag.rating: 5}
+    fm.close()
+
+
+def test_cache_persists_and_follows_moves():
+    fm = prepareTest()
+    fm.read_tags(sidecar, [MowTag.rating])
+    moved = src / "moved" / "test.xmp"
+    os.makedirs(moved.parent)
+    shutil.move(sidecar, moved)
+    fm.relocate_cached_tags_of({sidecar: moved})
+    fm.close()
+
+    cache = TagCache(cache_file)
+    cached = cache.get_many({moved: TagCache.fingerprint_of(moved)})
+    assert cached[moved][MowTag.rating.value] == 3
+    assert cache.get_many({sidecar: TagCache.fingerprint_of(sidecar)}) == {}
+    cache.close()
@@ -0,0 +1,122 @@
+from pathlib import Path
+import shutil
+import os
+
+from ..modules.mow.mowtags import MowTag, MowTagFileManipulator
+from ..modules.mow.xmpsidecar import XmpSidecarEngine
+
+testfolder = Path("tests").absolute()
+src = testfolder / "filestotreat"
+sidecar = src / "test.xmp"
+
+complex_tags = {
+    MowTag.date: "2022:07:27 21:55:55",
+    MowTag.rating: 5,
+    MowTag.description: "test",
+    MowTag.stagehistory: ["test1", "test2"],
+    MowTag.hierarchicalsubject: ["Projekt|Fotobuch|Nonni"],
+    MowTag.gps_elevation: -100.1,
+    MowTag.gps_latitude: 1.1,
+    MowTag.gps_longitude: -2.2,
+}
+
+foreign_sidecar = """<?xpacket begin='﻿' id='W5M0MpCehiHzreSzNTczkc9d'?>
+<x:xmpmeta xmlns:x='adobe:ns:meta/'>
+<rdf:RDF xmlns:rdf='http://www.w3.org/1999/02/22-rdf-syntax-ns#'>
+ <rdf:Description rdf:about=''
+  xmlns:xmp='http://ns.adobe.com/xap/1.0/'
+  xmlns:crs='http://ns.adobe.com/camera-raw-settings/1.0/'
+  xmp:Rating='3'
+  crs:Exposure2012='+0.50'>
+  <dc:subject xmlns:dc='http://purl.org/dc/elements/1.1/'>
+   <rdf:Bag>
+    <rdf:li>Urlaub</rdf:li>
+   </rdf:Bag>
+  </dc:subject>
+ </rdf:Description>
+</rdf:RDF>
+</x:xmpmeta>
+<?xpacket end='w'?>
+"""
+
+
+def prepareTest():
+    shutil.rmtree(src, ignore_errors=True)
+    os.makedirs(src)
+
+
+def test_native_sidecar_roundtrip():
+    prepareTest()
+    fm = MowTagFileManipulator()
+
+    fm.write_tags(sidecar, complex_tags.copy())
+    result = fm.read_tags(sidecar, list(complex_tags.keys()) + [MowTag.source])
+
+    assert result[MowTag.date] == ["2022:07:27 21:55:55"]
+    assert result[MowTag.rating] == 5
+    assert result[MowTag.description] == "test"
+    assert result[MowTag.stagehistory] == ["test1", "test2"]
+    assert result[MowTag.hierarchicalsubject] == ["Projekt|Fotobuch|Nonni"]
+    assert result[MowTag.gps_elevation] == -100.1
+    assert result[MowTag.gps_latitude] == 1.1
+    assert result[MowTag.gps_longitude] == -2.2
+    assert MowTag.source not in result
+
+
+def test_native_sidecar_keeps_foreign_content():
+    prepareTest()
+    with open(sidecar, "w", encoding="utf-8") as f:
+        f.write(foreign_sidecar)
+
+    fm = MowTagFileManipulator()
+    assert fm.read_tags(sidecar, [MowTag.rating, MowTag.subject]) == {
+        MowTag.rating: 3,
+        MowTag.subject: ["Urlaub"],
+    }
+
+    fm.write_tags(sidecar, {MowTag.rating: 4, MowTag.label: "created by mow"})
+
+    with open(sidecar, "r", encoding="utf-8") as f:
+        content = f.read()
+    assert "crs:Exposure2012" in content
+    assert content.startswith("<?xpacket begin=")
+    assert fm.read_tags(sidecar, [MowTag.rating, MowTag.subject, MowTag.label]) == {
+        MowTag.rating: 4,
+        MowTag.subject: ["Urlaub"],
+        MowTag.label: "created by mow",
+    }
+
+
+def test_native_sidecar_writes_like_exiftool_with_latin_charset():
+    prepareTest()
+    fm = MowTagFileManipulator()
+
+    fm.write_tags(sidecar, {MowTag.description: "Grüße"})
+    description = fm.read_tags(sidecar, [MowTag.description])[MowTag.description]
+
+    assert description != "Grüße"
+    assert description.encode("1252").decode("utf-8") == "Grüße"
+
+
+def test_native_sidecar_many():
+    prepareTest()
+    fm = MowTagFileManipulator()
+    files = [src / f"test{i}.xmp" for i in range(3)]
+
+    errors = fm.write_tags_many(
+        {file: {MowTag.rating: i} for i, file in enumerate(files)}
+    )
+    assert errors == {}
+
+    result = fm.read_tags_many(files + [src / "missing.xmp"], [MowTag.rating])
+    assert len(result) == 3
+    for i, file in enumerate(files):
+        assert result[file] == {MowTag.rating: i}
+
+
+def test_gps_coordinate_formats():
+    assert XmpSidecarEngine._parse_gps_coordinate("48,7.5N") == 48.125
+    assert XmpSidecarEngine._parse_gps_coordinate("48,7,30W") == -48.125
+    assert XmpSidecarEngine._format_gps_coordinate(-48.125, "GPSLatitude") == (
+        "48,7.50000000S"
+    )